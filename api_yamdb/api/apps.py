@@ -6,6 +6,7 @@
 с пользователями, произведениями, отзывами и комментариями.
 """
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
@@ -13,3 +14,11 @@ class ApiConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        """Подключает настройку PRAGMA к новым соединениям SQLite."""
+        from .sqlite import apply_sqlite_pragmas
+
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='api.sqlite_pragmas'
+        )
@@ -0,0 +1,121 @@
+"""
+Маршрутизация запросов к базе: запись в основную базу, чтение с реплик.
+
+Чтение уходит на реплику только внутри запроса с безопасным методом,
+для которого ReplicaMiddleware выбрал реплику из DATABASE_REPLICAS.
+Всё остальное - запросы на изменение, команды manage.py, фоновые потоки -
+читает из основной базы, поэтому реплика никогда не используется там,
+где нужны только что записанные данные.
+
+Пользователи всегда читаются из основной базы: по ним аутентификация
+проверяет токен, и при отставании реплики только что
+зарегистрированный пользователь получил бы 401.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_CACHE_PREFIX = 'replica-sticky:'
+
+read_database = ContextVar('read_database', default=None)
+
+
+def choose_replica():
+    """Случайная реплика из DATABASE_REPLICAS или None, если их нет."""
+    replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+    return random.choice(replicas) if replicas else None
+
+
+def sticky_key(request):
+    """
+    Ключ клиента для чтения своих записей.
+
+    Клиент определяется по id пользователя, которого DRF уже
+    аутентифицировал в этом запросе, поэтому метка действует и для нового
+    токена того же пользователя, а токен повторно не проверяется.
+    Анонимные запросы ключа не имеют.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return f'{STICKY_CACHE_PREFIX}{user.pk}'
+
+
+def sticky_cache():
+    """
+    Кэш меток REPLICA_STICKY_CACHE.
+
+    Он должен быть общим для всех рабочих процессов: следующий запрос
+    клиента может попасть в другой процесс.
+    """
+    return caches[settings.REPLICA_STICKY_CACHE]
+
+
+def is_sticky(request):
+    """Клиент недавно писал и должен читать из основной базы."""
+    key = sticky_key(request)
+    return key is not None and sticky_cache().get(key) is not None
+
+
+def mark_sticky(request):
+    """Запоминает запись клиента на REPLICA_STICKY_SECONDS секунд."""
+    if not getattr(settings, 'DATABASE_REPLICAS', ()):
+        return
+    key = sticky_key(request)
+    if key is not None:
+        sticky_cache().set(
+            key, True, timeout=settings.REPLICA_STICKY_SECONDS
+        )
+
+
+class ReadDatabase:
+    """
+    База для чтения, выбранная ReplicaMiddleware для запроса.
+
+    Выбор между репликой и основной базой откладывается до первого чтения
+    после аутентификации DRF: только тогда известен пользователь, и метку
+    записи можно проверить без повторной проверки токена. До этого, как и
+    в представлениях не на DRF, чтение идёт из основной базы.
+    """
+
+    def __init__(self, request, replica):
+        """Запоминает запрос и выбранную для него реплику."""
+        self.request = request
+        self.replica = replica
+        self.database = None
+
+    def alias(self):
+        """Реплика или основная база, если клиент недавно писал."""
+        if self.database is None:
+            if not hasattr(self.request, 'auth'):
+                return DEFAULT_DB_ALIAS
+            self.database = (
+                DEFAULT_DB_ALIAS if is_sticky(self.request) else self.replica
+            )
+        return self.database
+
+
+class ReplicaRouter:
+    """Роутер: чтение с выбранной для запроса реплики, запись в основную."""
+
+    def db_for_read(self, model, **hints):
+        """Реплика текущего запроса или основная база."""
+        selected = read_database.get()
+        if selected is None or model._meta.label == settings.AUTH_USER_MODEL:
+            return DEFAULT_DB_ALIAS
+        return selected.alias()
+
+    def db_for_write(self, model, **hints):
+        """Запись всегда в основную базу."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплики содержат те же данные, связи между ними разрешены."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Реплики получают схему копированием, миграции - только основной."""
+        return db not in getattr(settings, 'DATABASE_REPLICAS', ())
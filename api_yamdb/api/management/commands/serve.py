@@ -0,0 +1,236 @@
+"""Команда для запуска WSGI-сервера с форком рабочих процессов."""
+import gc
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    WSGIRequestHandler, get_internal_wsgi_application
+)
+from django.db import connections
+
+from api.metrics import registry
+from api.prefork import (
+    WorkerServer, open_listener, process_memory, warm_up
+)
+from api.slow_queries import slow_query_log
+
+# Seconds before a crashed worker is replaced, so a worker that fails at
+# startup does not turn the master into a fork loop.
+RESTART_DELAY = 1
+
+
+def exit_status(code):
+    """
+    Код выхода для os._exit() из SystemExit.code: None - успех, не число
+    (сообщение sys.exit('...')) - ошибка, как у интерпретатора.
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    return 1
+
+
+class Command(BaseCommand):
+    """
+    Загружает приложение один раз и форкает рабочие процессы.
+
+    Главный процесс только следит за рабочими: перезапускает
+    завершившиеся, по SIGUSR1 печатает их память, по SIGTERM и SIGINT
+    останавливает их.
+    """
+
+    help = (
+        'Serve WSGI_APPLICATION from preforked workers that share the '
+        'preloaded, gc-frozen application'
+    )
+
+    def add_arguments(self, parser):
+        """Адрес, число рабочих процессов и режимы загрузки."""
+        parser.add_argument(
+            '--bind', default='127.0.0.1:8000', help='host:port to listen on.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Worker processes; 0 serves from this process without '
+                 'forking.'
+        )
+        parser.add_argument('--backlog', type=int, default=128)
+        parser.add_argument(
+            '--no-preload', action='store_false', dest='preload',
+            help='Import and warm up the application in each worker after '
+                 'the fork.'
+        )
+        parser.add_argument(
+            '--no-freeze', action='store_false', dest='freeze',
+            help='Do not call gc.freeze() before forking.'
+        )
+
+    def handle(self, *args, **options):
+        """Проверяет параметры, занимает METRICS_DIR и запускает сервер."""
+        host, _, port = options['bind'].rpartition(':')
+        if not host or not port.isdigit():
+            raise CommandError('--bind must be host:port')
+        if options['workers'] < 0:
+            raise CommandError('--workers must not be negative')
+        self.options = options
+        if settings.METRICS_ENABLED:
+            owner = registry.claim()
+            if owner is not None:
+                raise CommandError(
+                    f'METRICS_DIR {settings.METRICS_DIR} is used by the '
+                    f'server with pid {owner}; give each server its own '
+                    f'YAMDB_METRICS_DIR'
+                )
+        try:
+            self.start(host, int(port))
+        finally:
+            if settings.METRICS_ENABLED:
+                registry.release()
+
+    def start(self, host, port):
+        """Открывает сокет, загружает приложение и запускает процессы."""
+        options = self.options
+        self.listener = open_listener(host, port, options['backlog'])
+        self.application = None
+        self.server = None
+        if options['preload'] or not options['workers']:
+            self.load_application()
+        connections.close_all()
+        if options['freeze'] and options['workers']:
+            gc.collect()
+            gc.freeze()
+        self.stdout.write(
+            f'Listening on http://{options["bind"]}/ with '
+            f'{options["workers"]} workers (pid {os.getpid()})'
+        )
+        if not options['workers']:
+            self.serve()
+            return
+
+        self.workers = {}
+        self.running = True
+        for number in range(1, options['workers'] + 1):
+            self.spawn(number)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, self.report)
+        self.supervise()
+
+    def load_application(self):
+        """Импортирует WSGI-приложение и прогревает его."""
+        start = time.monotonic()
+        self.application = get_internal_wsgi_application()
+        actions, serializers = warm_up()
+        self.stdout.write(
+            f'Application loaded in {time.monotonic() - start:.2f}s: '
+            f'{actions} view actions, {serializers} serializers warmed up'
+        )
+
+    def spawn(self, number):
+        """
+        Форкает рабочий процесс с номером number; замена упавшего процесса
+        получает его номер и продолжает его журнал медленных запросов.
+        """
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = number
+            return
+        signal.signal(signal.SIGTERM, self.exit_worker)
+        signal.signal(signal.SIGINT, self.exit_worker)
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+        slow_query_log.set_worker(number)
+        status = 0
+        try:
+            if self.application is None:
+                self.load_application()
+            self.serve()
+        except SystemExit as error:
+            status = exit_status(error.code)
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            try:
+                registry.close()
+            finally:
+                sys.stdout.flush()
+                os._exit(status)
+
+    def exit_worker(self, signum, frame):
+        """
+        Останавливает рабочий процесс после текущего запроса: serve()
+        возвращается, и spawn() переносит метрики и выходит.
+        """
+        if self.server is None:
+            raise SystemExit(0)
+        # shutdown() ждёт выхода из serve_forever(), поэтому не из
+        # обработчика сигнала, прерывающего этот цикл.
+        threading.Thread(target=self.server.shutdown).start()
+
+    def serve(self):
+        """Обслуживает запросы в текущем процессе."""
+        self.server = WorkerServer(
+            self.listener, WSGIRequestHandler, self.application
+        )
+        self.server.serve_forever()
+
+    def supervise(self):
+        """Ждёт завершения рабочих процессов и перезапускает их."""
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            number = self.workers.pop(pid, None)
+            registry.retire(pid)
+            if self.running and number is not None:
+                self.stderr.write(
+                    f'Worker {pid} exited with code '
+                    f'{os.waitstatus_to_exitcode(status)}, restarting'
+                )
+                time.sleep(RESTART_DELAY)
+                # stop() мог прийти во время паузы и не увидеть замену.
+                if self.running:
+                    self.spawn(number)
+
+    def stop(self, signum, frame):
+        """Останавливает рабочие процессы."""
+        self.running = False
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+
+    def report(self, signum=None, frame=None):
+        """Печатает RSS, PSS и USS главного и рабочих процессов в МиБ."""
+        self.stdout.write(
+            f'{"pid":>8} {"role":<7} {"rss_mib":>8} {"pss_mib":>8} '
+            f'{"uss_mib":>8}'
+        )
+        total = dict.fromkeys(('rss', 'pss', 'uss'), 0)
+        roles = [(os.getpid(), 'master')] + [
+            (pid, 'worker') for pid in sorted(self.workers)
+        ]
+        for pid, role in roles:
+            memory = process_memory(pid)
+            if memory is None:
+                continue
+            for name in total:
+                total[name] += memory[name]
+            self.stdout.write(
+                f'{pid:>8} {role:<7} {memory["rss"] / 1024:8.1f} '
+                f'{memory["pss"] / 1024:8.1f} {memory["uss"] / 1024:8.1f}'
+            )
+        self.stdout.write(
+            f'{"":>8} {"total":<7} {"":>8} {total["pss"] / 1024:8.1f} '
+            f'{total["uss"] / 1024:8.1f}'
+        )
+        self.stdout.flush()
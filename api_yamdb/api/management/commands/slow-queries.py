@@ -0,0 +1,42 @@
+"""Команда для сводки журнала медленных запросов."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.slow_queries import SORT_KEYS, read_records, summarize
+
+
+class Command(BaseCommand):
+    """Выводит самые дорогие запросы из журнала SLOW_QUERY_LOG."""
+
+    help = 'Summarize the slow-query log: top queries by total time'
+
+    def add_arguments(self, parser):
+        """Журнал, порядок сортировки и число запросов в сводке."""
+        parser.add_argument(
+            '--log', default=None,
+            help='Log file to read; defaults to SLOW_QUERY_LOG. Rotated '
+                 'backups and serve worker logs next to it are read as '
+                 'well.'
+        )
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total_ms')
+        parser.add_argument('--top', type=int, default=10)
+
+    def handle(self, *args, **options):
+        """Печатает сводку по запросам, сгруппированным по SQL."""
+        summary = summarize(
+            read_records(options['log'] or settings.SLOW_QUERY_LOG),
+            options['sort'], options['top']
+        )
+        if not summary:
+            self.stdout.write('No slow queries logged')
+            return
+        for rank, group in enumerate(summary, 1):
+            self.stdout.write(self.style.SUCCESS(
+                f'#{rank} count={group["count"]} '
+                f'total_ms={group["total_ms"]:.1f} '
+                f'max_ms={group["max_ms"]:.1f} avg_ms={group["avg_ms"]:.1f}'
+            ))
+            self.stdout.write(f'  views: {", ".join(group["views"])}')
+            self.stdout.write(f'  sql: {group["sql"]}')
+            for step in group['plan']:
+                self.stdout.write(f'  plan: {step}')
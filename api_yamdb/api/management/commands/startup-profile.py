@@ -0,0 +1,69 @@
+"""Команда для профилирования запуска рабочего процесса."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.startup_profile import PHASES, profile_startup
+
+
+class Command(BaseCommand):
+    """Выводит время этапов запуска и самые долгие импорты."""
+
+    help = (
+        'Report per-module import time of django.setup(), middleware and '
+        'URLconf loading, measured in a fresh python -X importtime process'
+    )
+
+    def add_arguments(self, parser):
+        """Профиль настроек, число импортов в списке и сортировка."""
+        parser.add_argument(
+            '--settings-module', default=None,
+            help='Settings to profile; defaults to the current ones, e.g. '
+                 'api_yamdb.settings_api for the lean API profile.'
+        )
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'self'), default='cumulative',
+            help='cumulative - with nested imports; self - the module body '
+                 'only.'
+        )
+
+    def handle(self, *args, **options):
+        """Печатает этапы запуска и список импортов."""
+        settings_module = (
+            options['settings_module'] or settings.SETTINGS_MODULE
+        )
+        try:
+            profile = profile_startup(settings_module, settings.BASE_DIR)
+        except RuntimeError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(f'Startup of {settings_module}'))
+        for phase in PHASES:
+            imports = profile.phase_imports(phase)
+            import_ms = sum(record.self_us for record in imports) / 1000
+            self.stdout.write(
+                f'{phase:<10} {profile.phases[phase]:8.1f} ms  '
+                f'({len(imports)} modules imported in {import_ms:.1f} ms)'
+            )
+        self.stdout.write(
+            f'{"total":<10} {sum(profile.phases.values()):8.1f} ms'
+        )
+
+        self.stdout.write(
+            f'\nTop {options["top"]} imports by {options["sort"]} time:'
+        )
+        self.stdout.write(
+            f'{"cumulative":>10} {"self":>8}  {"phase":<10} module'
+        )
+        for record in profile.top(options['top'], options['sort']):
+            self.stdout.write(
+                f'{record.cumulative_us / 1000:10.1f} '
+                f'{record.self_us / 1000:8.1f}  {record.phase:<10} '
+                f'{record.module}'
+            )
+        if 'setuptools' in profile.modules:
+            self.stdout.write(self.style.WARNING(
+                '\nsetuptools is loaded by its distutils shim because Django '
+                '3.2 imports distutils; start workers with '
+                'SETUPTOOLS_USE_DISTUTILS=stdlib to skip it.'
+            ))
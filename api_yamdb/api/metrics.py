@@ -0,0 +1,424 @@
+"""
+Метрики сервиса в текстовом формате Prometheus без внешнего APM.
+
+Счётчики и гистограммы с фиксированными корзинами хранятся в памяти
+процесса под одной блокировкой. Процесс не чаще раза в
+METRICS_FLUSH_INTERVAL секунд переписывает свой файл
+METRICS_DIR/<pid>.json (запись во временный файл и переименование), а
+/metrics складывает текущие значения своего процесса с файлами остальных
+процессов.
+
+Счётчики Prometheus только растут, поэтому значения завершившегося
+процесса не пропадают: при выходе он сам переносит их в общий файл
+aggregate.json, а файл упавшего процесса переносит туда команда serve
+или процесс, получивший тот же pid. Файлы в каталоге меняются под
+блокировкой flock на METRICS_DIR/.lock. Команда serve очищает каталог
+при запуске, только если им не владеет другой работающий сервер
+(claim()).
+"""
+import atexit
+import fcntl
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+AGGREGATE_FILE = 'aggregate.json'
+LOCK_FILE = '.lock'
+OWNER_FILE = 'owner.pid'
+
+
+def format_value(value):
+    """Число в записи Prometheus: целые без дробной части."""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    """Метки вида {name="value",...} с экранированием значений."""
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def read_snapshot(path):
+    """Значения из файла процесса или None, если файла нет или он испорчен."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        # Файл удалён или записан несовместимой версией.
+        return None
+
+
+def process_alive(pid):
+    """Есть ли процесс pid."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_pid(path):
+    """Pid из файла или None."""
+    try:
+        return int(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshot(path, snapshot):
+    """Атомарно переписывает файл значений."""
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+
+class Counter:
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def __init__(self, registry, name, documentation):
+        """Запоминает реестр, имя и описание метрики."""
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+
+    def inc(self, value=1, **labels):
+        """Увеличивает счётчик с данными метками."""
+        key = (self.name, tuple(sorted(labels.items())))
+        with self.registry.lock:
+            values = self.registry.values
+            values[key] = values.get(key, 0) + value
+
+    def add(self, total, value):
+        """Сумма значений двух процессов."""
+        return (total or 0) + value
+
+    def samples(self, labels, value):
+        """Строки экспозиции одного набора меток."""
+        return [f'{self.name}{format_labels(labels)} {format_value(value)}']
+
+
+class Histogram:
+    """Гистограмма с фиксированными верхними границами корзин."""
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, buckets):
+        """Запоминает реестр, имя, описание и границы корзин."""
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """Учитывает наблюдение в первой подходящей корзине."""
+        key = (self.name, tuple(sorted(labels.items())))
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self.registry.lock:
+            counts = self.registry.values.get(key)
+            if counts is None:
+                # Счётчики корзин, последняя - +Inf, и сумма наблюдений.
+                counts = self.registry.values[key] = (
+                    [0] * (len(self.buckets) + 2)
+                )
+            counts[index] += 1
+            counts[-1] += value
+
+    def add(self, total, value):
+        """Поэлементная сумма корзин двух процессов."""
+        if total is None:
+            return list(value)
+        if len(total) != len(value):
+            return total
+        return [left + right for left, right in zip(total, value)]
+
+    def samples(self, labels, value):
+        """Накопительные корзины, сумма и число наблюдений."""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), value):
+            cumulative += count
+            bucket_labels = labels + (('le', format_value(bound)),)
+            lines.append(
+                f'{self.name}_bucket{format_labels(bucket_labels)} '
+                f'{cumulative}'
+            )
+        lines.append(
+            f'{self.name}_sum{format_labels(labels)} '
+            f'{format_value(value[-1])}'
+        )
+        lines.append(
+            f'{self.name}_count{format_labels(labels)} {cumulative}'
+        )
+        return lines
+
+
+class MetricsRegistry:
+    """Метрики процесса и их сложение с файлами других процессов."""
+
+    def __init__(self):
+        """
+        Пустой реестр; в дочернем процессе после fork он обнуляется, а при
+        выходе процесса его значения переносятся в общий файл.
+        """
+        self.metrics = {}
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+        atexit.register(self.close)
+
+    def reset(self):
+        """Обнуляет значения всех метрик."""
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.values = {}
+        self.flushed = time.monotonic()
+        self.owns_file = False
+
+    def counter(self, name, documentation):
+        """Регистрирует счётчик."""
+        return self.register(Counter(self, name, documentation))
+
+    def histogram(self, name, documentation, buckets):
+        """Регистрирует гистограмму."""
+        return self.register(Histogram(self, name, documentation, buckets))
+
+    def register(self, metric):
+        """Добавляет метрику в реестр."""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        """Копия значений процесса, пригодная для JSON."""
+        with self.lock:
+            return [
+                [name, [list(label) for label in labels],
+                 list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def file_path(self):
+        """Файл значений текущего процесса."""
+        return Path(settings.METRICS_DIR) / f'{os.getpid()}.json'
+
+    @contextmanager
+    def locked(self, operation=fcntl.LOCK_EX):
+        """Блокировка файлов METRICS_DIR между процессами."""
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / LOCK_FILE, 'a') as lock:
+            fcntl.flock(lock, operation)
+            yield directory
+
+    def flush(self, force=False):
+        """
+        Переписывает файл процесса, если с прошлой записи прошло больше
+        METRICS_FLUSH_INTERVAL секунд. Пока файл пишет один поток,
+        остальные запись пропускают.
+        """
+        now = time.monotonic()
+        if not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL:
+            return
+        if not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.flushed = now
+            with self.locked():
+                path = self.file_path()
+                if not self.owns_file:
+                    # Файл остался от завершившегося процесса с тем же pid.
+                    self.retire_file(path)
+                    self.owns_file = True
+                write_snapshot(path, self.snapshot())
+        finally:
+            self.flush_lock.release()
+
+    def retire_file(self, path):
+        """
+        Прибавляет значения из файла path к общему файлу и удаляет path.
+        Вызывается под блокировкой каталога.
+        """
+        snapshot = read_snapshot(path)
+        if snapshot is None:
+            return
+        aggregate = path.with_name(AGGREGATE_FILE)
+        merged = self.merge([snapshot, read_snapshot(aggregate) or []])
+        write_snapshot(aggregate, [
+            [name, [list(label) for label in labels], value]
+            for (name, labels), value in merged.items()
+        ])
+        path.unlink()
+
+    def retire(self, pid):
+        """Переносит значения завершившегося процесса pid в общий файл."""
+        path = Path(settings.METRICS_DIR) / f'{pid}.json'
+        if path.exists():
+            with self.locked():
+                self.retire_file(path)
+
+    def close(self):
+        """
+        Переносит значения текущего процесса в общий файл и обнуляет их;
+        вызывается при выходе из процесса.
+        """
+        if not settings.METRICS_ENABLED or not (
+            self.values or self.owns_file
+        ):
+            return
+        with self.flush_lock, self.locked():
+            path = self.file_path()
+            if not self.owns_file:
+                self.retire_file(path)
+            write_snapshot(path, self.snapshot())
+            self.retire_file(path)
+            with self.lock:
+                self.values = {}
+            self.owns_file = False
+
+    def snapshots(self):
+        """Значения текущего процесса и файлы остальных процессов."""
+        snapshots = [self.snapshot()]
+        if not Path(settings.METRICS_DIR).is_dir():
+            return snapshots
+        own = self.file_path()
+        with self.locked(fcntl.LOCK_SH) as directory:
+            for path in sorted(directory.glob('*.json')):
+                if path == own:
+                    continue
+                snapshot = read_snapshot(path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+    def merge(self, snapshots):
+        """Суммы значений снимков по метрикам и меткам."""
+        merged = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                key = (name, tuple(tuple(label) for label in labels))
+                merged[key] = metric.add(merged.get(key), value)
+        return merged
+
+    def collect(self):
+        """Суммы значений всех процессов по метрикам и меткам."""
+        return self.merge(self.snapshots())
+
+    def exposition(self):
+        """Все метрики в текстовом формате Prometheus."""
+        grouped = defaultdict(list)
+        for (name, labels), value in sorted(self.collect().items()):
+            grouped[name].append((labels, value))
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in grouped[name]:
+                lines.extend(metric.samples(labels, value))
+        return '\n'.join(lines) + '\n'
+
+    def claim(self):
+        """
+        Делает текущий процесс владельцем METRICS_DIR и очищает каталог.
+
+        Если каталогом владеет другой живой процесс, ничего не удаляет и
+        возвращает его pid.
+        """
+        with self.locked() as directory:
+            owner_file = directory / OWNER_FILE
+            owner = read_pid(owner_file)
+            if owner not in (None, os.getpid()) and process_alive(owner):
+                return owner
+            for path in directory.glob('*.json'):
+                path.unlink()
+            owner_file.write_text(str(os.getpid()))
+        self.reset()
+        return None
+
+    def release(self):
+        """Снимает владение METRICS_DIR, взятое claim()."""
+        with self.locked() as directory:
+            owner_file = directory / OWNER_FILE
+            if read_pid(owner_file) == os.getpid():
+                owner_file.unlink()
+
+    def clear_files(self):
+        """
+        Удаляет файлы всех процессов и общий файл, обнуляет свои значения.
+        """
+        directory = Path(settings.METRICS_DIR)
+        if directory.is_dir():
+            for path in directory.glob('*.json'):
+                path.unlink(missing_ok=True)
+        self.reset()
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    'yamdb_request_duration_seconds',
+    'Request latency by view and action.', LATENCY_BUCKETS
+)
+REQUESTS = registry.counter(
+    'yamdb_requests_total', 'Requests by view, action and status code.'
+)
+REQUEST_QUERIES = registry.histogram(
+    'yamdb_request_queries', 'SQL queries per request by view and action.',
+    QUERY_BUCKETS
+)
+CACHE_REQUESTS = registry.counter(
+    'yamdb_cache_requests_total', 'Cache lookups by cache and result.'
+)
+WRITE_QUEUE_WRITES = registry.counter(
+    'yamdb_write_queue_writes_total', 'Queued writes by outcome.'
+)
+
+
+def view_label(view_func, method):
+    """
+    Имя представления для меток: ViewSet.action для наборов DRF,
+    APIView.метод для остальных представлений DRF и имя функции иначе.
+    """
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'view')
+    method = method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{view_class.__name__}.{actions.get(method, method)}'
+
+
+def record_request(view, status, duration, queries):
+    """Учитывает завершённый запрос и при необходимости пишет файл."""
+    REQUEST_DURATION.observe(duration, view=view)
+    REQUESTS.inc(view=view, status=status)
+    REQUEST_QUERIES.observe(queries, view=view)
+    registry.flush()
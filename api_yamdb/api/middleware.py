@@ -0,0 +1,249 @@
+"""Middleware проекта YaMDB."""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from . import metrics
+from .db_router import (
+    ReadDatabase, choose_replica, mark_sticky, read_database,
+)
+from .slow_queries import SlowQueryRecorder
+from .timing import (
+    QueryLog, RequestTimings, current_queries, current_timings,
+    install_serializer_timing
+)
+
+timing_logger = logging.getLogger('api.timing')
+nplusone_logger = logging.getLogger('api.nplusone')
+
+QUERY_LOG_MIDDLEWARE = 'api.middleware.QueryLogMiddleware'
+
+
+def require_query_log():
+    """Проверяет, что QueryLogMiddleware стоит в MIDDLEWARE первым."""
+    if settings.MIDDLEWARE[:1] != [QUERY_LOG_MIDDLEWARE]:
+        raise ImproperlyConfigured(
+            f'{QUERY_LOG_MIDDLEWARE} must be first in MIDDLEWARE.'
+        )
+
+
+class QueryLogMiddleware:
+    """
+    Одна обёртка execute_wrapper на все соединения за запрос.
+
+    Метрики, Server-Timing, поиск N+1 и журнал медленных запросов берут
+    число и время запросов к базе из QueryLog и подписываются на него
+    вместо собственных обёрток. Если все они выключены в настройках,
+    middleware отключается при запуске.
+    """
+
+    def __init__(self, get_response):
+        """Отключается, если запросы к базе никому не нужны."""
+        if not any((
+            settings.METRICS_ENABLED, settings.SERVER_TIMING_ENABLED,
+            settings.NPLUSONE_ENABLED, settings.SLOW_QUERY_ENABLED,
+        )):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос под общей обёрткой."""
+        queries = QueryLog()
+        token = current_queries.set(queries)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(queries)
+                    )
+                return self.get_response(request)
+        finally:
+            current_queries.reset(token)
+
+
+class ReplicaMiddleware:
+    """
+    Выбирает базу для чтения на время запроса.
+
+    Запросы с безопасным методом читают с реплики, кроме клиентов, которые
+    недавно что-то записали: они читают из основной базы, пока реплика
+    может отставать. Запросы на изменение всегда работают с основной базой.
+    """
+
+    def __init__(self, get_response):
+        """Сохраняет следующий обработчик цепочки."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос с выбранной базой для чтения."""
+        safe = request.method in SAFE_METHODS
+        replica = choose_replica() if safe else None
+        token = read_database.set(
+            None if replica is None else ReadDatabase(request, replica)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        if not safe:
+            mark_sticky(request)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Латентность, код ответа и число запросов к базе для /metrics.
+
+    Метки берутся из представления, выбранного при разборе URL:
+    ViewSet.action, например TitleViewSet.list. Без METRICS_ENABLED
+    middleware отключается при запуске.
+    """
+
+    def __init__(self, get_response):
+        """Отключается, если метрики выключены в настройках."""
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        require_query_log()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос и учитывает его в метриках."""
+        start = time.perf_counter()
+        response = self.get_response(request)
+        metrics.record_request(
+            getattr(request, 'view_label', 'unmatched'),
+            response.status_code, time.perf_counter() - start,
+            current_queries.get().queries,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Запоминает имя представления для меток."""
+        request.view_label = metrics.view_label(view_func, request.method)
+
+
+class ServerTimingMiddleware:
+    """
+    Заголовок Server-Timing и строка лога с временем запроса.
+
+    Считает запросы к базе и их время, время сериализации и рендеринга.
+    При SERVER_TIMING_ENABLED = False middleware отключается при запуске
+    и не добавляет к запросу никакой работы.
+    """
+
+    def __init__(self, get_response):
+        """Отключается, если замеры выключены в настройках."""
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        require_query_log()
+        install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос под замерами и добавляет их к ответу."""
+        queries = current_queries.get()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = (
+            f'db;dur={queries.db * 1000:.1f};'
+            f'desc="{queries.queries} queries", '
+            f'serialize;dur={timings.serialize * 1000:.1f}, '
+            f'render;dur={timings.render * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        timing_logger.info(
+            'method=%s path=%s status=%s total_ms=%.1f db_ms=%.1f '
+            'queries=%d serialize_ms=%.1f render_ms=%.1f',
+            request.method, request.path, response.status_code,
+            total * 1000, queries.db * 1000, queries.queries,
+            timings.serialize * 1000, timings.render * 1000,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """Засекает рендеринг ответа DRF до и после response.render()."""
+        timings = current_timings.get()
+        start = time.perf_counter()
+
+        def rendered(response):
+            timings.render += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Ищет запросы, повторённые больше NPLUSONE_THRESHOLD раз за запрос.
+
+    При NPLUSONE_ACTION = 'warn' повторы пишутся в лог api.nplusone,
+    при 'raise' запрос завершается ошибкой NPlusOneError. Без
+    NPLUSONE_ENABLED middleware отключается при запуске, а модуль
+    api.nplusone не импортируется.
+    """
+
+    def __init__(self, get_response):
+        """Отключается, если поиск выключен в настройках."""
+        if not settings.NPLUSONE_ENABLED:
+            raise MiddlewareNotUsed
+        require_query_log()
+        from . import nplusone
+
+        self.nplusone = nplusone
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос и проверяет повторы его SQL."""
+        inspector = self.nplusone.QueryInspector()
+        current_queries.get().subscribe(inspector.record)
+        response = self.get_response(request)
+        repeated = inspector.repeated(settings.NPLUSONE_THRESHOLD)
+        if not repeated:
+            return response
+        report = '\n'.join(map(str, repeated))
+        if settings.NPLUSONE_ACTION == 'raise':
+            raise self.nplusone.NPlusOneError(
+                f'{request.method} {request.path}: repeated queries:\n'
+                f'{report}'
+            )
+        nplusone_logger.warning(
+            '%s %s: repeated queries:\n%s', request.method, request.path,
+            report
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Записывает медленные запросы к базе в журнал SLOW_QUERY_LOG.
+
+    Без SLOW_QUERY_ENABLED middleware отключается при запуске.
+    """
+
+    def __init__(self, get_response):
+        """Отключается, если журнал выключен в настройках."""
+        if not settings.SLOW_QUERY_ENABLED:
+            raise MiddlewareNotUsed
+        require_query_log()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Выполняет запрос, проверяя время каждого запроса к базе."""
+        current_queries.get().subscribe(SlowQueryRecorder(request))
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Запоминает имя представления для записей журнала."""
+        request.view_label = metrics.view_label(view_func, request.method)
@@ -0,0 +1,155 @@
+"""
+Поиск N+1 запросов: один и тот же SQL, повторённый много раз за запрос.
+
+Каждый запрос к базе сводится к отпечатку api.sql.fingerprint: литералы
+заменяются на ?, списки IN - на (...). Отпечатки группируются по
+месту вызова в коде проекта. Если запрос выполнялся внутри сериализатора
+DRF, запоминается поле, чьё значение его вызвало, например
+TitleListSerializer.genre. Обход стека идёт на каждый запрос, поэтому
+инспектор предназначен для разработки и тестов.
+"""
+import sys
+import sysconfig
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import django
+import rest_framework
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+from . import timing
+from .sql import fingerprint
+
+LIBRARY_DIRS = (
+    str(Path(django.__file__).parent),
+    str(Path(rest_framework.__file__).parent),
+    sysconfig.get_paths()['stdlib'],
+)
+INSTRUMENTATION_FILES = frozenset({
+    __file__, timing.__file__,
+    str(Path(__file__).with_name('middleware.py')),
+    str(Path(__file__).with_name('slow_queries.py')),
+    str(Path(__file__).with_name('sql.py')),
+})
+SERIALIZERS_FILE = serializers.__file__
+
+
+class NPlusOneError(AssertionError):
+    """Запрос повторён больше допустимого числа раз."""
+
+
+@dataclass
+class RepeatedQuery:
+    """SQL, выполненный больше порога раз из одного места."""
+
+    fingerprint: str
+    count: int
+    call_site: str
+    field: str
+
+    def __str__(self):
+        """Описание для лога и сообщения об ошибке."""
+        source = f' via {self.field}' if self.field else ''
+        return (
+            f'{self.count}x at {self.call_site}{source}: {self.fingerprint}'
+        )
+
+
+def inspect_stack(frame):
+    """
+    Место вызова и поле сериализатора для текущего запроса.
+
+    Местом вызова считается ближайший кадр из кода проекта, а если его
+    нет - ближайший кадр вне Django, DRF и стандартной библиотеки.
+    """
+    project_dir = str(settings.BASE_DIR)
+    call_site = fallback = field = None
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if (field is None and filename == SERIALIZERS_FILE
+                and code.co_name == 'to_representation'
+                and 'field' in frame.f_locals):
+            serializer_field = frame.f_locals['field']
+            field = (
+                f'{type(serializer_field.parent).__name__}.'
+                f'{serializer_field.field_name}'
+            )
+        if call_site is None and filename not in INSTRUMENTATION_FILES:
+            location = f'{filename}:{frame.f_lineno} in {code.co_name}'
+            if filename.startswith(project_dir):
+                call_site = location
+            elif fallback is None and not filename.startswith(
+                LIBRARY_DIRS
+            ):
+                fallback = location
+        frame = frame.f_back
+    return call_site or fallback or 'unknown', field or ''
+
+
+class QueryInspector:
+    """
+    Собирает отпечатки запросов: как обёртка execute_wrapper в
+    inspect_queries() или как подписчик QueryLog в NPlusOneMiddleware.
+    """
+
+    def __init__(self):
+        """Пустая статистика."""
+        self.counts = Counter()
+        self.fields = defaultdict(set)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Запоминает запрос и выполняет его."""
+        self.record(sql)
+        return execute(sql, params, many, context)
+
+    def record(self, sql, *args):
+        """Запоминает отпечаток и место вызова запроса."""
+        call_site, field = inspect_stack(sys._getframe(1))
+        key = (fingerprint(sql), call_site)
+        self.counts[key] += 1
+        if field:
+            self.fields[key].add(field)
+
+    def repeated(self, threshold):
+        """Запросы, выполненные больше threshold раз, по убыванию числа."""
+        return [
+            RepeatedQuery(
+                sql, count, call_site,
+                ', '.join(sorted(self.fields[(sql, call_site)]))
+            )
+            for (sql, call_site), count in self.counts.most_common()
+            if count > threshold
+        ]
+
+
+@contextmanager
+def inspect_queries():
+    """Собирает отпечатки запросов всех баз внутри блока with."""
+    inspector = QueryInspector()
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(inspector))
+        yield inspector
+
+
+@contextmanager
+def assert_no_repeated_queries(threshold=None):
+    """
+    Помощник для тестов: падает, если запрос повторён больше threshold раз.
+
+    По умолчанию порог берётся из settings.NPLUSONE_THRESHOLD.
+    """
+    if threshold is None:
+        threshold = settings.NPLUSONE_THRESHOLD
+    with inspect_queries() as inspector:
+        yield inspector
+    repeated = inspector.repeated(threshold)
+    if repeated:
+        raise NPlusOneError(
+            'Repeated queries:\n' + '\n'.join(map(str, repeated))
+        )
@@ -0,0 +1,138 @@
+"""
+Предварительная загрузка приложения для сервера с форком процессов.
+
+Команда serve один раз импортирует WSGI-приложение в главном процессе,
+прогревает URLconf и сериализаторы и вызывает gc.freeze() перед форком
+рабочих процессов. Модули Django, DRF, django_filters и simplejwt,
+загруженные до форка, остаются в общих страницах памяти: рабочий процесс
+копирует страницу только при записи в неё, а замороженные объекты
+сборщик мусора больше не обходит и не пачкает их страницы. Память
+процессов читается из /proc/<pid>/smaps_rollup: USS - страницы только
+этого процесса, PSS - USS плюс доля общих страниц.
+"""
+import socket
+from pathlib import Path
+
+from django.core.servers.basehttp import WSGIServer
+from django.urls import URLResolver, get_resolver
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+MEMORY_FIELDS = {
+    'Rss': 'rss', 'Pss': 'pss', 'Private_Clean': 'uss',
+    'Private_Dirty': 'uss',
+}
+
+
+def iter_callbacks(patterns):
+    """Представления всех маршрутов URLconf, включая вложенные."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_callbacks(pattern.url_patterns)
+        else:
+            yield pattern.callback
+
+
+def build_fields(serializer):
+    """Строит поля сериализатора и всех вложенных сериализаторов."""
+    if isinstance(serializer, ListSerializer):
+        serializer = serializer.child
+    for field in serializer.fields.values():
+        if isinstance(field, BaseSerializer):
+            build_fields(field)
+
+
+def warm_up():
+    """
+    Прогревает URLconf и представления DRF до форка.
+
+    Заполняет таблицы разрешения и обратного разрешения URL, создаёт
+    аутентификаторы, рендереры, парсеры и разрешения каждого действия и
+    поля его сериализатора; при этом подгружаются модули, которые иначе
+    импортировались бы на первом запросе в каждом рабочем процессе.
+    Возвращает число прогретых действий и сериализаторов.
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict
+    actions = 0
+    serializers = set()
+    for callback in iter_callbacks(resolver.url_patterns):
+        view_class = getattr(callback, 'cls', None)
+        if view_class is None:
+            continue
+        for action in (getattr(callback, 'actions', None) or {}).values():
+            view = view_class(**getattr(callback, 'initkwargs', {}))
+            view.action = action
+            view.request = view.format_kwarg = None
+            view.args, view.kwargs = (), {}
+            view.get_authenticators()
+            view.get_renderers()
+            view.get_parsers()
+            view.get_permissions()
+            actions += 1
+            if not hasattr(view, 'get_serializer_class'):
+                continue
+            try:
+                serializer_class = view.get_serializer_class()
+            except AssertionError:
+                # Представление без serializer_class.
+                continue
+            if serializer_class not in serializers:
+                serializers.add(serializer_class)
+                build_fields(serializer_class(context={'view': view}))
+    return actions, len(serializers)
+
+
+def process_memory(pid):
+    """RSS, PSS и USS процесса в КиБ или None, если процесс завершился."""
+    try:
+        lines = Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    memory = dict.fromkeys(('rss', 'pss', 'uss'), 0)
+    for line in lines:
+        name, _, value = line.partition(':')
+        if name in MEMORY_FIELDS:
+            memory[MEMORY_FIELDS[name]] += int(value.split()[0])
+    return memory
+
+
+def child_pids(pid):
+    """Дочерние процессы pid по /proc/<pid>/task/<pid>/children."""
+    path = Path(f'/proc/{pid}/task/{pid}/children')
+    try:
+        return [int(child) for child in path.read_text().split()]
+    except FileNotFoundError:
+        return []
+
+
+class WorkerServer(WSGIServer):
+    """
+    WSGI-сервер рабочего процесса на сокете, открытом главным процессом.
+
+    Все рабочие процессы принимают соединения с одного сокета, ядро
+    распределяет их между процессами.
+    """
+
+    def __init__(self, listener, handler_class, application):
+        """Подключает сокет listener вместо собственного."""
+        super().__init__(
+            listener.getsockname()[:2], handler_class,
+            bind_and_activate=False
+        )
+        self.socket.close()
+        self.socket = listener
+        self.server_bind()
+        self.set_app(application)
+
+    def server_bind(self):
+        """Настраивает окружение WSGI без привязки сокета."""
+        host, port = self.socket.getsockname()[:2]
+        self.server_address = (host, port)
+        self.server_name = host
+        self.server_port = port
+        self.setup_environ()
+
+
+def open_listener(host, port, backlog):
+    """Слушающий сокет для всех рабочих процессов."""
+    return socket.create_server((host, port), backlog=backlog)
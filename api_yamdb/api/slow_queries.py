@@ -0,0 +1,197 @@
+"""
+Журнал медленных запросов к базе с планом EXPLAIN QUERY PLAN.
+
+SlowQueryMiddleware получает каждый запрос к базе с его временем от QueryLog.
+Запрос дольше SLOW_QUERY_THRESHOLD_MS с вероятностью
+SLOW_QUERY_SAMPLE_RATE попадает в журнал: представление, путь, время,
+SQL без литералов и параметров (как отпечаток поиска N+1) и план
+запроса. План запрашивается отдельным курсором в обход обёрток, поэтому
+сам не замеряется. Журнал - файл JSON Lines с ротацией по размеру;
+команда slow-queries сводит его в список самых дорогих запросов.
+
+Ротирует файл только процесс, который в него пишет, поэтому рабочие
+процессы команды serve пишут каждый в свой файл
+slow-queries-worker<N>.log рядом с SLOW_QUERY_LOG, а сводка читает все
+файлы.
+
+Для SELECT в SQLite execute() возвращается после первой строки
+результата, поэтому время выборки оставшихся строк не учитывается.
+"""
+import json
+import logging
+import random
+import re
+import threading
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .sql import fingerprint
+
+SORT_KEYS = ('total_ms', 'count', 'max_ms')
+
+
+def explain(connection, sql, params, many):
+    """
+    Строки плана запроса или пустой список, если план не получить:
+    для executemany, не-SELECT и при ошибке базы.
+    """
+    if many or not sql.lstrip().upper().startswith('SELECT'):
+        return []
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {sql}', params
+        )
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except connection.Database.Error:
+        return []
+    finally:
+        cursor.close()
+
+
+def worker_path(path, number):
+    """Файл журнала рабочего процесса serve с номером number."""
+    path = Path(path)
+    return path.with_name(f'{path.stem}-worker{number}{path.suffix}')
+
+
+def log_paths(path):
+    """Общий файл журнала и файлы рабочих процессов serve."""
+    path = Path(path)
+    worker_re = re.compile(
+        rf'{re.escape(path.stem)}-worker\d+{re.escape(path.suffix)}'
+    )
+    return [path, *sorted(
+        worker for worker in path.parent.glob(f'{path.stem}-worker*')
+        if worker_re.fullmatch(worker.name)
+    )]
+
+
+class SlowQueryLog:
+    """Файл журнала с ротацией; путь и размеры берутся из настроек."""
+
+    def __init__(self):
+        """Файл открывается при первой записи."""
+        self.lock = threading.Lock()
+        self.handler = None
+        self.worker = None
+
+    def set_worker(self, number):
+        """Переключает процесс на файл рабочего процесса serve number."""
+        with self.lock:
+            self.close()
+            self.worker = number
+
+    def write(self, record):
+        """Дописывает запись строкой JSON."""
+        path = Path(settings.SLOW_QUERY_LOG)
+        if self.worker is not None:
+            path = worker_path(path, self.worker)
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            if self.handler is None or self.handler.baseFilename != str(
+                path.resolve()
+            ):
+                self.close()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self.handler = RotatingFileHandler(
+                    path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                    backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                    encoding='utf-8', delay=True,
+                )
+            self.handler.handle(logging.makeLogRecord({'msg': line}))
+
+    def close(self):
+        """Закрывает текущий файл журнала."""
+        if self.handler is not None:
+            self.handler.close()
+            self.handler = None
+
+
+slow_query_log = SlowQueryLog()
+
+
+class SlowQueryRecorder:
+    """Подписчик QueryLog, записывающий медленные запросы."""
+
+    def __init__(self, request):
+        """Запоминает запрос HTTP, к которому относятся запросы к базе."""
+        self.request = request
+
+    def __call__(self, sql, params, many, context, duration):
+        """Записывает запрос к базе, если он медленный."""
+        duration *= 1000
+        if (duration >= settings.SLOW_QUERY_THRESHOLD_MS
+                and random.random() < settings.SLOW_QUERY_SAMPLE_RATE):
+            connection = context['connection']
+            slow_query_log.write({
+                'time': timezone.now().isoformat(),
+                'view': getattr(self.request, 'view_label', 'unmatched'),
+                'path': self.request.path,
+                'database': connection.alias,
+                'duration_ms': round(duration, 3),
+                'sql': fingerprint(sql),
+                'plan': explain(connection, sql, params, many),
+            })
+
+
+def log_files(path):
+    """Файл журнала и его архивы ротации, от старых к новым."""
+    path = Path(path)
+    backups = sorted(
+        path.parent.glob(f'{path.name}.*'),
+        key=lambda backup: int(backup.suffix[1:])
+        if backup.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    return [*backups, path] if path.exists() else backups
+
+
+def read_records(path):
+    """
+    Записи журнала, файлов рабочих процессов и их архивов; повреждённые
+    строки пропускаются.
+    """
+    for log_path in log_paths(path):
+        for log_file in log_files(log_path):
+            with open(log_file, encoding='utf-8') as lines:
+                for line in lines:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def summarize(records, sort='total_ms', top=10):
+    """
+    Запросы, сгруппированные по SQL без литералов, по убыванию sort.
+
+    Для каждой группы - число записей, суммарное, наибольшее и среднее
+    время, представления и план самого медленного выполнения.
+    """
+    groups = defaultdict(lambda: {
+        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': set(),
+        'plan': [],
+    })
+    for record in records:
+        group = groups[record['sql']]
+        group['count'] += 1
+        group['total_ms'] += record['duration_ms']
+        group['views'].add(record['view'])
+        if record['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = record['duration_ms']
+            group['plan'] = record['plan']
+    summary = [
+        {
+            'sql': sql, **group,
+            'avg_ms': group['total_ms'] / group['count'],
+            'views': sorted(group['views']),
+        }
+        for sql, group in groups.items()
+    ]
+    summary.sort(key=lambda group: group[sort], reverse=True)
+    return summary[:top]
@@ -0,0 +1,23 @@
+"""
+Нормализация SQL для поиска N+1 запросов и журнала медленных запросов.
+
+Литералы заменяются на ?, списки IN - на (...), пробелы схлопываются,
+поэтому запросы, различающиеся только значениями, дают один отпечаток.
+"""
+import re
+
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    SQL без литералов и параметров, одинаковый для запросов с разными
+    значениями.
+    """
+    sql = STRING_LITERAL_RE.sub('?', sql)
+    sql = NUMBER_LITERAL_RE.sub('?', sql).replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
@@ -0,0 +1,43 @@
+"""
+Настройка соединений SQLite через PRAGMA из settings.SQLITE_PRAGMAS.
+
+Обработчик сигнала connection_created выполняет PRAGMA для каждого нового
+соединения в порядке словаря, поэтому busy_timeout стоит указывать
+первым: тогда переключение journal_mode тоже ждёт блокировку.
+"""
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+ALLOWED_PRAGMAS = frozenset({
+    'busy_timeout', 'cache_size', 'foreign_keys', 'journal_mode',
+    'journal_size_limit', 'mmap_size', 'synchronous', 'temp_store',
+    'wal_autocheckpoint',
+})
+
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+\Z')
+
+
+def pragma_statements(pragmas):
+    """Проверяет имена и значения и возвращает SQL для каждой PRAGMA."""
+    statements = []
+    for name, value in pragmas.items():
+        if name not in ALLOWED_PRAGMAS:
+            raise ImproperlyConfigured(f'SQLITE_PRAGMAS: unknown {name!r}')
+        if not PRAGMA_VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(
+                f'SQLITE_PRAGMAS: invalid value {value!r} for {name}'
+            )
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Выполняет PRAGMA из настроек на новом соединении SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    statements = pragma_statements(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
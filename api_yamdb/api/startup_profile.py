@@ -0,0 +1,124 @@
+"""
+Профиль запуска: время импорта модулей при django.setup() и загрузке URL.
+
+Замер идёт в отдельном процессе python -X importtime, который, как
+рабочий процесс перед первым запросом, настраивает Django, создаёт
+WSGI-обработчик с цепочкой middleware и загружает корневой URLconf (с
+api.v1.urls и его DefaultRouter). Интерпретатор пишет время каждого
+импорта в stderr; метки между этапами отделяют импорты одного этапа от
+другого. Пакет модуля настроек импортируется до Django, как при запуске
+через wsgi.py. Модуль не зависит от настроенного Django и используется
+командой startup-profile и бенчмарком запуска.
+"""
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+PHASES = ('setup', 'middleware', 'urls')
+PHASE_MARKER = 'startup-profile phase: '
+IMPORTTIME_PREFIX = 'import time:'
+
+PROBE = f'''
+import json, os, sys, time
+os.environ['DJANGO_SETTINGS_MODULE'] = sys.argv[1]
+start = time.perf_counter()
+__import__(sys.argv[1].split('.')[0])
+import django
+django.setup()
+setup = time.perf_counter()
+print({PHASE_MARKER!r} + 'middleware', file=sys.stderr, flush=True)
+from django.core.handlers.wsgi import WSGIHandler
+WSGIHandler()
+middleware = time.perf_counter()
+print({PHASE_MARKER!r} + 'urls', file=sys.stderr, flush=True)
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+print(json.dumps({{
+    'setup': (setup - start) * 1000,
+    'middleware': (middleware - setup) * 1000,
+    'urls': (urls - middleware) * 1000,
+    'modules': sorted(sys.modules),
+}}))
+'''
+
+
+@dataclass
+class ImportRecord:
+    """Время импорта одного модуля в микросекундах."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    phase: str
+
+
+@dataclass
+class StartupProfile:
+    """Время этапов запуска, импорты и загруженные модули."""
+
+    phases: dict
+    imports: list
+    modules: list
+
+    def top(self, count, sort='cumulative'):
+        """Самые долгие импорты по собственному или полному времени."""
+        key = 'self_us' if sort == 'self' else 'cumulative_us'
+        return sorted(
+            self.imports, key=lambda record: getattr(record, key),
+            reverse=True
+        )[:count]
+
+    def phase_imports(self, phase):
+        """Импорты, выполненные на этапе phase."""
+        return [record for record in self.imports if record.phase == phase]
+
+
+def parse_importtime(lines):
+    """Записи -X importtime из stderr с этапом, к которому они относятся."""
+    phase = PHASES[0]
+    records = []
+    for line in lines:
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            continue
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(IMPORTTIME_PREFIX):].split(
+            '|', 2
+        )
+        if not self_us.strip().isdigit():
+            # Строка заголовка: self [us] | cumulative | imported package.
+            continue
+        module = name.lstrip()
+        records.append(ImportRecord(
+            module, int(self_us), int(cumulative_us),
+            (len(name) - len(module) - 1) // 2, phase
+        ))
+    return records
+
+
+def profile_startup(settings_module, cwd, env=None):
+    """
+    Запускает замер в новом процессе и возвращает StartupProfile.
+
+    env дополняет окружение процесса замера.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, settings_module],
+        cwd=cwd, capture_output=True, text=True,
+        env={**os.environ, **(env or {})},
+    )
+    if result.returncode:
+        raise RuntimeError(
+            f'startup probe failed:\n{result.stderr[-2000:]}'
+        )
+    output = json.loads(result.stdout.splitlines()[-1])
+    return StartupProfile(
+        {phase: output[phase] for phase in PHASES},
+        parse_importtime(result.stderr.splitlines()),
+        output['modules'],
+    )
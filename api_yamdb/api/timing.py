@@ -0,0 +1,85 @@
+"""
+Замеры времени одного запроса.
+
+QueryLogMiddleware ставит на все соединения одну обёртку
+execute_wrapper - QueryLog текущего запроса в ContextVar current_queries.
+Она считает запросы к базе и их время, а метрикам, поиску N+1 и журналу
+медленных запросов передаёт каждый запрос через подписку, чтобы те не
+оборачивали соединения сами.
+
+ServerTimingMiddleware кладёт RequestTimings в ContextVar
+current_timings. Время сериализации собирается обёрткой над
+BaseSerializer.data, которую install_serializer_timing() ставит один раз
+при запуске. Вне запроса обёртка ничего не замеряет.
+"""
+import time
+from contextvars import ContextVar
+
+from rest_framework.serializers import BaseSerializer
+
+current_queries = ContextVar('current_queries', default=None)
+current_timings = ContextVar('current_timings', default=None)
+
+
+class QueryLog:
+    """
+    Запросы к базе одного запроса HTTP: число, время в секундах и
+    подписчики.
+
+    Подписчик вызывается после каждого запроса к базе с аргументами
+    (sql, params, many, context, duration).
+    """
+
+    def __init__(self):
+        """Обнуляет счётчики."""
+        self.queries = 0
+        self.db = 0.0
+        self.observers = []
+
+    def subscribe(self, observer):
+        """Добавляет подписчика до конца запроса HTTP."""
+        self.observers.append(observer)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка execute_wrapper: замеряет запрос и сообщает о нём."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.db += duration
+            self.queries += 1
+            for observer in self.observers:
+                observer(sql, params, many, context, duration)
+
+
+class RequestTimings:
+    """Время сериализации и рендеринга одного запроса в секундах."""
+
+    def __init__(self):
+        """Обнуляет счётчики."""
+        self.serialize = 0.0
+        self.render = 0.0
+        self.serialize_depth = 0
+
+
+def install_serializer_timing():
+    """Замеряет время BaseSerializer.data внешнего сериализатора."""
+    data = BaseSerializer.data
+    if getattr(data.fget, 'timed', False):
+        return
+
+    def timed_data(self):
+        timings = current_timings.get()
+        if timings is None or timings.serialize_depth:
+            return data.fget(self)
+        timings.serialize_depth += 1
+        start = time.perf_counter()
+        try:
+            return data.fget(self)
+        finally:
+            timings.serialize += time.perf_counter() - start
+            timings.serialize_depth -= 1
+
+    timed_data.timed = True
+    BaseSerializer.data = property(timed_data)
@@ -0,0 +1,92 @@
+"""Аутентификация по JWT с кэшем уже проверенных токенов."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.metrics import CACHE_REQUESTS
+
+
+class ValidatedTokenCache:
+    """
+    Ограниченный LRU-кэш проверенных токенов.
+
+    Ключ — sha256 от исходной строки токена, запись живёт до момента,
+    указанного в claim `exp` токена.
+    """
+
+    def __init__(self, max_size):
+        """Создаёт пустой кэш на max_size записей."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Возвращает токен из кэша или None, если его нет или он истёк."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            token, expires_at = item
+            if expires_at <= time.time():
+                del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return token
+
+    def set(self, key, token, expires_at):
+        """Сохраняет токен, вытесняя самую старую запись при переполнении."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = (token, expires_at)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        """Очищает кэш и счётчики."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        """Количество записей в кэше."""
+        return len(self._items)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая не проверяет один и тот же токен повторно.
+
+    Декодирование, проверка подписи и claims выполняются только при первом
+    появлении токена, дальше до истечения `exp` берётся результат из кэша.
+    Пользователь по-прежнему загружается из базы на каждый запрос, поэтому
+    удаление или блокировка учётной записи действуют сразу.
+    """
+
+    token_cache = ValidatedTokenCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+    def get_validated_token(self, raw_token):
+        """Возвращает проверенный токен из кэша или проверяет его заново."""
+        key = hashlib.sha256(raw_token).digest()
+        validated_token = self.token_cache.get(key)
+        CACHE_REQUESTS.inc(
+            cache='jwt_token', result='miss' if validated_token is None
+            else 'hit'
+        )
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            expires_at = validated_token.get('exp')
+            if expires_at is not None:
+                self.token_cache.set(key, validated_token, expires_at)
+        return validated_token
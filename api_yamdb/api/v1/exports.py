@@ -0,0 +1,98 @@
+"""
+Потоковая выгрузка каталога произведений для партнёров.
+
+Произведения читаются кусками по возрастанию id (keyset-пагинация без
+OFFSET и COUNT): на каждый кусок приходится ровно два запроса - сами
+произведения с категорией и рейтингом и слаги их жанров. Каждый кусок
+сразу превращается в текст ответа, поэтому память не зависит от размера
+каталога.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+
+from django.db.models import Avg
+
+from reviews.models import Title, TitleGenre
+
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    'id', 'name', 'year', 'description', 'category', 'genre', 'rating'
+)
+
+
+def iter_title_chunks(chunk_size=None):
+    """Списки произведений в виде словарей колонок EXPORT_COLUMNS."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    last_id = 0
+    while True:
+        titles = list(
+            Title.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .annotate(rating=Avg('reviews__score'))
+            .values('id', 'name', 'year', 'description', 'category__slug',
+                    'rating')[:chunk_size]
+        )
+        if not titles:
+            return
+        genres = defaultdict(list)
+        links = (
+            TitleGenre.objects
+            .filter(title_id__in=[title['id'] for title in titles])
+            .order_by('genre__slug')
+            .values_list('title_id', 'genre__slug')
+        )
+        for title_id, slug in links:
+            if slug is not None:
+                genres[title_id].append(slug)
+
+        yield [
+            {
+                'id': title['id'],
+                'name': title['name'],
+                'year': title['year'],
+                'description': title['description'],
+                'category': title['category__slug'],
+                'genre': genres[title['id']],
+                'rating': (
+                    None if title['rating'] is None else int(title['rating'])
+                ),
+            }
+            for title in titles
+        ]
+        last_id = titles[-1]['id']
+
+
+def ndjson_chunks(chunks):
+    """Каждое произведение - отдельная строка JSON."""
+    for titles in chunks:
+        yield ''.join(
+            json.dumps(title, ensure_ascii=False) + '\n' for title in titles
+        )
+
+
+def csv_chunks(chunks):
+    """Заголовок и строки CSV; жанры перечислены через запятую."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_COLUMNS)
+    for titles in chunks:
+        for title in titles:
+            writer.writerow([
+                ','.join(title['genre']) if column == 'genre'
+                else title[column]
+                for column in EXPORT_COLUMNS
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    'ndjson': (ndjson_chunks, 'application/x-ndjson'),
+    'csv': (csv_chunks, 'text/csv; charset=utf-8'),
+}
@@ -15,6 +15,18 @@ class IsSuperUserOrAdmin(permissions.BasePermission):
         )
 
 
+class IsAdminOrPartner(permissions.BasePermission):
+    """Доступ для администраторов и партнёров."""
+
+    def has_permission(self, request, view):
+        """Проверяет, что пользователь администратор или партнёр."""
+        return (
+            request.user
+            and request.user.is_authenticated
+            and (request.user.is_admin or request.user.is_partner)
+        )
+
+
 class IsAdminModeratorAuthorOrReadOnly(permissions.BasePermission):
     """Доступ для администраторов, модераторов или авторов."""
 
@@ -1,11 +1,15 @@
 """Модуль сериализаторов для API."""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
 from django.contrib.auth.validators import UnicodeUsernameValidator
 
 from reviews.models import Category, Genre, Title, Comment, Review
-from users.models import User
+from users.models import User, UserRole
 
-from users.constants import MAX_USERNAME_LENGTH, MAX_EMAIL_LENGTH
+from users.constants import (
+    MAX_BULK_USERNAMES, MAX_USERNAME_LENGTH, MAX_EMAIL_LENGTH
+)
 from users.validators import validate_username
 
 
@@ -37,22 +41,31 @@ class UserCreateSerializer(serializers.Serializer):
 
     def validate(self, data):
         """Кастомная валидация комбинации username и email."""
-        errors = {}
+        self.user = self.check_conflicts(data['username'], data['email'])
+        return data
 
-        username = data.get('username')
-        email = data.get('email')
+    @staticmethod
+    def check_conflicts(username, email):
+        """
+        Ищет пользователей с тем же username или email одним запросом.
 
-        user_same_username = User.objects.filter(username=username).first()
-        if user_same_username:
-            if user_same_username.email != email:
+        Возвращает уже зарегистрированного пользователя с этой парой
+        username и email или None, если такого ещё нет.
+        """
+        errors = {}
+        existing_user = None
+
+        for user in User.objects.filter(
+            Q(username=username) | Q(email=email)
+        ):
+            if user.username == username and user.email == email:
+                existing_user = user
+            elif user.username == username:
                 errors['username'] = [
                     'Пользователь с таким именем уже существует,'
                     'но с другим email.'
                 ]
-
-        user_same_email = User.objects.filter(email=email).first()
-        if user_same_email:
-            if user_same_email.username != username:
+            else:
                 errors['email'] = [
                     'Пользователь с таким E-mail уже существует, '
                     'но с другим именем.'
@@ -61,7 +74,28 @@ class UserCreateSerializer(serializers.Serializer):
         if errors:
             raise serializers.ValidationError(errors)
 
-        return data
+        return existing_user
+
+    def create(self, validated_data):
+        """
+        Создаёт пользователя или возвращает уже существующего.
+
+        Если параллельный запрос успел создать пользователя между проверкой
+        и вставкой, конфликт разрешается повторной проверкой.
+        """
+        if self.user is not None:
+            return self.user
+
+        username = validated_data['username']
+        email = validated_data['email']
+        try:
+            with transaction.atomic():
+                return User.objects.create(username=username, email=email)
+        except IntegrityError:
+            user = self.check_conflicts(username, email)
+            if user is None:
+                raise
+            return user
 
 
 class UserRecieveTokenSerializer(serializers.Serializer):
@@ -105,6 +139,44 @@ class UserMeSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class UserBulkDataSerializer(serializers.Serializer):
+    """Поля пользователя, которые можно менять массово."""
+
+    role = serializers.ChoiceField(choices=UserRole.choices, required=False)
+    first_name = serializers.CharField(
+        max_length=MAX_USERNAME_LENGTH, required=False, allow_blank=True)
+    last_name = serializers.CharField(
+        max_length=MAX_USERNAME_LENGTH, required=False, allow_blank=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+    is_active = serializers.BooleanField(required=False)
+
+
+class UserBulkSerializer(serializers.Serializer):
+    """Сериализатор для массового изменения и удаления пользователей."""
+
+    ACTION_UPDATE = 'update'
+    ACTION_DELETE = 'delete'
+
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=MAX_USERNAME_LENGTH),
+        allow_empty=False,
+        max_length=MAX_BULK_USERNAMES,
+    )
+    action = serializers.ChoiceField(
+        choices=(ACTION_UPDATE, ACTION_DELETE)
+    )
+    data = UserBulkDataSerializer(required=False)
+
+    def validate(self, data):
+        """Для изменения нужно передать хотя бы одно поле."""
+        if data['action'] == self.ACTION_UPDATE and not data.get('data'):
+            raise serializers.ValidationError(
+                {'data': 'Укажите поля, которые нужно изменить.'}
+            )
+        data['usernames'] = list(dict.fromkeys(data['usernames']))
+        return data
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категорий."""
 
@@ -3,14 +3,30 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 
+from users.models import OutboxMessage
+
 
 def send_email(user) -> None:
-    """Отправка email с кодом подтверждения."""
+    """
+    Отправка email с кодом подтверждения.
+
+    При включённом EMAIL_USE_OUTBOX письмо не отправляется сразу,
+    а ставится в очередь для команды flush_outbox.
+    """
     code = default_token_generator.make_token(user)
 
     subject = 'Ваш код подтверждения'
     message = f'Ваш код: {code}'
 
+    if settings.EMAIL_USE_OUTBOX:
+        OutboxMessage.objects.create(
+            subject=subject,
+            body=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=user.email,
+        )
+        return
+
     send_mail(
         subject,
         message,
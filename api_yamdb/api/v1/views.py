@@ -2,7 +2,9 @@
 
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Avg, Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework import (
@@ -26,13 +28,15 @@ from .serializers import (
     UserRecieveTokenSerializer,
     CategorySerializer, GenreSerializer, TitleSerializer,
     ReviewSerializer, CommentSerializer, UserMeSerializer,
+    UserBulkSerializer,
 )
 from .permissions import (
-    IsSuperUserOrAdmin, IsAdminOrReadOnly,
+    IsSuperUserOrAdmin, IsAdminOrReadOnly, IsAdminOrPartner,
     IsAdminModeratorAuthorOrReadOnly
 )
 from .utils import send_email
-from .viewsets import CategoryGenreBaseViewSet
+from .viewsets import CategoryGenreBaseViewSet, WriteQueueMixin
+from .write_queue import write_queue
 
 User = get_user_model()
 
@@ -48,6 +52,10 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def perform_create(self, serializer):
+        """Созданные администратором пользователи не удаляются очисткой."""
+        serializer.save(is_confirmed=True)
+
     @action(
         methods=['get', 'patch'], detail=False,
         url_path='me', permission_classes=(IsAuthenticated,)
@@ -66,6 +74,49 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(methods=['post'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """
+        Массовое изменение или удаление пользователей по username.
+
+        Свою учётную запись и суперпользователей изменить или удалить
+        этим запросом нельзя: для них возвращается статус refused.
+        """
+        serializer = UserBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        usernames = serializer.validated_data['usernames']
+        bulk_action = serializer.validated_data['action']
+
+        with transaction.atomic():
+            users = User.objects.filter(username__in=usernames)
+            refused = set(
+                users.filter(
+                    Q(pk=request.user.pk) | Q(is_superuser=True)
+                ).values_list('username', flat=True)
+            )
+            users = users.exclude(username__in=refused)
+            found = set(users.values_list('username', flat=True))
+            if bulk_action == UserBulkSerializer.ACTION_DELETE:
+                users.delete()
+                outcome = 'deleted'
+            else:
+                users.update(**serializer.validated_data['data'])
+                outcome = 'updated'
+
+        statuses = {
+            **dict.fromkeys(found, outcome),
+            **dict.fromkeys(refused, 'refused'),
+        }
+        results = [
+            {
+                'username': username,
+                'status': statuses.get(username, 'not_found'),
+            }
+            for username in usernames
+        ]
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -75,10 +126,7 @@ def user_confirmation_view(request):
 
     serializer.is_valid(raise_exception=True)
 
-    username = serializer.validated_data['username']
-    email = serializer.validated_data['email']
-
-    user, _ = User.objects.get_or_create(username=username, email=email)
+    user = write_queue.submit(serializer.save)
 
     send_email(user)
 
@@ -112,11 +160,14 @@ class TokenObtainViewSet(viewsets.GenericViewSet, mixins.CreateModelMixin):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        token = AccessToken.for_user(user, confirmation_code)
+        if not user.is_confirmed:
+            User.objects.filter(pk=user.pk).update(is_confirmed=True)
+
+        token = AccessToken.for_user(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(WriteQueueMixin, viewsets.ModelViewSet):
     """Вьюсет для управления произведениями."""
 
     permission_classes = (IsAdminOrReadOnly,)
@@ -124,7 +175,9 @@ class TitleViewSet(viewsets.ModelViewSet):
     filterset_class = TitleFilter
     search_fields = ('name', 'year', 'category__slug', 'genre__slug')
     http_method_names = ['get', 'post', 'patch', 'delete']
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).annotate(rating=Avg('reviews__score')).order_by(*Title._meta.ordering)
 
     def get_serializer_class(self):
         """Возвращает сериализатор в зависимости от действия."""
@@ -132,6 +185,36 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleListSerializer
         return TitleSerializer
 
+    @action(
+        methods=['get'], detail=False, url_path='export',
+        permission_classes=(IsAuthenticated, IsAdminOrPartner)
+    )
+    def export(self, request):
+        """
+        Потоковая выгрузка всего каталога в NDJSON или CSV.
+
+        Формат задаётся параметром output: параметр format занят
+        согласованием рендереров DRF.
+        """
+        # Нужен только этому действию, поэтому не загружается при запуске.
+        from .exports import EXPORT_FORMATS, iter_title_chunks
+
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {'output': [f'Допустимые значения: '
+                            f'{", ".join(sorted(EXPORT_FORMATS))}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        render, content_type = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(
+            render(iter_title_chunks()), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="titles.{output}"'
+        )
+        return response
+
 
 class CategoryViewSet(CategoryGenreBaseViewSet):
     """Вьюсет для управления категориями."""
@@ -147,10 +230,10 @@ class GenreViewSet(CategoryGenreBaseViewSet):
     queryset = Genre.objects.all()
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(WriteQueueMixin, viewsets.ModelViewSet):
     """Вьюсет для управления отзывами."""
 
-    queryset = Review.objects.all()
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (
@@ -164,13 +247,12 @@ class ReviewViewSet(viewsets.ModelViewSet):
         title_id = self.kwargs.get("title_id")
         return get_object_or_404(Title, pk=title_id)
 
-    def perform_create(self, serializer):
-        """Создаёт отзыв, связывая его с автором и произведением."""
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+    def get_create_kwargs(self):
+        """Связывает создаваемый отзыв с автором и произведением."""
+        return {'author': self.request.user, 'title': self.get_title()}
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(WriteQueueMixin, viewsets.ModelViewSet):
     """Вьюсет для управления комментариями."""
 
     serializer_class = CommentSerializer
@@ -190,9 +272,8 @@ class CommentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Возвращает список комментариев для конкретного отзыва."""
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related('author')
 
-    def perform_create(self, serializer):
-        """Создаёт комментарий, связывая его с автором и отзывом."""
-        review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+    def get_create_kwargs(self):
+        """Связывает создаваемый комментарий с автором и отзывом."""
+        return {'author': self.request.user, 'review': self.get_review()}
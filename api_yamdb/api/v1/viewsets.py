@@ -1,8 +1,38 @@
 """Вьюсеты для API."""
 
+from functools import partial
+
 from rest_framework import viewsets, mixins, filters
 
 from .permissions import IsAdminOrReadOnly
+from .write_queue import write_queue
+
+
+class WriteQueueMixin:
+    """Передаёт создание, изменение и удаление объектов в очередь записи."""
+
+    def get_create_kwargs(self):
+        """
+        Дополнительные поля для serializer.save() при создании.
+
+        Вызывается в потоке запроса, поэтому может искать связанные
+        объекты и отвечать 404 до постановки записи в очередь.
+        """
+        return {}
+
+    def perform_create(self, serializer):
+        """Создаёт объект в потоке очереди записи."""
+        write_queue.submit(
+            partial(serializer.save, **self.get_create_kwargs())
+        )
+
+    def perform_update(self, serializer):
+        """Изменяет объект в потоке очереди записи."""
+        write_queue.submit(partial(super().perform_update, serializer))
+
+    def perform_destroy(self, instance):
+        """Удаляет объект в потоке очереди записи."""
+        write_queue.submit(partial(super().perform_destroy, instance))
 
 
 class CategoryGenreBaseViewSet(viewsets.GenericViewSet,
@@ -0,0 +1,189 @@
+"""
+Очередь записи: все изменения данных выполняет один поток.
+
+SQLite допускает только одного писателя, поэтому параллельные запросы на
+запись из потоков WSGI-сервера соревнуются за блокировку и ждут её
+непредсказуемо долго. Когда WRITE_QUEUE_ENABLED включён, запись
+передаётся в ограниченную очередь и выполняется единственным потоком по
+порядку. Если в очереди уже WRITE_QUEUE_SIZE ожидающих записей, запрос
+сразу получает отказ; если запись не началась до истечения
+WRITE_QUEUE_TIMEOUT, она отменяется и перестаёт занимать место в
+очереди. Начатую запись запрос ждёт ещё до WRITE_QUEUE_WRITE_TIMEOUT
+секунд, после чего получает отказ, а зависшая запись только
+записывается в журнал. Между записями поток закрывает устаревшие и
+сломанные соединения с базой, как это делается после каждого запроса.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.metrics import WRITE_QUEUE_WRITES
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueUnavailable(APIException):
+    """Запись не принята: очередь переполнена или срок ожидания истёк."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Сервис перегружен, повторите запрос позже.'
+    default_code = 'write_queue_unavailable'
+
+
+class WriteJob:
+    """Запись, ожидающая выполнения в потоке очереди."""
+
+    def __init__(self, func):
+        """Запоминает функцию и время постановки в очередь."""
+        self.func = func
+        self.enqueued = time.monotonic()
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.started = False
+        self.cancelled = False
+        self.result = None
+        self.error = None
+
+    def start(self):
+        """Отмечает начало выполнения, если запись ещё не отменена."""
+        with self.lock:
+            if not self.cancelled:
+                self.started = True
+            return self.started
+
+    def cancel(self):
+        """Отменяет запись, если она ещё не начата."""
+        with self.lock:
+            if not self.started:
+                self.cancelled = True
+            return self.cancelled
+
+
+class WriteQueue:
+    """Ограниченная очередь записей с одним потоком-писателем."""
+
+    def __init__(self):
+        """Поток и очередь создаются при первой записи."""
+        self.lock = threading.Lock()
+        self.queue = None
+        self.thread = None
+        self.pending = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Обнуляет счётчики."""
+        with self.lock:
+            self.counters = {
+                'completed': 0, 'failed': 0, 'rejected': 0, 'expired': 0,
+                'timed_out': 0,
+            }
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.depth_max = 0
+
+    def stats(self):
+        """Глубина очереди, исходы записей и время ожидания в очереди."""
+        with self.lock:
+            started = self.counters['completed'] + self.counters['failed']
+            return {
+                'depth': self.pending,
+                'depth_max': self.depth_max,
+                **self.counters,
+                'wait_avg_ms': (
+                    self.wait_total / started * 1000 if started else 0.0
+                ),
+                'wait_max_ms': self.wait_max * 1000,
+            }
+
+    def ensure_thread(self):
+        """Запускает поток-писатель, если он ещё не работает."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                # Ёмкость ограничивает счётчик pending, а не сама очередь:
+                # отменённые записи остаются в ней до выборки потоком, но
+                # места уже не занимают.
+                self.queue = queue.SimpleQueue()
+                self.pending = 0
+                self.thread = threading.Thread(
+                    target=self.run, name='write-queue', daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, func):
+        """
+        Выполняет func в потоке очереди и возвращает её результат.
+
+        Без WRITE_QUEUE_ENABLED func выполняется в текущем потоке.
+        """
+        if not settings.WRITE_QUEUE_ENABLED:
+            return func()
+
+        self.ensure_thread()
+        job = WriteJob(func)
+        with self.lock:
+            accepted = self.pending < settings.WRITE_QUEUE_SIZE
+            if accepted:
+                self.pending += 1
+                self.depth_max = max(self.depth_max, self.pending)
+        if not accepted:
+            self.count('rejected')
+            logger.warning('write queue full, write rejected')
+            raise WriteQueueUnavailable
+        self.queue.put(job)
+
+        if not job.done.wait(settings.WRITE_QUEUE_TIMEOUT) and job.cancel():
+            self.leave()
+            self.count('expired')
+            logger.warning('write expired after %.2fs in the write queue',
+                           settings.WRITE_QUEUE_TIMEOUT)
+            raise WriteQueueUnavailable
+        if not job.done.wait(settings.WRITE_QUEUE_WRITE_TIMEOUT):
+            self.count('timed_out')
+            logger.error('write still running after %.2fs, request released',
+                         settings.WRITE_QUEUE_WRITE_TIMEOUT)
+            raise WriteQueueUnavailable
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def leave(self):
+        """Освобождает место в очереди: запись начата или отменена."""
+        with self.lock:
+            self.pending -= 1
+
+    def count(self, outcome, wait=None):
+        """Увеличивает счётчик исхода и учитывает время ожидания."""
+        WRITE_QUEUE_WRITES.inc(outcome=outcome)
+        with self.lock:
+            self.counters[outcome] += 1
+            if wait is not None:
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
+    def run(self):
+        """Цикл потока-писателя: выполняет записи по одной."""
+        while True:
+            job = self.queue.get()
+            if not job.start():
+                continue
+            self.leave()
+            wait = time.monotonic() - job.enqueued
+            try:
+                job.result = job.func()
+            except BaseException as error:
+                job.error = error
+                self.count('failed', wait)
+            else:
+                self.count('completed', wait)
+            finally:
+                close_old_connections()
+                job.done.set()
+
+
+write_queue = WriteQueue()
@@ -0,0 +1,13 @@
+"""Служебные представления вне версий API."""
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+
+from .metrics import CONTENT_TYPE, registry
+from .v1.permissions import IsSuperUserOrAdmin
+
+
+@api_view(['GET'])
+@permission_classes([IsSuperUserOrAdmin])
+def metrics_view(request):
+    """Метрики всех рабочих процессов в формате Prometheus."""
+    return HttpResponse(registry.exposition(), content_type=CONTENT_TYPE)
@@ -32,6 +32,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryLogMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
+    'api.middleware.NPlusOneMiddleware',
+    'api.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +44,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -72,6 +78,54 @@ DATABASES = {
     }
 }
 
+# PRAGMAs applied to every new SQLite connection (see api/sqlite.py), in
+# this order. WAL lets readers run while a writer commits, busy_timeout
+# makes writers wait for the lock instead of failing with "database is
+# locked", synchronous=NORMAL is durable across crashes in WAL mode.
+# Negative cache_size is in KiB; an empty dict keeps SQLite defaults.
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    'cache_size': -64000,
+    'temp_store': 'memory',
+}
+
+# Read replicas: aliases from DATABASES that serve reads of GET/HEAD/
+# OPTIONS requests (api/db_router.py); writes always go to 'default'.
+# After a write the same user reads from 'default' for
+# REPLICA_STICKY_SECONDS seconds so it sees its own changes. The markers
+# live in the REPLICA_STICKY_CACHE cache, which must be shared by all
+# worker processes: the file cache below serves one host, use memcached
+# when workers run on several hosts.
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 5
+REPLICA_STICKY_CACHE = 'replica-sticky'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'replica-sticky': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'YAMDB_STICKY_CACHE_DIR', BASE_DIR / '.cache' / 'replica-sticky'
+        ),
+    },
+}
+
+# Run title, review, comment and signup writes in one writer thread
+# (api/v1/write_queue.py). Writes beyond WRITE_QUEUE_SIZE waiting ones
+# get 503 at once; a write not started within WRITE_QUEUE_TIMEOUT seconds
+# is cancelled with 503. A started write that runs longer than
+# WRITE_QUEUE_WRITE_TIMEOUT seconds releases its request with 503.
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_SIZE = 64
+WRITE_QUEUE_TIMEOUT = 2.0
+WRITE_QUEUE_WRITE_TIMEOUT = 30.0
+
 
 # Password validation
 
@@ -122,7 +176,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
@@ -136,8 +190,71 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Validated JWTs kept in per-process memory (0 disables the cache).
+JWT_TOKEN_CACHE_SIZE = 1024
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'admin@yamdb.com'
+
+# Queue emails in users.OutboxMessage instead of sending them inline;
+# `manage.py flush_outbox` delivers the queue in batches.
+EMAIL_USE_OUTBOX = False
+
+# Where `manage.py snapshot` keeps point-in-time copies of the SQLite
+# database.
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
+# Server-Timing header and an `api.timing` log line with query count, DB,
+# serializer and render time per request (api/middleware.py). Exposes
+# timings to every client, so off unless YAMDB_SERVER_TIMING=1.
+SERVER_TIMING_ENABLED = os.getenv('YAMDB_SERVER_TIMING', '0') == '1'
+
+# Report SQL statements repeated more than NPLUSONE_THRESHOLD times in one
+# request (api/nplusone.py): 'warn' logs them to `api.nplusone`, 'raise'
+# fails the request. Walks the stack on every query, so dev only.
+NPLUSONE_ENABLED = DEBUG
+NPLUSONE_THRESHOLD = 10
+NPLUSONE_ACTION = 'warn'
+
+# Request latency, status codes, query counts and cache hits served in the
+# Prometheus text format at the admin-only /metrics (api/metrics.py).
+# Each worker process rewrites METRICS_DIR/<pid>.json at most every
+# METRICS_FLUSH_INTERVAL seconds and moves its values into
+# METRICS_DIR/aggregate.json when it exits; /metrics sums all the files.
+# The directory belongs to one deployment: never share it between
+# servers or test runs.
+METRICS_ENABLED = os.getenv('YAMDB_METRICS', '1') == '1'
+METRICS_DIR = os.getenv('YAMDB_METRICS_DIR', os.path.join(BASE_DIR, 'metrics'))
+METRICS_FLUSH_INTERVAL = 5
+
+# Log queries slower than SLOW_QUERY_THRESHOLD_MS with their view,
+# normalized SQL and EXPLAIN QUERY PLAN (api/slow_queries.py) to a JSON
+# lines file rotated at SLOW_QUERY_LOG_MAX_BYTES. Only a
+# SLOW_QUERY_SAMPLE_RATE share of slow queries is explained and logged,
+# since each EXPLAIN is one more query. Off unless YAMDB_SLOW_QUERIES=1.
+# `manage.py slow-queries` lists the worst offenders.
+SLOW_QUERY_ENABLED = os.getenv('YAMDB_SLOW_QUERIES', '0') == '1'
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = float(
+    os.getenv('YAMDB_SLOW_QUERY_SAMPLE_RATE', '0.05')
+)
+SLOW_QUERY_LOG = os.getenv(
+    'YAMDB_SLOW_QUERY_LOG', os.path.join(BASE_DIR, 'slow-queries.log')
+)
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 2 ** 20
+SLOW_QUERY_LOG_BACKUPS = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+        'api.nplusone': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
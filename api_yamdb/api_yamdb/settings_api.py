@@ -0,0 +1,45 @@
+"""
+Облегчённые настройки процессов, которые обслуживают только /api/.
+
+API аутентифицирует клиентов по JWT и отвечает JSON, поэтому ему не
+нужны админка, сессии, сообщения, статика, CSRF и защита от
+кликджекинга, а также HTML-рендерер DRF. Админка по-прежнему работает
+через полный профиль api_yamdb.settings (wsgi.py), а этот профиль
+запускается через wsgi_api.py.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+# Only needed by the admin, the browsable API and the static pages.
+UNUSED_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+UNUSED_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in UNUSED_MIDDLEWARE
+]
+
+ROOT_URLCONF = 'api_yamdb.urls_api'
+WSGI_APPLICATION = 'api_yamdb.wsgi_api.application'
+
+TEMPLATES = []
+
+# The N+1 inspector walks the stack on every query; never load it here.
+NPLUSONE_ENABLED = False
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',),
+}
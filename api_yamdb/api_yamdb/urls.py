@@ -1,12 +1,15 @@
 """
 Основной файл маршрутов для проекта.
 
-Определяет маршруты для административной панели и приложения API.
+Определяет маршруты для административной панели, приложения API и
+метрик сервиса.
 """
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -15,4 +18,5 @@ urlpatterns = [
         name='redoc'
     ),
     path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
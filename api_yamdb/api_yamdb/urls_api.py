@@ -0,0 +1,9 @@
+"""Маршруты облегчённого профиля settings_api: только API и метрики."""
+from django.urls import include, path
+
+from api.views import metrics_view
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
+]
@@ -0,0 +1,14 @@
+"""
+WSGI config for the API-only YaMDb processes.
+
+Serves /api/ with the lean api_yamdb.settings_api profile; the admin is
+served by the full profile in wsgi.py.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings_api')
+
+application = get_wsgi_application()
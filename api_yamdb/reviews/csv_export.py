@@ -0,0 +1,104 @@
+"""
+Потоковая выгрузка таблиц командой export-db.
+
+Таблицы описаны теми же CsvTable, что и при импорте, поэтому выгруженные
+CSV-файлы повторяют колонки static/data/*.csv и загружаются обратно
+командой parse-db. Записи читаются из базы кусками через iterator() и
+сразу пишутся в файл, так что память не зависит от размера таблицы.
+"""
+import bz2
+import csv
+import gzip
+import json
+import lzma
+from datetime import datetime
+
+COMPRESSED_WRITERS = {
+    'gz': lambda path: gzip.open(path, 'wt', encoding='utf-8', newline=''),
+    'bz2': lambda path: bz2.open(path, 'wt', encoding='utf-8', newline=''),
+    'xz': lambda path: lzma.open(path, 'wt', encoding='utf-8', newline=''),
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+def open_output(path, compress=None):
+    """Открывает файл для записи текста, при необходимости со сжатием."""
+    if compress:
+        return COMPRESSED_WRITERS[compress](path)
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_file_name(table, fmt, compress=None):
+    """Имя выгружаемого файла: users.csv, users.ndjson.gz и т. п."""
+    name = table.file_name
+    if fmt != 'csv':
+        name = name.replace('.csv', f'.{fmt}')
+    return f'{name}.{compress}' if compress else name
+
+
+def format_value(value):
+    """Значение колонки в том виде, в каком оно записано в исходных CSV."""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='milliseconds').replace(
+            '+00:00', 'Z'
+        )
+    return value
+
+
+def iter_rows(table, chunk_size):
+    """Значения колонок всех записей таблицы в порядке id."""
+    rows = (
+        table.model.objects.order_by('pk')
+        .values_list(*table.fields)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield [format_value(value) for value in row]
+
+
+def write_csv(output, table, rows):
+    """Пишет заголовок и строки в формате CSV."""
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(table.header)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_ndjson(output, table, rows):
+    """Пишет каждую строку отдельным JSON-объектом с ключами заголовка."""
+    count = 0
+    for row in rows:
+        output.write(
+            json.dumps(dict(zip(table.header, row)), ensure_ascii=False)
+            + '\n'
+        )
+        count += 1
+    return count
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+}
+
+
+def export_table(table, path, fmt='csv', compress=None, chunk_size=2000):
+    """
+    Выгружает таблицу в файл и возвращает число записей.
+
+    Данные пишутся во временный файл рядом с итоговым и переименовываются
+    только после успешной записи, чтобы не оставить обрезанную выгрузку.
+    """
+    partial_path = path.with_name(f'{path.name}.part')
+    try:
+        with open_output(partial_path, compress) as output:
+            count = WRITERS[fmt](output, table, iter_rows(table, chunk_size))
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    partial_path.replace(path)
+    return count
@@ -0,0 +1,147 @@
+"""
+Предварительная проверка CSV-файлов перед импортом.
+
+Все файлы читаются один раз в порядке зависимостей, до первой записи в
+базу. Уникальность и ссылки между файлами проверяются по множествам в
+памяти: из базы один раз загружаются id и значения уникальных ключей
+(slug, username, email, пары внешних ключей) уже существующих записей.
+Отклонённая строка не попадает в множество принятых id, поэтому вместе
+с ней отклоняются и ссылающиеся на неё строки следующих файлов.
+"""
+import json
+
+from django.core.exceptions import ValidationError
+
+from reviews.csv_import import TABLES, CsvSource, checkpoint_position
+
+
+class RowReject(Exception):
+    """Причина, по которой строка не может быть импортирована."""
+
+    def __init__(self, field, reason):
+        """Запоминает поле и причину отказа."""
+        super().__init__(reason)
+        self.field = field
+        self.reason = reason
+
+
+def key_value(values, key):
+    """Значение ключа: само значение для одного поля, кортеж для нескольких."""
+    if len(key) == 1:
+        return values[key[0]]
+    return tuple(values[field] for field in key)
+
+
+def load_existing_keys():
+    """
+    Загружает значения уникальных ключей записей, уже находящихся в базе.
+
+    Возвращает словарь модель -> ключ -> множество значений; значения
+    ключа ('id',) служат и для проверки внешних ключей.
+    """
+    return {
+        table.model: {
+            key: set(
+                table.model.objects.values_list(*key, flat=len(key) == 1)
+                .order_by().iterator()
+            )
+            for key in table.unique_keys
+        }
+        for table in TABLES
+    }
+
+
+def check_unique(table, values, seen, existing, mode):
+    """
+    Проверяет уникальные ключи строки среди файла и базы.
+
+    В режиме insert строка не должна повторять значение уникального
+    ключа записи в базе; в режиме upsert такие строки обновляют запись
+    или пропускаются при записи как конфликты.
+    """
+    if mode == 'insert':
+        for key, keys_existing in existing[table.model].items():
+            if key_value(values, key) in keys_existing:
+                raise RowReject(
+                    ','.join(key), 'value already exists in the database'
+                )
+
+    for key, keys_seen in seen.items():
+        if key_value(values, key) in keys_seen:
+            raise RowReject(','.join(key), 'duplicate value in the file')
+
+
+def check_row(table, row, seen, accepted, existing, mode):
+    """Проверяет одну строку и возвращает её значения или RowReject."""
+    try:
+        values = table.convert(row)
+    except ValueError as error:
+        raise RowReject(None, str(error))
+
+    try:
+        table.validate(values)
+    except ValidationError as error:
+        field, messages = next(iter(error.message_dict.items()))
+        raise RowReject(field, '; '.join(messages))
+
+    check_unique(table, values, seen, existing, mode)
+
+    for field, model in table.foreign_keys:
+        value = values[field]
+        if (value not in accepted[model]
+                and value not in existing[model][('id',)]):
+            raise RowReject(field, f'unknown {model.__name__} id {value}')
+
+    return values
+
+
+def prevalidate(paths, mode, report_file=None, checkpoints=None):
+    """
+    Проверяет все файлы и возвращает отклонённые строки по файлам.
+
+    Каждая отклонённая строка записывается в report_file отдельной
+    JSON-строкой с полями file, line, id, field и reason.
+
+    С контрольными точками продолжаемого импорта проверяется только
+    незаписанная часть: загруженные файлы пропускаются, остальные
+    читаются с сохранённой позиции в режиме, в котором импорт был начат.
+    Уже записанные строки находятся в базе и учитываются как
+    существующие записи.
+    """
+    existing = load_existing_keys()
+    checkpoints = checkpoints or {}
+    accepted = {}
+    rejected = {}
+
+    for table in TABLES:
+        rejected_lines = rejected[table.file_name] = set()
+        seen = {key: set() for key in table.unique_keys}
+        # Множество id файла одновременно служит множеством принятых строк.
+        accepted[table.model] = seen[('id',)]
+        checkpoint = checkpoints.get(table.file_name)
+        if checkpoint is not None and checkpoint.completed:
+            continue
+        table_mode = checkpoint.mode if checkpoint else mode
+        position = checkpoint_position(checkpoint) if checkpoint else {}
+        with CsvSource(paths[table.file_name], **position) as source:
+            for line, row in source.rows():
+                try:
+                    values = check_row(
+                        table, row, seen, accepted, existing, table_mode
+                    )
+                except RowReject as reject:
+                    rejected_lines.add(line)
+                    if report_file is not None:
+                        report_file.write(json.dumps({
+                            'file': table.file_name,
+                            'line': line,
+                            'id': row[0] if row else None,
+                            'field': reject.field,
+                            'reason': reject.reason,
+                        }, ensure_ascii=False) + '\n')
+                    continue
+
+                for key, keys_seen in seen.items():
+                    keys_seen.add(key_value(values, key))
+
+    return rejected
@@ -0,0 +1,225 @@
+"""
+Генерация синтетических данных командой generate-data.
+
+Строки создаются в том же виде, что и при импорте CSV: словари значений
+для CsvTable, которые вставляются пакетами через bulk_create. Все
+случайные значения берутся из одного random.Random, поэтому одно и то же
+зерно даёт одни и те же данные. Число отзывов на произведение и
+комментариев на отзыв распределено по закону Ципфа: несколько популярных
+произведений собирают большую часть отзывов, как в реальной базе.
+Даты отзывов разбросаны по последним days дням, комментарий всегда
+позже своего отзыва.
+"""
+import random
+from array import array
+from datetime import timedelta
+
+from django.utils import timezone
+
+from users.models import UserRole
+
+CATEGORIES = (
+    ('Фильм', 'movie'),
+    ('Книга', 'book'),
+    ('Музыка', 'music'),
+    ('Сериал', 'series'),
+    ('Игра', 'game'),
+)
+
+GENRES = (
+    ('Драма', 'drama'),
+    ('Комедия', 'comedy'),
+    ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'),
+    ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'),
+    ('Триллер', 'thriller'),
+    ('Сказка', 'tale'),
+    ('Гонзо', 'gonzo'),
+    ('Роман', 'roman'),
+    ('Баллада', 'ballad'),
+    ('Рок-н-ролл', 'rock-n-roll'),
+    ('Классика', 'classical'),
+    ('Рок', 'rock'),
+    ('Шансон', 'chanson'),
+)
+
+TITLE_ADJECTIVES = (
+    'Красный', 'Последний', 'Тихий', 'Северный', 'Золотой', 'Бесконечный',
+    'Далёкий', 'Старый', 'Ночной', 'Забытый', 'Железный', 'Весенний',
+)
+
+TITLE_NOUNS = (
+    'дом', 'берег', 'город', 'ветер', 'сад', 'поезд', 'океан', 'лес',
+    'маяк', 'остров', 'путь', 'рассвет', 'мост', 'замок', 'сон',
+)
+
+FIRST_NAMES = (
+    'Александр', 'Мария', 'Иван', 'Анна', 'Дмитрий', 'Елена', 'Сергей',
+    'Ольга', 'Михаил', 'Татьяна', 'Андрей', 'Наталья', 'Павел', 'Ирина',
+)
+
+LAST_NAMES = (
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев',
+    'Козлов', 'Новиков', 'Морозов', 'Петров', 'Волков', 'Соловьёв',
+)
+
+REVIEW_PHRASES = (
+    'Смотрел на одном дыхании.', 'Сюжет предсказуем, но актёры хороши.',
+    'Не понравилось, слишком затянуто.', 'Пересматриваю каждый год.',
+    'Музыка лучше, чем всё остальное.', 'Финал испортил впечатление.',
+    'Неожиданно глубокая вещь.', 'Рекомендую всем друзьям.',
+    'Ожидал большего от автора.', 'Классика, которая не стареет.',
+)
+
+COMMENT_PHRASES = (
+    'Полностью согласен!', 'Вы что, серьёзно?', 'Спасибо за отзыв.',
+    'А мне как раз понравилось.', 'Странное мнение.', 'Плюсую.',
+    'Не соглашусь с оценкой.', 'Теперь хочу посмотреть.',
+)
+
+MIN_YEAR = 1920
+MODERATOR_SHARE = 0.01
+
+
+def zipf_counts(total, size, skew, rng):
+    """
+    Делит total между size позициями по закону Ципфа.
+
+    Доля позиции ранга r пропорциональна 1 / r ** skew. Дробная часть
+    округляется случайно, поэтому сумма в среднем равна total, а счётчики
+    выдаются по одному и не хранятся списком.
+    """
+    norm = sum(rank ** -skew for rank in range(1, size + 1))
+    for rank in range(1, size + 1):
+        expected = total * rank ** -skew / norm
+        count = int(expected)
+        if rng.random() < expected - count:
+            count += 1
+        yield count
+
+
+class DataGenerator:
+    """Источник синтетических строк для всех таблиц."""
+
+    def __init__(self, seed, reviews_per_title, comments_per_review, skew,
+                 days=365):
+        """Запоминает параметры распределений и создаёт генератор."""
+        self.random = random.Random(seed)
+        self.reviews_per_title = reviews_per_title
+        self.comments_per_review = comments_per_review
+        self.skew = skew
+        self.now = timezone.now()
+        self.span = timedelta(days=days).total_seconds()
+        # Возраст каждого отзыва в секундах: компактный массив вместо
+        # списка дат, отзывов могут быть миллионы.
+        self.review_ages = array('d')
+
+    @property
+    def review_count(self):
+        """Число отзывов, созданных последним вызовом reviews()."""
+        return len(self.review_ages)
+
+    def phrase(self, phrases, words):
+        """Текст из нескольких случайных фраз."""
+        return ' '.join(self.random.choice(phrases) for _ in range(words))
+
+    def users(self, ids):
+        """Пользователи с кириллическими именами."""
+        for user_id in ids:
+            role = (
+                UserRole.MODERATOR
+                if self.random.random() < MODERATOR_SHARE
+                else UserRole.USER
+            )
+            yield {
+                'id': user_id,
+                'username': f'user{user_id}',
+                'email': f'user{user_id}@yamdb.fake',
+                'role': role,
+                'bio': '',
+                'first_name': self.random.choice(FIRST_NAMES),
+                'last_name': self.random.choice(LAST_NAMES),
+            }
+
+    def titles(self, ids, category_ids):
+        """Произведения со случайными названием, годом и категорией."""
+        for title_id in ids:
+            yield {
+                'id': title_id,
+                'name': (
+                    f'{self.random.choice(TITLE_ADJECTIVES)} '
+                    f'{self.random.choice(TITLE_NOUNS)} {title_id}'
+                ),
+                'year': self.random.randint(MIN_YEAR, self.now.year),
+                'category_id': self.random.choice(category_ids),
+            }
+
+    def genre_titles(self, first_id, title_ids, genre_ids):
+        """От одного до трёх разных жанров на произведение."""
+        link_id = first_id
+        for title_id in title_ids:
+            count = min(self.random.randint(1, 3), len(genre_ids))
+            for genre_id in self.random.sample(genre_ids, count):
+                yield {'id': link_id, 'title_id': title_id,
+                       'genre_id': genre_id}
+                link_id += 1
+
+    def reviews(self, first_id, title_ids, user_ids):
+        """
+        Отзывы, распределённые по произведениям по закону Ципфа.
+
+        Популярность не связана с id: ранги достаются произведениям в
+        случайном порядке. У отзывов одного произведения разные авторы,
+        поэтому их не больше, чем пользователей.
+        """
+        ranked = list(title_ids)
+        self.random.shuffle(ranked)
+        counts = zipf_counts(
+            self.reviews_per_title * len(ranked), len(ranked), self.skew,
+            self.random
+        )
+        self.review_ages = array('d')
+        review_id = first_id
+        for title_id, count in zip(ranked, counts):
+            authors = self.random.sample(user_ids, min(count, len(user_ids)))
+            for author_id in authors:
+                age = self.random.uniform(0, self.span)
+                self.review_ages.append(age)
+                yield {
+                    'id': review_id,
+                    'title_id': title_id,
+                    'text': self.phrase(REVIEW_PHRASES, 3),
+                    'author_id': author_id,
+                    'score': self.random.randint(1, 10),
+                    'pub_date': self.now - timedelta(seconds=age),
+                }
+                review_id += 1
+
+    def comments(self, first_id, first_review_id, user_ids):
+        """
+        Комментарии к отзывам, созданным последним вызовом reviews().
+
+        Больше всего комментариев у первых отзывов, то есть у отзывов на
+        самые популярные произведения. Комментарий написан между датой
+        отзыва и текущим моментом.
+        """
+        counts = zipf_counts(
+            self.comments_per_review * self.review_count, self.review_count,
+            self.skew, self.random
+        )
+        comment_id = first_id
+        for review_id, count, review_age in zip(
+            range(first_review_id, first_review_id + self.review_count),
+            counts, self.review_ages
+        ):
+            for _ in range(count):
+                age = self.random.uniform(0, review_age)
+                yield {
+                    'id': comment_id,
+                    'review_id': review_id,
+                    'text': self.phrase(COMMENT_PHRASES, 2),
+                    'author_id': self.random.choice(user_ids),
+                    'pub_date': self.now - timedelta(seconds=age),
+                }
+                comment_id += 1
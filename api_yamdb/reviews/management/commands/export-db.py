@@ -0,0 +1,65 @@
+"""Команда для выгрузки данных из базы в CSV или NDJSON файлы."""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.csv_export import (
+    COMPRESSED_WRITERS, FORMATS, export_file_name, export_table
+)
+from reviews.csv_import import TABLES
+
+
+class Command(BaseCommand):
+    """Выгружает все таблицы в колонках файлов static/data."""
+
+    help = 'Export every table as CSV (parse-db layout) or NDJSON'
+
+    def add_arguments(self, parser):
+        """Параметры выгрузки."""
+        parser.add_argument(
+            'output_dir', type=Path,
+            help='Directory for the exported files.'
+        )
+        parser.add_argument(
+            '--format', dest='fmt', choices=FORMATS, default='csv',
+            help='csv - same columns as static/data/*.csv; ndjson - one '
+                 'JSON object per line.'
+        )
+        parser.add_argument(
+            '--compress', choices=sorted(COMPRESSED_WRITERS),
+            help='Compress every file with gzip, bzip2 or xz.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows fetched from the database at a time.'
+        )
+
+    def handle(self, *args, **options):
+        """Выгружает таблицы из одного согласованного снимка базы."""
+        output_dir = options['output_dir']
+        if not output_dir.is_dir():
+            raise CommandError(f'{output_dir} is not a directory')
+
+        total_start = time.monotonic()
+        with transaction.atomic():
+            for table in TABLES:
+                path = output_dir / export_file_name(
+                    table, options['fmt'], options['compress']
+                )
+                start = time.monotonic()
+                count = export_table(
+                    table, path, options['fmt'], options['compress'],
+                    options['chunk_size']
+                )
+                elapsed = time.monotonic() - start
+                rate = count / elapsed if elapsed else 0
+                self.stdout.write(
+                    f'{path.name}: {count} rows in {elapsed:.2f}s '
+                    f'({rate:.0f} rows/sec)'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Data exported in {time.monotonic() - total_start:.2f}s'
+        ))
@@ -1,7 +1,26 @@
 """Команда для импорта данных из CSV файлов в базу данных."""
-import csv
-from django.core.management.base import BaseCommand
-from reviews.models import User, Title, Category, Genre, Review, Comment
+import multiprocessing
+import queue
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.csv_import import (
+    STAGES, TABLES, WRITERS, CsvSource, ImportRowError, checkpoint_position,
+    file_checksum, find_data_file, iter_batches, prepare_file,
+    save_checkpoint, start_checkpoint, written_rows
+)
+from reviews.csv_validation import prevalidate
+
+
+def file_mode(checkpoint, options):
+    """Режим записи файла: сохранённый в контрольной точке или из опций."""
+    return checkpoint.mode if checkpoint else options['mode']
 
 
 class Command(BaseCommand):
@@ -9,73 +28,359 @@ class Command(BaseCommand):
 
     help = 'Parse data from CSV files and insert into the database'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        """Параметры импорта."""
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows inserted by one bulk_create() call.'
+        )
+        parser.add_argument(
+            '--data-dir', type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Directory with the CSV files, optionally compressed '
+                 '(.gz, .bz2, .xz).'
+        )
+        parser.add_argument(
+            '--progress-interval', type=float, default=5,
+            help='Seconds between progress lines.'
+        )
+        parser.add_argument(
+            '--mode', choices=sorted(WRITERS), default='insert',
+            help='insert - plain bulk insert; upsert - insert new rows and '
+                 'update changed ones by id, skipping unchanged rows.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Parse independent files of each stage in this many '
+                 'processes while one writer inserts (0 - sequential).'
+        )
+        parser.add_argument(
+            '--reject-report', type=Path,
+            default=Path('parse-db-rejects.ndjson'),
+            help='Where the validation pass writes rejected rows as NDJSON.'
+        )
+        parser.add_argument(
+            '--skip-rejected', action='store_true',
+            help='Import the valid rows instead of aborting on rejects.'
+        )
+        parser.add_argument(
+            '--validate-only', action='store_true',
+            help='Run the validation pass and stop before writing.'
+        )
+        parser.add_argument(
+            '--skip-validation', action='store_true',
+            help='Do not run the validation pass before importing.'
+        )
+        parser.add_argument(
+            '--checkpoint', action='store_true',
+            help='Commit every batch together with a per-file checkpoint '
+                 'instead of one transaction per file.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue from the saved checkpoints, skipping files and '
+                 'rows already committed, in the mode the import was '
+                 'started with (implies --checkpoint).'
+        )
+
+    def handle(self, *args, **options):
         """Обрабатывает CSV файлы, добавляет данные в модели."""
-        csv_files = [
-            'users.csv',
-            'category.csv',
-            'genre.csv',
-            'titles.csv',
-            'genre_title.csv',
-            'review.csv',
-            'comments.csv',
-        ]
+        try:
+            paths = {
+                table.file_name: find_data_file(
+                    options['data_dir'], table.file_name
+                )
+                for table in TABLES
+            }
+        except FileNotFoundError as error:
+            raise CommandError(error)
 
-        for file in csv_files:
-            with open(f'static/data/{file}', newline='',
-                      encoding='utf-8') as csvfile:
-                data = csv.reader(csvfile)
-                next(data)  # Skip the header row
-                for row in data:
-                    if file == 'users.csv':
-                        User.objects.create(
-                            id=int(row[0]),
-                            username=row[1],
-                            email=row[2],
-                            role=row[3],
-                            bio=row[4],
-                            first_name=row[5],
-                            last_name=row[6]
-                        )
-                    elif file == 'titles.csv':
-                        Title.objects.create(
-                            id=int(row[0]),
-                            name=row[1],
-                            year=int(row[2]),
-                            category_id=int(row[3])
-                        )
-                    elif file == 'category.csv':
-                        Category.objects.create(
-                            id=int(row[0]),
-                            name=row[1],
-                            slug=row[2]
-                        )
-                    elif file == 'genre.csv':
-                        Genre.objects.create(
-                            id=int(row[0]),
-                            name=row[1],
-                            slug=row[2]
-                        )
-                    elif file == 'review.csv':
-                        Review.objects.create(
-                            id=int(row[0]),
-                            title_id=int(row[1]),
-                            text=row[2],
-                            author_id=int(row[3]),
-                            score=int(row[4]),
-                            pub_date=row[5]
+        if options['resume']:
+            options['checkpoint'] = True
+        checkpoints = {}
+        if options['resume'] or (
+            options['checkpoint'] and not options['validate_only']
+        ):
+            checkpoints = {
+                table.file_name: self.open_checkpoint(
+                    table, paths[table.file_name], options
+                )
+                for table in TABLES
+            }
+        rejected = {}
+        if not options['skip_validation']:
+            rejected = self.validate(paths, checkpoints, options)
+            if options['validate_only']:
+                return
+
+        if options['workers'] > 0:
+            self.import_parallel(paths, rejected, checkpoints, options)
+        else:
+            self.import_sequential(paths, rejected, checkpoints, options)
+
+        self.stdout.write(self.style.SUCCESS('Data imported successfully'))
+
+    def validate(self, paths, checkpoints, options):
+        """
+        Проверяет файлы до начала записи и сохраняет отчёт об отказах.
+
+        При продолжении проверяется только часть файлов после контрольных
+        точек. Без --skip-rejected любая отклонённая строка прерывает
+        импорт.
+        """
+        start = time.monotonic()
+        report_path = options['reject_report']
+        with open(report_path, 'w', encoding='utf-8') as report_file:
+            rejected = prevalidate(
+                paths, options['mode'], report_file, checkpoints
+            )
+        total = sum(len(lines) for lines in rejected.values())
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            f'validation: {total} rows rejected in {elapsed:.2f}s'
+        )
+        if not total:
+            report_path.unlink()
+            return rejected
+
+        for file_name, lines in rejected.items():
+            if lines:
+                self.stdout.write(f'{file_name}: {len(lines)} rejected')
+        if not options['skip_rejected'] and not options['validate_only']:
+            raise CommandError(
+                f'{total} rows rejected, nothing was written; see '
+                f'{report_path} or rerun with --skip-rejected'
+            )
+        self.stdout.write(f'reject report: {report_path}')
+        return rejected
+
+    def import_sequential(self, paths, rejected, checkpoints, options):
+        """Загружает файлы по одному в порядке зависимостей."""
+        for table in TABLES:
+            path = paths[table.file_name]
+            checkpoint = checkpoints.get(table.file_name)
+            if checkpoint is not None and checkpoint.completed:
+                continue
+            start = time.monotonic()
+            try:
+                stats = self.import_table(
+                    table, path, rejected.get(table.file_name), checkpoint,
+                    options
+                )
+            except ImportRowError as error:
+                raise CommandError(error)
+            elapsed = time.monotonic() - start
+            count = sum(stats.values())
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{table.file_name}: {count} rows in {elapsed:.2f}s '
+                f'({rate:.0f} rows/sec)'
+                f'{self.format_stats(stats, file_mode(checkpoint, options))}'
+            )
+
+    def open_checkpoint(self, table, path, options):
+        """
+        Возвращает контрольную точку файла или None без --checkpoint.
+
+        Сообщает, если файл уже загружен или импорт продолжается с середины.
+        """
+        if not options['checkpoint']:
+            return None
+        checkpoint = start_checkpoint(
+            table.file_name, file_checksum(path), options['resume'],
+            options['mode']
+        )
+        if checkpoint.completed:
+            self.stdout.write(f'{table.file_name}: already imported, skipped')
+        elif checkpoint.line:
+            self.stdout.write(
+                f'{table.file_name}: resuming after '
+                f'{checkpoint.rows_committed} rows (line {checkpoint.line}, '
+                f'{checkpoint.mode} mode)'
+            )
+        return checkpoint
+
+    def import_table(self, table, path, rejected, checkpoint, options):
+        """
+        Загружает один файл пакетами.
+
+        Без контрольной точки весь файл пишется в одной транзакции, с ней
+        каждый пакет коммитится вместе с обновлением контрольной точки.
+        """
+        write = WRITERS[file_mode(checkpoint, options)]
+        stats = Counter()
+        start = reported = time.monotonic()
+        position = checkpoint_position(checkpoint) if checkpoint else {}
+        file_atomic = nullcontext() if checkpoint else transaction.atomic()
+        with CsvSource(path, **position) as source, file_atomic:
+            batches = iter_batches(
+                table, source, options['batch_size'], rejected or frozenset()
+            )
+            for batch in batches:
+                with transaction.atomic() if checkpoint else nullcontext():
+                    batch_stats = write(table, batch)
+                    if checkpoint:
+                        save_checkpoint(
+                            checkpoint, source.position,
+                            written_rows(batch_stats)
                         )
-                    elif file == 'comments.csv':
-                        Comment.objects.create(
-                            id=int(row[0]),
-                            review_id=int(row[1]),
-                            text=row[2],
-                            author_id=int(row[3]),
-                            pub_date=row[4]
+                stats += batch_stats
+                now = time.monotonic()
+                if now - reported >= options['progress_interval']:
+                    reported = now
+                    self.report_progress(
+                        table, sum(stats.values()), source.progress,
+                        now - start
+                    )
+            if checkpoint:
+                save_checkpoint(checkpoint, source.position, completed=True)
+        return stats
+
+    def format_stats(self, stats, mode):
+        """Разбивка строк по исходам для режима upsert."""
+        if mode != 'upsert':
+            return ''
+        return (
+            f': created {stats["created"]}, updated {stats["updated"]}, '
+            f'unchanged {stats["unchanged"]}, '
+            f'conflicts {stats["conflicts"]}'
+        )
+
+    def report_progress(self, table, count, progress, elapsed):
+        """Выводит долю прочитанного файла, скорость и оставшееся время."""
+        eta = elapsed / progress - elapsed if progress else 0
+        self.stdout.write(
+            f'{table.file_name}: {progress:.0%}, {count} rows, '
+            f'{count / elapsed:.0f} rows/sec, '
+            f'ETA {time.strftime("%H:%M:%S", time.gmtime(eta))}'
+        )
+
+    def import_parallel(self, paths, rejected, checkpoints, options):
+        """
+        Загружает данные по этапам графа зависимостей.
+
+        Файлы одного этапа разбираются в отдельных процессах, а все вставки
+        выполняет основной процесс в одной транзакции на этап.
+        """
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            raise CommandError('--workers requires the fork start method')
+        total_start = time.monotonic()
+
+        for number, stage in enumerate(STAGES, 1):
+            start = time.monotonic()
+            stats, write_time = self.import_stage(
+                stage, paths, rejected, checkpoints, context, options
+            )
+            elapsed = time.monotonic() - start
+            files = ', '.join(
+                f'{file_name} {sum(file_stats.values())} rows'
+                + self.format_stats(
+                    file_stats,
+                    file_mode(checkpoints.get(file_name), options)
+                )
+                for file_name, file_stats in stats.items()
+            )
+            self.stdout.write(
+                f'stage {number}: {elapsed:.2f}s wall, '
+                f'{write_time:.2f}s writing ({files})'
+            )
+
+        self.stdout.write(
+            f'total: {time.monotonic() - total_start:.2f}s wall'
+        )
+
+    def import_stage(self, stage, paths, rejected, checkpoints, context,
+                     options):
+        """
+        Разбирает файлы этапа в процессах и записывает их пакеты.
+
+        Без контрольных точек этап пишется в одной транзакции, с ними
+        каждый пакет коммитится вместе с позицией своего файла.
+        """
+        tables = {table.file_name: table for table in TABLES}
+        checkpoints = {
+            file_name: checkpoints.get(file_name) for file_name in stage
+        }
+        results_queue = context.Queue(maxsize=options['workers'] * 2)
+        pending = [
+            file_name for file_name in stage
+            if not getattr(checkpoints[file_name], 'completed', False)
+        ]
+        running = {}
+        stats = {file_name: Counter() for file_name in pending}
+        write_time = 0
+        stage_atomic = (
+            nullcontext() if options['checkpoint'] else transaction.atomic()
+        )
+
+        try:
+            with stage_atomic:
+                while pending or running:
+                    while pending and len(running) < options['workers']:
+                        file_name = pending.pop(0)
+                        running[file_name] = self.start_worker(
+                            tables[file_name], paths[file_name],
+                            rejected.get(file_name) or frozenset(),
+                            checkpoints[file_name], results_queue, context,
+                            options
                         )
-                    elif file == 'genre_title.csv':
-                        title = Title.objects.get(id=int(row[1]))
-                        genre = Genre.objects.get(id=int(row[2]))
-                        title.genre.add(genre)
 
-        self.stdout.write(self.style.SUCCESS('Data imported successfully'))
+                    file_name, kind, payload = self.next_message(
+                        results_queue, running
+                    )
+                    if kind == 'error':
+                        raise CommandError(payload)
+                    checkpoint = checkpoints[file_name]
+                    if kind == 'done':
+                        running.pop(file_name).join()
+                        if checkpoint:
+                            save_checkpoint(
+                                checkpoint, payload, completed=True
+                            )
+                        continue
+
+                    batch, position = payload
+                    write = WRITERS[file_mode(checkpoint, options)]
+                    write_start = time.monotonic()
+                    with transaction.atomic() if checkpoint else nullcontext():
+                        batch_stats = write(tables[file_name], batch)
+                        if checkpoint:
+                            save_checkpoint(
+                                checkpoint, position,
+                                written_rows(batch_stats)
+                            )
+                    stats[file_name] += batch_stats
+                    write_time += time.monotonic() - write_start
+        finally:
+            for process in running.values():
+                process.terminate()
+
+        return stats, write_time
+
+    def start_worker(self, table, path, rejected, checkpoint, results_queue,
+                     context, options):
+        """Запускает процесс разбора файла с позиции контрольной точки."""
+        position = checkpoint_position(checkpoint) if checkpoint else None
+        process = context.Process(
+            target=prepare_file,
+            args=(table, path, options['batch_size'], results_queue,
+                  rejected, position),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def next_message(self, results_queue, running):
+        """Ждёт сообщение рабочего процесса, следя за его падением."""
+        while True:
+            try:
+                return results_queue.get(timeout=1)
+            except queue.Empty:
+                for file_name, process in running.items():
+                    if not process.is_alive() and process.exitcode:
+                        raise CommandError(
+                            f'{file_name}: worker exited with code '
+                            f'{process.exitcode}'
+                        )
@@ -0,0 +1,74 @@
+"""Команда для снимков базы данных SQLite."""
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.snapshots import (
+    METHODS, SnapshotError, delete_snapshot, list_snapshots,
+    restore_snapshot, save_snapshot
+)
+
+ACTIONS = ('save', 'restore', 'list', 'delete')
+
+
+class Command(BaseCommand):
+    """Сохраняет, восстанавливает, перечисляет и удаляет снимки базы."""
+
+    help = 'Save or restore point-in-time copies of the SQLite database'
+
+    def add_arguments(self, parser):
+        """Действие, имя снимка и способ копирования."""
+        parser.add_argument('action', choices=ACTIONS)
+        parser.add_argument('name', nargs='?')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Database alias to snapshot.'
+        )
+        parser.add_argument(
+            '--method', choices=METHODS, default='backup',
+            help='backup - SQLite online backup API, consistent while other '
+                 'processes write; copy - plain file copy, only safe when '
+                 'nothing else uses the database.'
+        )
+
+    def handle(self, *args, **options):
+        """Выполняет действие над снимком."""
+        action = options['action']
+        if action == 'list':
+            self.list()
+            return
+        name = options['name']
+        if not name:
+            raise CommandError(f'{action} needs a snapshot name')
+
+        start = time.monotonic()
+        try:
+            if action == 'save':
+                path = save_snapshot(
+                    name, options['database'], options['method']
+                )
+                size = path.stat().st_size / 2 ** 20
+                message = f'Snapshot {name} saved ({size:.1f} MiB)'
+            elif action == 'restore':
+                restore_snapshot(name, options['database'], options['method'])
+                message = f'Snapshot {name} restored'
+            else:
+                delete_snapshot(name)
+                message = f'Snapshot {name} deleted'
+        except SnapshotError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{message} in {time.monotonic() - start:.2f}s'
+        ))
+
+    def list(self):
+        """Выводит снимки с размером и временем создания."""
+        for name, stat in list_snapshots():
+            created = datetime.fromtimestamp(stat.st_mtime)
+            self.stdout.write(
+                f'{name}\t{stat.st_size / 2 ** 20:.1f} MiB\t'
+                f'{created:%Y-%m-%d %H:%M:%S}'
+            )
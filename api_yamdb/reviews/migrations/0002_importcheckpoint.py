@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-19 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Контрольная сумма')),
+                ('rows_committed', models.PositiveBigIntegerField(default=0, verbose_name='Обработано строк')),
+                ('line', models.PositiveBigIntegerField(default=0, verbose_name='Последняя строка')),
+                ('byte_offset', models.PositiveBigIntegerField(default=0, verbose_name='Смещение')),
+                ('completed', models.BooleanField(default=False, verbose_name='Файл загружен')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+            ],
+            options={
+                'verbose_name': 'Контрольная точка импорта',
+                'verbose_name_plural': 'Контрольные точки импорта',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-19 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='mode',
+            field=models.CharField(default='insert', max_length=10, verbose_name='Режим'),
+        ),
+        migrations.AlterField(
+            model_name='importcheckpoint',
+            name='rows_committed',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Записано строк'),
+        ),
+    ]
@@ -18,6 +18,9 @@ from users.models import User
 from .validators import year_validator
 
 MAX_NAME_LENGTH = 256
+MAX_FILE_NAME_LENGTH = 255
+CHECKSUM_LENGTH = 64
+MAX_IMPORT_MODE_LENGTH = 10
 MIN_SCORE = 1
 MAX_SCORE = 10
 
@@ -165,3 +168,30 @@ class Comment(models.Model):
     def __str__(self):
         """Возвращает автора и текст комментария."""
         return f'автор: {self.author}, отзыв: {self.review}'
+
+
+class ImportCheckpoint(models.Model):
+    """Контрольная точка импорта одного CSV-файла командой parse-db."""
+
+    file_name = models.CharField(
+        'Файл', max_length=MAX_FILE_NAME_LENGTH, unique=True)
+    checksum = models.CharField(
+        'Контрольная сумма', max_length=CHECKSUM_LENGTH)
+    mode = models.CharField(
+        'Режим', max_length=MAX_IMPORT_MODE_LENGTH, default='insert')
+    rows_committed = models.PositiveBigIntegerField(
+        'Записано строк', default=0)
+    line = models.PositiveBigIntegerField('Последняя строка', default=0)
+    byte_offset = models.PositiveBigIntegerField('Смещение', default=0)
+    completed = models.BooleanField('Файл загружен', default=False)
+    updated_at = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        """Мета класс для модели ImportCheckpoint."""
+
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+
+    def __str__(self):
+        """Возвращает файл и число записанных строк."""
+        return f'{self.file_name}: {self.rows_committed}'
@@ -0,0 +1,135 @@
+"""
+Снимки базы данных SQLite для команды snapshot.
+
+Снимок - это обычный файл SQLite в settings.SNAPSHOT_DIR. По умолчанию
+он создаётся и восстанавливается через online backup API: копия
+согласована на момент начала копирования, даже если в базу параллельно
+пишут другие процессы, и работает для базы в памяти, как в тестах.
+Копирование файла быстрее, но безопасно только когда базой никто не
+пользуется.
+"""
+import re
+import shutil
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+SNAPSHOT_SUFFIX = '.sqlite3'
+SNAPSHOT_NAME_RE = re.compile(r'^[\w.-]+\Z')
+METHODS = ('backup', 'copy')
+
+
+class SnapshotError(Exception):
+    """Снимок нельзя создать или восстановить."""
+
+
+def snapshot_path(name):
+    """Путь к файлу снимка с проверкой имени."""
+    if not SNAPSHOT_NAME_RE.match(name) or name.startswith('.'):
+        raise SnapshotError(f'invalid snapshot name: {name!r}')
+    return Path(settings.SNAPSHOT_DIR) / f'{name}{SNAPSHOT_SUFFIX}'
+
+
+def sqlite_connection(using):
+    """Соединение Django с базой SQLite, открытое вне транзакции."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        raise SnapshotError(f'{using} is not an SQLite database')
+    if connection.in_atomic_block:
+        raise SnapshotError('snapshots cannot be taken inside a transaction')
+    connection.ensure_connection()
+    return connection
+
+
+def database_file(connection):
+    """Файл базы данных для копирования или ошибка для базы в памяти."""
+    if connection.is_in_memory_db():
+        raise SnapshotError('an in-memory database has no file to copy')
+    return Path(connection.settings_dict['NAME'])
+
+
+def save_snapshot(name, using='default', method='backup'):
+    """Сохраняет снимок базы и возвращает путь к нему."""
+    path = snapshot_path(name)
+    connection = sqlite_connection(using)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial_path = path.with_name(f'{path.name}.part')
+    try:
+        if method == 'copy':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            shutil.copyfile(database_file(connection), partial_path)
+        else:
+            target = sqlite3.connect(partial_path)
+            try:
+                connection.connection.backup(target)
+            finally:
+                target.close()
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    partial_path.replace(path)
+    return path
+
+
+def restore_file(connection, path):
+    """
+    Копирует файл снимка поверх файла базы.
+
+    Журнал WAL удаляется вместе с базой, поэтому сначала его изменения
+    переносятся в базу. Если журнал перенести не удалось или после
+    закрытия соединения в него снова записали, базой пользуется другой
+    процесс, и восстановление копированием отменяется.
+    """
+    db_path = database_file(connection)
+    wal_path = db_path.with_name(f'{db_path.name}-wal')
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        busy, _, _ = cursor.fetchone()
+    connection.close()
+    if busy or (wal_path.exists() and wal_path.stat().st_size):
+        raise SnapshotError(
+            'the write-ahead log could not be checkpointed; the database '
+            'is in use, restore with --method backup'
+        )
+    for suffix in ('-wal', '-shm'):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+    shutil.copyfile(path, db_path)
+
+
+def restore_snapshot(name, using='default', method='backup'):
+    """Заменяет содержимое базы данными снимка."""
+    path = snapshot_path(name)
+    if not path.exists():
+        raise SnapshotError(f'snapshot {name!r} not found in {path.parent}')
+    connection = sqlite_connection(using)
+    if method == 'copy':
+        restore_file(connection, path)
+        return
+    # as_uri() экранирует ?, # и % в пути, которые иначе ломают URI.
+    source = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        source.backup(connection.connection)
+    finally:
+        source.close()
+
+
+def list_snapshots():
+    """Снимки в каталоге SNAPSHOT_DIR: имя, размер и время изменения."""
+    directory = Path(settings.SNAPSHOT_DIR)
+    if not directory.is_dir():
+        return []
+    return [
+        (path.name[:-len(SNAPSHOT_SUFFIX)], path.stat())
+        for path in sorted(directory.glob(f'*{SNAPSHOT_SUFFIX}'))
+    ]
+
+
+def delete_snapshot(name):
+    """Удаляет файл снимка."""
+    path = snapshot_path(name)
+    if not path.exists():
+        raise SnapshotError(f'snapshot {name!r} not found in {path.parent}')
+    path.unlink()
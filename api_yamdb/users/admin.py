@@ -1,7 +1,7 @@
 """Настройка админки для модели User в проекте YaMDb."""
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxMessage, User
 
 
 @admin.register(User)
@@ -35,7 +35,20 @@ class UserAdmin(admin.ModelAdmin):
     )
 
     def save_model(self, request, obj, form, change):
-        """Устанавливает пароль для нового пользователя."""
+        """Устанавливает пароль и подтверждение для нового пользователя."""
         if not obj.pk:
             obj.set_password(obj.password)
+            obj.is_confirmed = True
         super().save_model(request, obj, form, change)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Настройка админки для очереди писем."""
+
+    list_display = ('pk', 'to', 'subject', 'status',
+                    'attempts', 'next_attempt_at', 'sent_at')
+    search_fields = ('to', 'subject')
+    list_filter = ('status',)
+    empty_value_display = 'Значение отсутствует'
+    list_per_page = 50
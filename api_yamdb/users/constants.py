@@ -2,4 +2,8 @@
 MAX_USERNAME_LENGTH = 150
 MAX_EMAIL_LENGTH = 254
 MAX_ROLE_LENGTH = 10
-DISALLOWED_USERNAMES = ['me', 'admin', 'root']
+MAX_BULK_USERNAMES = 1000
+MAX_EMAIL_SUBJECT_LENGTH = 255
+MAX_OUTBOX_STATUS_LENGTH = 10
+OUTBOX_LEASE_LENGTH = 32
+DISALLOWED_USERNAMES = ['me', 'admin', 'root', 'bulk']
@@ -0,0 +1,161 @@
+"""
+Команда для пакетной отправки писем из очереди.
+
+Пакет сначала захватывается: по индексу выбираются pk готовых писем,
+затем одним UPDATE тем из них, что всё ещё ожидают отправки,
+записывается метка аренды и next_attempt_at сдвигается на --lease
+секунд. Параллельно запущенная команда уже не видит эти письма
+готовыми к отправке, а если процесс упадёт, не отправив пакет, письма
+снова станут доступны после окончания аренды.
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import OutboxMessage, OutboxStatus
+
+
+class Command(BaseCommand):
+    """Отправляет письма из OutboxMessage пакетами через одно соединение."""
+
+    help = 'Send pending outbox emails in batches over a reused connection'
+
+    def add_arguments(self, parser):
+        """Параметры пакетной отправки и повторных попыток."""
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Messages passed to one send_messages() call.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Attempts before a message is marked as failed.'
+        )
+        parser.add_argument(
+            '--backoff', type=float, default=60,
+            help='Base retry delay in seconds, doubled after each attempt.'
+        )
+        parser.add_argument(
+            '--lease', type=float, default=300,
+            help='Seconds a claimed batch is hidden from other flushes.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Stop after this many messages (0 - no limit).'
+        )
+
+    def handle(self, *args, **options):
+        """Отправляет готовые к отправке письма и выводит статистику."""
+        if options['lease'] <= 0:
+            # Аренда истекла бы сразу, и параллельная отправка взяла бы
+            # те же письма ещё раз.
+            raise CommandError('--lease must be positive')
+        batch_size = options['batch_size']
+        limit = options['limit']
+        sent = failed = 0
+        start = time.monotonic()
+
+        connection = get_connection()
+        try:
+            while not limit or sent + failed < limit:
+                size = batch_size
+                if limit:
+                    size = min(size, limit - sent - failed)
+                batch = self.claim_batch(size, options['lease'])
+                if not batch:
+                    break
+                delivered = self.send_batch(connection, batch, options)
+                sent += delivered
+                failed += len(batch) - delivered
+        finally:
+            connection.close()
+
+        elapsed = time.monotonic() - start
+        rate = sent / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {sent}, failed {failed} in {elapsed:.2f}s '
+            f'({rate:.1f} messages/sec)'
+        ))
+
+    def claim_batch(self, size, lease):
+        """Захватывает до size готовых писем и возвращает их."""
+        now = timezone.now()
+        ready = OutboxMessage.objects.filter(
+            status=OutboxStatus.PENDING, next_attempt_at__lte=now
+        )
+        pks = list(ready.values_list('pk', flat=True)[:size])
+        if not pks:
+            return []
+        token = uuid.uuid4().hex
+        ready.filter(pk__in=pks).update(
+            lease=token, next_attempt_at=now + timedelta(seconds=lease)
+        )
+        # Без pk__in поиск по lease просматривал бы всю очередь.
+        return list(OutboxMessage.objects.filter(pk__in=pks, lease=token))
+
+    def send_batch(self, connection, batch, options):
+        """
+        Отправляет пакет писем и возвращает число отправленных.
+
+        Бэкенды отправляют письма по порядку, поэтому отправленными
+        считаются первые письма пакета по числу, которое вернул
+        send_messages(); остальные откладываются для повторной попытки.
+        """
+        messages = [
+            EmailMessage(
+                message.subject,
+                message.body,
+                message.from_email,
+                [message.to],
+                connection=connection,
+            )
+            for message in batch
+        ]
+        try:
+            connection.open()
+            delivered = connection.send_messages(messages) or 0
+        except Exception as error:
+            connection.close()
+            self.schedule_retry(batch, error, options)
+            return 0
+
+        OutboxMessage.objects.filter(
+            pk__in=[message.pk for message in batch[:delivered]]
+        ).update(
+            status=OutboxStatus.SENT,
+            attempts=F('attempts') + 1,
+            sent_at=timezone.now(),
+            last_error='',
+            lease='',
+        )
+        if delivered < len(batch):
+            self.schedule_retry(
+                batch[delivered:],
+                RuntimeError('the email backend did not send the message'),
+                options
+            )
+        return delivered
+
+    def schedule_retry(self, batch, error, options):
+        """Назначает следующую попытку с экспоненциальной задержкой."""
+        now = timezone.now()
+        for message in batch:
+            message.attempts += 1
+            message.last_error = repr(error)
+            message.lease = ''
+            if message.attempts >= options['max_attempts']:
+                message.status = OutboxStatus.FAILED
+            else:
+                delay = options['backoff'] * 2 ** (message.attempts - 1)
+                message.next_attempt_at = now + timedelta(seconds=delay)
+        OutboxMessage.objects.bulk_update(
+            batch,
+            ('attempts', 'last_error', 'status', 'next_attempt_at', 'lease')
+        )
+        self.stderr.write(
+            f'Failed to send {len(batch)} messages: {error!r}'
+        )
@@ -0,0 +1,68 @@
+"""Команда для удаления регистраций, код которых так и не использовали."""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    """Удаляет неподтверждённых пользователей короткими пакетами."""
+
+    help = 'Delete never-confirmed signups older than N hours in batches'
+
+    def add_arguments(self, parser):
+        """Параметры очистки."""
+        parser.add_argument(
+            '--hours', type=int, default=24,
+            help='Only purge signups older than this many hours.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Users deleted per transaction.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches to let writers in.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count matching users.'
+        )
+
+    def handle(self, *args, **options):
+        """Удаляет неподтверждённых пользователей пакетами."""
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        unconfirmed = User.objects.filter(
+            is_confirmed=False,
+            date_joined__lt=cutoff,
+            is_staff=False,
+            is_superuser=False,
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'{unconfirmed.count()} unconfirmed users would be deleted'
+            )
+            return
+
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    unconfirmed.order_by('date_joined')
+                    .values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                unconfirmed.filter(pk__in=batch).delete()
+            deleted += len(batch)
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} unconfirmed users'
+        ))
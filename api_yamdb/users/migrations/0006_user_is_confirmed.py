@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-19 08:33
+
+from django.db import migrations, models
+
+
+def mark_existing_users_confirmed(apps, schema_editor):
+    """Пользователи, созданные до миграции, не попадают под очистку."""
+    User = apps.get_model('users', 'User')
+    User.objects.update(is_confirmed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_confirmed',
+            field=models.BooleanField(default=False, verbose_name='Код подтверждения использован'),
+        ),
+        migrations.RunPython(
+            mark_existing_users_confirmed, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_confirmed', 'date_joined'], name='user_confirmed_joined'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 08:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_is_confirmed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='role',
+            field=models.CharField(choices=[('admin', 'Admin'), ('moderator', 'Moderator'), ('partner', 'Partner'), ('user', 'User')], default='user', max_length=10, verbose_name='Роль'),
+        ),
+    ]
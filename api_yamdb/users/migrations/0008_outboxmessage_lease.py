@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-19 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_role_partner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='lease',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Захвачено отправкой'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_outboxmessage_lease'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_confirmed_joined',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(is_confirmed=False), fields=['date_joined'], name='user_unconfirmed_joined'),
+        ),
+    ]
@@ -2,8 +2,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 
-from users.constants import MAX_USERNAME_LENGTH, MAX_ROLE_LENGTH
+from users.constants import (
+    MAX_EMAIL_SUBJECT_LENGTH, MAX_OUTBOX_STATUS_LENGTH, MAX_ROLE_LENGTH,
+    MAX_USERNAME_LENGTH, OUTBOX_LEASE_LENGTH
+)
 from .validators import validate_username
 
 
@@ -12,6 +16,7 @@ class UserRole(models.TextChoices):
 
     ADMIN = 'admin', 'Admin'
     MODERATOR = 'moderator', 'Moderator'
+    PARTNER = 'partner', 'Partner'
     USER = 'user', 'User'
 
 
@@ -47,12 +52,25 @@ class User(AbstractUser):
         verbose_name='Биография'
     )
 
+    is_confirmed = models.BooleanField(
+        default=False,
+        verbose_name='Код подтверждения использован'
+    )
+
     class Meta:
         """Метаданные модели пользователя."""
 
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ['username']
+        indexes = [
+            # Частичный: SQLite не применяет составной индекс к условию
+            # NOT is_confirmed, которое Django пишет для is_confirmed=False.
+            models.Index(
+                fields=['date_joined'], condition=models.Q(is_confirmed=False),
+                name='user_unconfirmed_joined'
+            ),
+        ]
 
     @property
     def is_admin(self):
@@ -64,6 +82,82 @@ class User(AbstractUser):
         """Проверка на модератора."""
         return self.role == UserRole.MODERATOR
 
+    @property
+    def is_partner(self):
+        """Проверка на партнёра, выгружающего каталог."""
+        return self.role == UserRole.PARTNER
+
     def __str__(self):
         """Строковое представление пользователя."""
         return f"{self.username} ({self.role})"
+
+
+class OutboxStatus(models.TextChoices):
+    """Статусы письма в очереди на отправку."""
+
+    PENDING = 'pending', 'Ожидает отправки'
+    SENT = 'sent', 'Отправлено'
+    FAILED = 'failed', 'Не удалось отправить'
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ожидающее пакетной отправки командой flush_outbox."""
+
+    subject = models.CharField(
+        max_length=MAX_EMAIL_SUBJECT_LENGTH,
+        verbose_name='Тема'
+    )
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(verbose_name='Отправитель')
+    to = models.EmailField(verbose_name='Получатель')
+    status = models.CharField(
+        max_length=MAX_OUTBOX_STATUS_LENGTH,
+        choices=OutboxStatus.choices,
+        default=OutboxStatus.PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Последняя ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано'
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Отправлено'
+    )
+    lease = models.CharField(
+        max_length=OUTBOX_LEASE_LENGTH,
+        blank=True,
+        default='',
+        verbose_name='Захвачено отправкой'
+    )
+
+    class Meta:
+        """Метаданные модели письма."""
+
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ['id']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outbox_status_next_attempt'
+            ),
+        ]
+
+    def __str__(self):
+        """Строковое представление письма."""
+        return f'{self.to}: {self.subject} ({self.status})'
@@ -0,0 +1,43 @@
+"""
+Стоимость проверки одного и того же JWT на запрос: без кэша и с кэшем.
+
+Запуск из корня репозитория: python benchmarks/bench_auth.py
+"""
+import argparse
+
+from common import measure, setup_django
+
+
+def main():
+    """Сравнивает JWTAuthentication и CachedJWTAuthentication."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.v1.authentication import CachedJWTAuthentication
+
+    token = AccessToken()
+    token['user_id'] = 1
+    raw_token = str(token).encode()
+
+    plain = JWTAuthentication()
+    cached = CachedJWTAuthentication()
+    cached.token_cache.clear()
+
+    before = measure(
+        lambda: plain.get_validated_token(raw_token), args.number)
+    after = measure(
+        lambda: cached.get_validated_token(raw_token), args.number)
+
+    print(f'JWTAuthentication:       {before:8.2f} us/request')
+    print(f'CachedJWTAuthentication: {after:8.2f} us/request')
+    print(f'speedup: x{before / after:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Время запуска и накладные расходы на запрос для полного профиля настроек
+и облегчённого профиля settings_api.
+
+Каждый профиль измеряется в отдельных процессах, потому что Django
+настраивается один раз на процесс. Время запуска - от импорта Django до
+первого ответа - замеряется в новом процессе на каждый прогон.
+
+Запуск из корня репозитория: python benchmarks/bench_profiles.py
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROFILES = {
+    'full': 'bench_settings',
+    'api': 'bench_settings_api',
+}
+URLS = ('/api/v1/categories/', '/api/v1/titles/')
+
+
+def run_worker(mode, settings_module, number=1):
+    """Запускает этот файл в режиме mode и возвращает его вывод JSON."""
+    output = subprocess.run(
+        [sys.executable, __file__, '--worker', mode,
+         '--settings', settings_module, '--number', str(number)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def worker(mode, settings_module, number):
+    """Замеры внутри процесса с одним профилем; результат - JSON."""
+    start = time.perf_counter()
+    from common import measure, seed_database, setup_django
+
+    setup_django(settings_module)
+    if mode == 'seed':
+        seed_database(os.environ['BENCH_TEMPLATE'], titles=200)
+        print(json.dumps({}))
+        return
+
+    from django.test import Client
+
+    logging.getLogger('api.timing').setLevel(logging.WARNING)
+    client = Client()
+    response = client.get(URLS[0])
+    if mode == 'cold-start':
+        assert response.status_code == 200, response.status_code
+        print(json.dumps({'ms': (time.perf_counter() - start) * 1000}))
+        return
+
+    results = {}
+    for url in URLS:
+        client.get(url)
+        results[url] = measure(lambda: client.get(url), number)
+    print(json.dumps(results))
+
+
+def main():
+    """Сравнивает профили и печатает таблицу результатов."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=500)
+    parser.add_argument('--starts', type=int, default=10)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--settings', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.settings, args.number)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / 'db.sqlite3'
+        os.environ['BENCH_DATABASE'] = str(Path(directory) / 'seed.sqlite3')
+        os.environ['BENCH_TEMPLATE'] = str(database)
+        run_worker('seed', PROFILES['full'])
+        os.environ['BENCH_DATABASE'] = str(database)
+
+        for name, settings_module in PROFILES.items():
+            starts = [
+                run_worker('cold-start', settings_module)['ms']
+                for _ in range(args.starts)
+            ]
+            requests = run_worker('requests', settings_module, args.number)
+            print(f'{name:>4}: cold start {statistics.median(starts):7.1f} '
+                  f'ms (median of {args.starts})')
+            for url, result in requests.items():
+                print(f'{"":>4}  {url:<22} {result:8.1f} us/request')
+
+
+if __name__ == '__main__':
+    main()
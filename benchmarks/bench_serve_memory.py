@@ -0,0 +1,133 @@
+"""
+Память рабочих процессов: независимые процессы против manage.py serve.
+
+Сравниваются три схемы с одинаковым числом процессов, обслуживающих
+запросы: независимые процессы serve --workers 0, каждый со своей копией
+Django и DRF; форк после загрузки приложения без gc.freeze(); форк после
+загрузки с gc.freeze(). После прогрева запросами для всех процессов
+схемы суммируются PSS (реальная доля памяти) и USS (страницы только
+этого процесса) из /proc/<pid>/smaps_rollup.
+
+Запуск из корня репозитория: python benchmarks/bench_serve_memory.py
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from common import PROJECT_DIR, seed_database, setup_django
+
+BENCH_DIR = Path(__file__).resolve().parent
+URLS = ('/api/v1/titles/', '/api/v1/categories/', '/api/v1/genres/')
+MODES = {
+    'independent': None,
+    'prefork': ('--no-freeze',),
+    'prefork+freeze': (),
+}
+
+
+def free_port():
+    """Свободный TCP-порт на localhost."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start(args):
+    """Запускает manage.py serve с настройками бенчмарков."""
+    return subprocess.Popen(
+        [sys.executable, 'manage.py', 'serve', *args], cwd=PROJECT_DIR,
+        env={
+            **os.environ, 'DJANGO_SETTINGS_MODULE': 'bench_settings',
+            'PYTHONPATH': str(BENCH_DIR), 'YAMDB_SERVER_TIMING': '0',
+        },
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(port, timeout=30):
+    """Ждёт, пока сервер на port начнёт отвечать."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}{URLS[0]}')
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def load(port, number):
+    """Отправляет number запросов к каждому адресу URLS."""
+    for _ in range(number):
+        for url in URLS:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}{url}').read()
+
+
+def run_mode(name, workers, requests):
+    """Запускает схему, нагружает её и возвращает суммы памяти в КиБ."""
+    from api.prefork import child_pids, process_memory
+
+    if MODES[name] is None:
+        ports = [free_port() for _ in range(workers)]
+        processes = [
+            start(['--workers', '0', '--bind', f'127.0.0.1:{port}'])
+            for port in ports
+        ]
+    else:
+        ports = [free_port()]
+        processes = [start([
+            '--workers', str(workers), '--bind', f'127.0.0.1:{ports[0]}',
+            *MODES[name],
+        ])]
+    try:
+        for port in ports:
+            wait_ready(port)
+            load(port, requests * workers // len(ports))
+        pids = [process.pid for process in processes]
+        servers = pids + [
+            child for pid in pids for child in child_pids(pid)
+        ]
+        total = dict.fromkeys(('rss', 'pss', 'uss'), 0)
+        for pid in servers:
+            memory = process_memory(pid) or {}
+            for key in total:
+                total[key] += memory.get(key, 0)
+        return len(servers), total
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def main():
+    """Сравнивает память схем запуска."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument(
+        '--requests', type=int, default=50,
+        help='Requests to each URL per worker before measuring.'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DATABASE'] = str(Path(directory) / 'db.sqlite3')
+        setup_django('bench_settings')
+        seed_database(Path(directory) / 'template.sqlite3', titles=200)
+
+        print(f'{"mode":<15} {"processes":>9} {"pss_mib":>8} {"uss_mib":>8}')
+        for name in MODES:
+            count, total = run_mode(name, args.workers, args.requests)
+            print(f'{name:<15} {count:>9} {total["pss"] / 1024:8.1f} '
+                  f'{total["uss"] / 1024:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
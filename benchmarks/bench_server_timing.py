@@ -0,0 +1,45 @@
+"""
+Накладные расходы ServerTimingMiddleware на запрос списка произведений.
+
+Запуск из корня репозитория: python benchmarks/bench_server_timing.py
+"""
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from common import measure, seed_database, setup_django
+
+
+def main():
+    """Сравнивает время запроса без замеров и с ними."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DATABASE'] = str(Path(directory) / 'db.sqlite3')
+        setup_django('bench_settings')
+        seed_database(Path(directory) / 'template.sqlite3', titles=200)
+
+        from django.conf import settings
+        from django.test import Client
+
+        logging.getLogger('api.timing').setLevel(logging.WARNING)
+        results = {}
+        for enabled in (False, True):
+            settings.SERVER_TIMING_ENABLED = enabled
+            client = Client()
+            client.get('/api/v1/titles/')
+            results[enabled] = measure(
+                lambda: client.get('/api/v1/titles/'), args.number
+            )
+
+    print(f'without Server-Timing: {results[False]:8.1f} us/request')
+    print(f'with Server-Timing:    {results[True]:8.1f} us/request')
+    print(f'overhead: {results[True] - results[False]:+.1f} us/request')
+
+
+if __name__ == '__main__':
+    main()
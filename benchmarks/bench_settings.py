@@ -0,0 +1,14 @@
+"""Настройки бенчмарков: база во временном файле из BENCH_DATABASE."""
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+
+DEBUG = False
+NPLUSONE_ENABLED = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCH_DATABASE'],
+    }
+}
@@ -0,0 +1,3 @@
+"""Облегчённый профиль settings_api с базой бенчмарков из BENCH_DATABASE."""
+from api_yamdb.settings_api import *  # noqa: F401,F403
+from bench_settings import DATABASES, DEBUG, NPLUSONE_ENABLED  # noqa: F401
@@ -0,0 +1,120 @@
+"""
+Пропускная способность SQLite при параллельных чтении и записи из потоков:
+PRAGMA по умолчанию против settings.SQLITE_PRAGMAS.
+
+Запуск из корня репозитория: python benchmarks/bench_sqlite_concurrency.py
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import fresh_database, seed_database, setup_django
+
+
+def reader(deadline, stats, titles):
+    """Читает произведение с рейтингом и его последние отзывы."""
+    from django.db import OperationalError, connection
+    from django.db.models import Avg
+
+    from reviews.models import Review, Title
+
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        title_id = rng.randint(1, titles)
+        try:
+            list(Title.objects.filter(pk=title_id)
+                 .annotate(rating=Avg('reviews__score')))
+            list(Review.objects.filter(title_id=title_id)[:10])
+        except OperationalError:
+            stats['errors'] += 1
+        else:
+            stats['reads'] += 1
+    connection.close()
+
+
+def writer(deadline, stats, reviews, users):
+    """Добавляет комментарии, каждый в своей транзакции."""
+    from django.db import OperationalError, connection
+
+    from reviews.models import Comment
+
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        try:
+            Comment.objects.create(
+                review_id=rng.randint(1, reviews),
+                author_id=rng.randint(1, users), text='Нагрузка'
+            )
+        except OperationalError:
+            stats['errors'] += 1
+        else:
+            stats['writes'] += 1
+    connection.close()
+
+
+def run(label, pragmas, template, args):
+    """Запускает потоки на свежей копии базы с заданными PRAGMA."""
+    from django.conf import settings
+    from django.db import connections
+
+    from reviews.models import Review, Title
+    from users.models import User
+
+    fresh_database(template)
+    settings.SQLITE_PRAGMAS = pragmas
+
+    titles = Title.objects.count()
+    reviews = Review.objects.count()
+    users = User.objects.count()
+    connections.close_all()
+
+    stats = {'reads': 0, 'writes': 0, 'errors': 0}
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(target=reader, args=(deadline, stats, titles))
+        for _ in range(args.readers)
+    ] + [
+        threading.Thread(
+            target=writer, args=(deadline, stats, reviews, users)
+        )
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(
+        f'{label:<16} reads {stats["reads"] / args.seconds:8.0f}/s  '
+        f'writes {stats["writes"] / args.seconds:7.0f}/s  '
+        f'locked errors {stats["errors"]}'
+    )
+
+
+def main():
+    """Сравнивает PRAGMA по умолчанию и из настроек."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DATABASE'] = str(Path(directory) / 'db.sqlite3')
+        setup_django('bench_settings')
+
+        from django.conf import settings
+        tuned = dict(settings.SQLITE_PRAGMAS)
+        template = Path(directory) / 'template.sqlite3'
+        seed_database(template)
+
+        run('default pragmas', {}, template, args)
+        run('SQLITE_PRAGMAS', tuned, template, args)
+
+
+if __name__ == '__main__':
+    main()
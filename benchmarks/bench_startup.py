@@ -0,0 +1,88 @@
+"""
+Время запуска рабочего процесса: django.setup(), middleware и URLconf.
+
+Проверяет порог регрессии: медиана общего времени запуска каждого
+профиля не должна превышать --max-ms, а при запуске не должны
+загружаться модули, импорт которых отложен до первого
+использования. При нарушении скрипт завершается с кодом 1.
+
+Запуск из корня репозитория: python benchmarks/bench_startup.py
+"""
+import argparse
+import statistics
+import sys
+
+from common import PROJECT_DIR
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from api.startup_profile import PHASES, profile_startup  # noqa: E402
+
+# Modules only needed by management commands or single actions.
+LAZY_MODULES = (
+    'api.startup_profile', 'api.v1.exports', 'reviews.csv_import',
+    'reviews.csv_export', 'reviews.snapshots', 'reviews.data_generator',
+)
+PROFILES = {
+    'api_yamdb.settings': LAZY_MODULES,
+    'api_yamdb.settings_api': LAZY_MODULES + (
+        'api.nplusone', 'django.contrib.sessions',
+    ),
+}
+
+
+def main():
+    """Замеряет запуск профилей и проверяет пороги."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--starts', type=int, default=7)
+    parser.add_argument(
+        '--max-ms', type=float, default=800,
+        help='Startup budget in ms, measured under -X importtime.'
+    )
+    parser.add_argument(
+        '--stdlib-distutils', action='store_true',
+        help='Start the probes with SETUPTOOLS_USE_DISTUTILS=stdlib, so '
+             'importing Django does not load setuptools.'
+    )
+    args = parser.parse_args()
+    env = (
+        {'SETUPTOOLS_USE_DISTUTILS': 'stdlib'}
+        if args.stdlib_distutils else None
+    )
+
+    failures = []
+    for settings_module, forbidden in PROFILES.items():
+        profiles = [
+            profile_startup(settings_module, PROJECT_DIR, env)
+            for _ in range(args.starts)
+        ]
+        phases = {
+            phase: statistics.median(
+                profile.phases[phase] for profile in profiles
+            )
+            for phase in PHASES
+        }
+        total = statistics.median(
+            sum(profile.phases.values()) for profile in profiles
+        )
+        print(f'{settings_module}: total {total:.1f} ms (' + ', '.join(
+            f'{phase} {phases[phase]:.1f}' for phase in PHASES
+        ) + f'), median of {args.starts}')
+        if total > args.max_ms:
+            failures.append(
+                f'{settings_module}: startup {total:.1f} ms exceeds '
+                f'{args.max_ms:.0f} ms'
+            )
+        loaded = set(profiles[0].modules)
+        failures.extend(
+            f'{settings_module}: {module} is imported at startup'
+            for module in forbidden if module in loaded
+        )
+
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Задержка параллельных POST-запросов комментариев из потоков: прямая запись
+против очереди записи (WRITE_QUEUE_ENABLED).
+
+Запуск из корня репозитория: python benchmarks/bench_write_queue.py
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import fresh_database, seed_database, setup_django
+
+
+def client_loop(deadline, token, reviews, latencies, failures):
+    """Отправляет комментарии, пока не истечёт время."""
+    from django.db import connection
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        title_id, review_id = reviews[rng.randrange(len(reviews))]
+        start = time.perf_counter()
+        try:
+            response = client.post(
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+                data={'text': 'Нагрузка'}
+            )
+            ok = response.status_code == 201
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        if ok:
+            latencies.append(elapsed)
+        else:
+            failures.append(elapsed)
+    connection.close()
+
+
+def run(label, enabled, template, args):
+    """Запускает клиентов на свежей копии базы."""
+    from django.conf import settings
+    from django.db import connections
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.v1.write_queue import write_queue
+    from reviews.models import Review
+    from users.models import User
+
+    fresh_database(template)
+    settings.WRITE_QUEUE_ENABLED = enabled
+    token = str(AccessToken.for_user(User.objects.first()))
+    reviews = list(Review.objects.values_list('title_id', 'pk'))
+    connections.close_all()
+    write_queue.reset_stats()
+
+    latencies, failures = [], []
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(
+            target=client_loop,
+            args=(deadline, token, reviews, latencies, failures)
+        )
+        for _ in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    quantiles = statistics.quantiles(latencies, n=100) if latencies else []
+    p50, p99 = (quantiles[49], quantiles[98]) if quantiles else (0, 0)
+    print(
+        f'{label:<12} {len(latencies) / args.seconds:6.0f} writes/s  '
+        f'p50 {p50 * 1000:6.1f} ms  p99 {p99 * 1000:7.1f} ms  '
+        f'max {max(latencies, default=0) * 1000:7.1f} ms  '
+        f'failed {len(failures)}'
+    )
+    if enabled:
+        print(f'{"":<12} queue stats: {write_queue.stats()}')
+
+
+def main():
+    """Сравнивает прямую запись и очередь записи."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['BENCH_DATABASE'] = str(Path(directory) / 'db.sqlite3')
+        setup_django('bench_settings')
+        template = Path(directory) / 'template.sqlite3'
+        seed_database(template)
+
+        # Поток очереди держит своё соединение, поэтому очередь - последней.
+        run('direct', False, template, args)
+        run('write queue', True, template, args)
+
+
+if __name__ == '__main__':
+    main()
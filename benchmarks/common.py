@@ -0,0 +1,60 @@
+"""Общие функции для бенчмарков проекта."""
+import io
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django(settings_module='api_yamdb.settings'):
+    """Подключает проект и инициализирует Django."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django
+    django.setup()
+
+
+def measure(func, number):
+    """Возвращает среднее время одного вызова func в микросекундах."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1_000_000
+
+
+def seed_database(path, titles=2000, users=500, reviews_per_title=5):
+    """
+    Создаёт базу bench_settings с синтетическими данными и копирует её в path.
+
+    PRAGMA не применяются, поэтому копия остаётся в режиме журнала SQLite
+    по умолчанию.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    pragmas = settings.SQLITE_PRAGMAS
+    settings.SQLITE_PRAGMAS = {}
+    call_command('migrate', verbosity=0)
+    call_command('generate-data', titles=titles, users=users,
+                 reviews_per_title=reviews_per_title, comments_per_review=1,
+                 stdout=io.StringIO())
+    connections.close_all()
+    settings.SQLITE_PRAGMAS = pragmas
+    shutil.copyfile(settings.DATABASES['default']['NAME'], path)
+
+
+def fresh_database(template):
+    """Заменяет базу bench_settings копией template."""
+    from django.conf import settings
+    from django.db import connections
+
+    db_path = Path(settings.DATABASES['default']['NAME'])
+    connections.close_all()
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'{db_path}{suffix}').unlink(missing_ok=True)
+    shutil.copyfile(template, db_path)
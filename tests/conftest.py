@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,18 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+def pytest_configure(config):
+    """Повторённые запросы к базе роняют тест, а не только пишутся в лог."""
+    from django.conf import settings
+
+    settings.NPLUSONE_ACTION = 'raise'
+
+
+@pytest.fixture(autouse=True, scope='session')
+def session_metrics_dir(tmp_path_factory):
+    """Метрики тестов не попадают в каталог METRICS_DIR проекта."""
+    from django.conf import settings
+
+    settings.METRICS_DIR = str(tmp_path_factory.mktemp('metrics'))
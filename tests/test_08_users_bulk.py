@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08UserBulkAPI:
+
+    USERS_BULK_URL = '/api/v1/users/bulk/'
+
+    def test_01_users_bulk_admin_only(self, client, user_client,
+                                      moderator_client, user):
+        data = {
+            'usernames': [user.username],
+            'action': 'delete',
+        }
+        response = client.post(self.USERS_BULK_URL, data=data, format='json')
+        assert response.status_code != HTTPStatus.NOT_FOUND, (
+            f'Эндпоинт `{self.USERS_BULK_URL}` не найден. Проверьте '
+            'настройки в *urls.py*.'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что POST-запрос к `{self.USERS_BULK_URL}` без '
+            'токена авторизации возвращает ответ со статусом 401.'
+        )
+        for test_client in (user_client, moderator_client):
+            response = test_client.post(
+                self.USERS_BULK_URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что POST-запрос к `{self.USERS_BULK_URL}` от '
+                'пользователя без прав администратора возвращает ответ со '
+                'статусом 403.'
+            )
+
+    def test_02_users_bulk_update(self, admin_client, user, moderator,
+                                  django_user_model):
+        data = {
+            'usernames': [user.username, moderator.username, 'missing'],
+            'action': 'update',
+            'data': {'role': 'moderator', 'is_active': False},
+        }
+        response = admin_client.post(
+            self.USERS_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос администратора к '
+            f'`{self.USERS_BULK_URL}` с корректными данными возвращает ответ '
+            'со статусом 200.'
+        )
+        assert response.json() == {'results': [
+            {'username': user.username, 'status': 'updated'},
+            {'username': moderator.username, 'status': 'updated'},
+            {'username': 'missing', 'status': 'not_found'},
+        ]}, (
+            'Проверьте, что ответ на массовое изменение содержит результат '
+            'для каждого переданного `username`.'
+        )
+        updated = django_user_model.objects.filter(
+            username__in=(user.username, moderator.username),
+            role='moderator',
+            is_active=False,
+        )
+        assert updated.count() == 2, (
+            'Проверьте, что массовое изменение применяется ко всем '
+            'найденным пользователям.'
+        )
+
+    def test_03_users_bulk_delete(self, admin_client, user, moderator,
+                                  django_user_model):
+        data = {
+            'usernames': [user.username, moderator.username],
+            'action': 'delete',
+        }
+        response = admin_client.post(
+            self.USERS_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [item['status'] for item in response.json()['results']] == [
+            'deleted', 'deleted'
+        ]
+        assert not django_user_model.objects.filter(
+            username__in=(user.username, moderator.username)
+        ).exists(), (
+            'Проверьте, что массовое удаление удаляет всех переданных '
+            'пользователей.'
+        )
+
+    @pytest.mark.parametrize('data', [
+        {},
+        {'usernames': [], 'action': 'delete'},
+        {'usernames': ['TestUser'], 'action': 'ban'},
+        {'usernames': ['TestUser'], 'action': 'update'},
+        {'usernames': ['TestUser'], 'action': 'update',
+         'data': {'role': 'superhero'}},
+    ])
+    def test_04_users_bulk_bad_request(self, admin_client, user, data):
+        response = admin_client.post(
+            self.USERS_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.USERS_BULK_URL}` с '
+            'некорректными данными возвращает ответ со статусом 400.'
+        )
+
+    def test_05_users_bulk_refuses_self_and_superusers(
+            self, admin_client, admin, user, user_superuser,
+            django_user_model):
+        data = {
+            'usernames': [admin.username, user_superuser.username,
+                          user.username],
+            'action': 'delete',
+        }
+        response = admin_client.post(
+            self.USERS_BULK_URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'results': [
+            {'username': admin.username, 'status': 'refused'},
+            {'username': user_superuser.username, 'status': 'refused'},
+            {'username': user.username, 'status': 'deleted'},
+        ]}, (
+            'Проверьте, что массовый запрос не изменяет и не удаляет '
+            'учётную запись автора запроса и суперпользователей и '
+            'возвращает для них статус `refused`.'
+        )
+        assert django_user_model.objects.filter(
+            username__in=(admin.username, user_superuser.username)
+        ).count() == 2, (
+            'Проверьте, что автор запроса и суперпользователи не удаляются '
+            'массовым запросом.'
+        )
+
+        data = {
+            'usernames': [admin.username],
+            'action': 'update',
+            'data': {'role': 'user'},
+        }
+        response = admin_client.post(
+            self.USERS_BULK_URL, data=data, format='json'
+        )
+        assert response.json()['results'][0]['status'] == 'refused'
+        admin.refresh_from_db()
+        assert admin.role == 'admin', (
+            'Проверьте, что администратор не может понизить свою роль '
+            'массовым запросом.'
+        )
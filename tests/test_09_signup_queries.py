@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.serializers import UserCreateSerializer
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09SignupQueries:
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_existing_user_single_query(
+            self, client, user, django_assert_num_queries):
+        data = {'username': user.username, 'email': user.email}
+        with django_assert_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Повторная регистрация с теми же `username` и `email` должна '
+            'выполняться одним запросом к базе и возвращать статус 200.'
+        )
+
+    def test_02_signup_conflict_single_query(
+            self, client, user, django_assert_num_queries):
+        data = {'username': user.username, 'email': 'other@yamdb.fake'}
+        with django_assert_num_queries(1):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+
+    @pytest.mark.parametrize('email,expected_status', [
+        ('testuser@yamdb.fake', HTTPStatus.OK),
+        ('other@yamdb.fake', HTTPStatus.BAD_REQUEST),
+    ])
+    def test_03_signup_concurrent_insert(self, client, user, monkeypatch,
+                                         email, expected_status,
+                                         django_user_model):
+        def validate_before_concurrent_insert(self, data):
+            self.user = None
+            return data
+
+        monkeypatch.setattr(
+            UserCreateSerializer, 'validate',
+            validate_before_concurrent_insert
+        )
+        data = {'username': user.username, 'email': email}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == expected_status, (
+            'Если пользователь был создан параллельным запросом между '
+            'проверкой и вставкой, регистрация должна вернуть 200 для той '
+            'же пары `username` и `email` и 400 при конфликте, а не 500.'
+        )
+        assert django_user_model.objects.filter(
+            username=user.username).count() == 1
@@ -0,0 +1,57 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.v1.authentication import (
+    CachedJWTAuthentication, ValidatedTokenCache
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TokenCache:
+    USERS_ME_URL = '/api/v1/users/me/'
+
+    def test_01_token_validated_once(self, user_client, monkeypatch):
+        CachedJWTAuthentication.token_cache.clear()
+        calls = []
+        validate = JWTAuthentication.get_validated_token
+
+        def counting_validate(self, raw_token):
+            calls.append(raw_token)
+            return validate(self, raw_token)
+
+        monkeypatch.setattr(
+            JWTAuthentication, 'get_validated_token', counting_validate
+        )
+        for _ in range(3):
+            response = user_client.get(self.USERS_ME_URL)
+            assert response.status_code == HTTPStatus.OK
+        assert len(calls) == 1, (
+            'Проверьте, что повторно присланный токен берётся из кэша, '
+            'а не проверяется заново.'
+        )
+
+    def test_02_deleted_user_rejected(self, user_client, user):
+        CachedJWTAuthentication.token_cache.clear()
+        assert user_client.get(self.USERS_ME_URL).status_code == (
+            HTTPStatus.OK
+        )
+        user.delete()
+        assert user_client.get(self.USERS_ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что кэш токенов не пропускает запросы удалённых '
+            'пользователей.'
+        )
+
+    def test_03_cache_expiry_and_size(self):
+        cache = ValidatedTokenCache(max_size=2)
+        cache.set(b'expired', 'token', time.time() - 1)
+        assert cache.get(b'expired') is None
+        for key in (b'a', b'b', b'c'):
+            cache.set(key, key, time.time() + 60)
+        assert len(cache) == 2
+        assert cache.get(b'a') is None
+        assert cache.get(b'c') == b'c'
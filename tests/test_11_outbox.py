@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import query_plan
+from users.models import OutboxMessage, OutboxStatus
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Outbox:
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def create_messages(self, count):
+        OutboxMessage.objects.bulk_create(
+            OutboxMessage(
+                subject='Тема',
+                body='Текст',
+                from_email='admin@yamdb.com',
+                to=f'user{number}@yamdb.fake',
+            )
+            for number in range(count)
+        )
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_USE_OUTBOX = True
+        outbox_before_count = len(mail.outbox)
+        data = {'username': 'queued', 'email': 'queued@yamdb.fake'}
+        response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'При включённом EMAIL_USE_OUTBOX письмо не должно '
+            'отправляться сразу.'
+        )
+        assert OutboxMessage.objects.filter(
+            to=data['email'], status=OutboxStatus.PENDING
+        ).exists()
+
+    def test_02_flush_outbox_batches(self, monkeypatch):
+        self.create_messages(5)
+        calls = []
+        send_messages = EmailBackend.send_messages
+
+        def counting_send_messages(self, messages):
+            calls.append(len(messages))
+            return send_messages(self, messages)
+
+        monkeypatch.setattr(
+            EmailBackend, 'send_messages', counting_send_messages
+        )
+        outbox_before_count = len(mail.outbox)
+        call_command('flush_outbox', batch_size=2)
+
+        assert calls == [2, 2, 1], (
+            'Проверьте, что письма отправляются пакетами размером '
+            '`--batch-size`.'
+        )
+        assert len(mail.outbox) == outbox_before_count + 5
+        assert not OutboxMessage.objects.exclude(
+            status=OutboxStatus.SENT
+        ).exists()
+
+    def test_03_flush_outbox_retries(self, monkeypatch):
+        self.create_messages(2)
+
+        def failing_send_messages(self, messages):
+            raise ConnectionError('smtp is down')
+
+        monkeypatch.setattr(
+            EmailBackend, 'send_messages', failing_send_messages
+        )
+        call_command('flush_outbox', max_attempts=2, backoff=60)
+        assert set(
+            OutboxMessage.objects.values_list('status', 'attempts')
+        ) == {(OutboxStatus.PENDING, 1)}, (
+            'Проверьте, что неотправленные письма откладываются для '
+            'повторной попытки.'
+        )
+
+        OutboxMessage.objects.update(next_attempt_at='2000-01-01T00:00Z')
+        call_command('flush_outbox', max_attempts=2, backoff=60)
+        assert set(
+            OutboxMessage.objects.values_list('status', 'attempts')
+        ) == {(OutboxStatus.FAILED, 2)}, (
+            'Проверьте, что после `--max-attempts` попыток письмо '
+            'помечается как неотправленное.'
+        )
+
+    def test_04_flush_outbox_skips_claimed(self):
+        from users.management.commands.flush_outbox import Command
+
+        self.create_messages(3)
+        claimed = Command().claim_batch(2, lease=300)
+        assert len(claimed) == 2
+        outbox_before_count = len(mail.outbox)
+        call_command('flush_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что `flush_outbox` не отправляет письма, уже '
+            'захваченные другой отправкой.'
+        )
+        assert set(
+            OutboxMessage.objects.filter(
+                pk__in=[message.pk for message in claimed]
+            ).values_list('status', flat=True)
+        ) == {OutboxStatus.PENDING}
+
+    def test_05_flush_outbox_partial_send(self, monkeypatch):
+        self.create_messages(3)
+        send_messages = EmailBackend.send_messages
+
+        def partial_send_messages(self, messages):
+            return send_messages(self, messages[:1])
+
+        monkeypatch.setattr(
+            EmailBackend, 'send_messages', partial_send_messages
+        )
+        call_command('flush_outbox')
+        statuses = list(
+            OutboxMessage.objects.values_list('status', 'attempts')
+        )
+        assert statuses == [
+            (OutboxStatus.SENT, 1),
+            (OutboxStatus.PENDING, 1),
+            (OutboxStatus.PENDING, 1),
+        ], (
+            'Проверьте, что отправленными помечаются только письма, '
+            'которые вернул `send_messages()`, а остальные откладываются.'
+        )
+
+    def test_06_flush_outbox_claim_uses_indexes(self):
+        self.create_messages(3)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('flush_outbox', batch_size=2)
+        for marker in (
+            '"next_attempt_at" <=', '"users_outboxmessage"."lease" = '
+        ):
+            plan = query_plan(queries, marker)
+            assert not any(step.startswith('SCAN') for step in plan), (
+                'Проверьте, что захват пакета не просматривает всю '
+                f'очередь писем: {plan}'
+            )
+
+    def test_07_flush_outbox_rejects_empty_lease(self):
+        self.create_messages(1)
+        with pytest.raises(CommandError):
+            call_command('flush_outbox', lease=0)
+        assert OutboxMessage.objects.get().status == OutboxStatus.PENDING
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tests.utils import query_plan
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12PurgeUnconfirmed:
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_token_marks_user_confirmed(self, client, django_user_model):
+        data = {'username': 'confirmed', 'email': 'confirmed@yamdb.fake'}
+        client.post(self.URL_SIGNUP, data=data)
+        new_user = django_user_model.objects.get(username=data['username'])
+        assert not new_user.is_confirmed
+
+        response = client.post(self.URL_TOKEN, data={
+            'username': new_user.username,
+            'confirmation_code': default_token_generator.make_token(new_user)
+        })
+        assert response.status_code == HTTPStatus.OK
+        new_user.refresh_from_db()
+        assert new_user.is_confirmed, (
+            'Проверьте, что после получения токена пользователь помечается '
+            'как подтвердивший регистрацию.'
+        )
+
+    def test_02_admin_created_user_confirmed(self, admin_client,
+                                             django_user_model):
+        data = {'username': 'by_admin', 'email': 'by_admin@yamdb.fake'}
+        admin_client.post('/api/v1/users/', data=data)
+        assert django_user_model.objects.get(
+            username=data['username']
+        ).is_confirmed
+
+    def test_03_purge_unconfirmed(self, django_user_model, admin):
+        old = timezone.now() - timedelta(hours=48)
+        for number in range(5):
+            django_user_model.objects.create(
+                username=f'bot{number}', email=f'bot{number}@yamdb.fake',
+                date_joined=old,
+            )
+        django_user_model.objects.create(
+            username='recent', email='recent@yamdb.fake'
+        )
+        django_user_model.objects.create(
+            username='real', email='real@yamdb.fake',
+            date_joined=old, is_confirmed=True,
+        )
+        django_user_model.objects.filter(pk=admin.pk).update(
+            date_joined=old, is_staff=True
+        )
+
+        call_command('purge-unconfirmed', hours=24, batch_size=2)
+
+        assert set(
+            django_user_model.objects.values_list('username', flat=True)
+        ) == {'recent', 'real', admin.username}, (
+            'Проверьте, что удаляются только неподтверждённые пользователи '
+            'старше `--hours` часов.'
+        )
+
+    def test_04_purge_uses_index(self, django_user_model):
+        django_user_model.objects.create(
+            username='bot', email='bot@yamdb.fake',
+            date_joined=timezone.now() - timedelta(hours=48),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge-unconfirmed', hours=24)
+        plan = query_plan(queries, 'ORDER BY')
+        assert any(
+            'USING INDEX user_unconfirmed_joined' in step for step in plan
+        ), (
+            'Проверьте, что пакет для очистки выбирается по индексу '
+            f'`user_unconfirmed_joined`, а не полным просмотром: {plan}'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan)
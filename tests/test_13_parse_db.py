@@ -0,0 +1,314 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import shutil
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.csv_import import TABLES, WRITERS
+from reviews.models import Category, ImportCheckpoint, Review, Title
+from users.models import User
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def append_rows(path, rows):
+    content = path.read_text(encoding='utf-8').rstrip('\n')
+    path.write_text(content + '\n' + '\n'.join(rows) + '\n',
+                    encoding='utf-8')
+
+
+def csv_row_count(file_name):
+    with open(DATA_DIR / file_name, newline='', encoding='utf-8') as csvfile:
+        return sum(1 for _ in csv.reader(csvfile)) - 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ParseDb:
+
+    def test_01_import_all_tables(self):
+        call_command('parse-db', batch_size=7)
+        for table in TABLES:
+            assert table.model.objects.count() == csv_row_count(
+                table.file_name
+            ), (
+                f'Проверьте, что из `{table.file_name}` импортируются все '
+                'строки.'
+            )
+        assert Title.objects.get(pk=1).genre.exists(), (
+            'Проверьте, что связи произведений и жанров из '
+            '`genre_title.csv` импортируются.'
+        )
+
+    @pytest.mark.parametrize('compress', [gzip.open, bz2.open, lzma.open])
+    def test_02_import_compressed(self, tmp_path, compress):
+        suffix = {gzip.open: '.gz', bz2.open: '.bz2', lzma.open: '.xz'}
+        for table in TABLES:
+            path = tmp_path / f'{table.file_name}{suffix[compress]}'
+            with compress(path, 'wb') as archive:
+                archive.write((DATA_DIR / table.file_name).read_bytes())
+        call_command('parse-db', data_dir=tmp_path)
+        for table in TABLES:
+            assert table.model.objects.count() == csv_row_count(
+                table.file_name
+            ), (
+                'Проверьте, что сжатые файлы читаются так же, как обычные.'
+            )
+
+    def test_03_invalid_row_rolls_back_file(self, tmp_path):
+        for table in TABLES:
+            shutil.copy(DATA_DIR / table.file_name, tmp_path)
+        append_rows(tmp_path / 'titles.csv', ['1000,Из будущего,3000,1'])
+        with pytest.raises(CommandError, match='titles.csv, line .*Год'):
+            call_command('parse-db', data_dir=tmp_path, skip_validation=True)
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в строке файл не импортируется '
+            'частично.'
+        )
+
+    def test_04_import_parallel(self):
+        call_command('parse-db', workers=2, batch_size=10)
+        for table in TABLES:
+            assert table.model.objects.count() == csv_row_count(
+                table.file_name
+            ), (
+                'Проверьте, что параллельный импорт загружает все строки.'
+            )
+
+    def test_05_upsert_applies_delta(self, tmp_path):
+        call_command('parse-db')
+        for table in TABLES:
+            shutil.copy(DATA_DIR / table.file_name, tmp_path)
+        category_csv = tmp_path / 'category.csv'
+        category_csv.write_text(
+            category_csv.read_text(encoding='utf-8').replace(
+                '1,Фильм,movie', '1,Кино,movie'
+            ),
+            encoding='utf-8'
+        )
+        append_rows(category_csv, ['10,Игра,game', '11,Дубликат,book'])
+
+        out = StringIO()
+        call_command('parse-db', mode='upsert', data_dir=tmp_path,
+                     skip_validation=True, stdout=out)
+
+        assert Category.objects.get(pk=1).name == 'Кино', (
+            'Проверьте, что режим upsert обновляет изменённые строки.'
+        )
+        assert Category.objects.filter(pk=10, slug='game').exists(), (
+            'Проверьте, что режим upsert добавляет новые строки.'
+        )
+        assert not Category.objects.filter(pk=11).exists(), (
+            'Проверьте, что строка с занятым slug пропускается.'
+        )
+        assert (
+            'category.csv: 5 rows' in out.getvalue()
+            and 'created 1, updated 1, unchanged 2, conflicts 1'
+            in out.getvalue()
+        )
+        assert 'titles.csv: 32 rows' in out.getvalue()
+        assert 'updated 0, unchanged 32' in out.getvalue(), (
+            'Проверьте, что неизменённые строки не перезаписываются.'
+        )
+
+    def test_06_validation_rejects_before_writing(self, tmp_path):
+        for table in TABLES:
+            shutil.copy(DATA_DIR / table.file_name, tmp_path)
+        append_rows(tmp_path / 'review.csv', [
+            '1000,9999,Нет такого произведения,100,5,2020-01-01T00:00Z',
+            '1001,1,Оценка вне диапазона,104,11,2020-01-01T00:00Z',
+        ])
+        append_rows(tmp_path / 'comments.csv', [
+            '1000,1000,Комментарий к отклонённому отзыву,100,'
+            '2020-01-01T00:00Z',
+        ])
+        report = tmp_path / 'rejects.ndjson'
+
+        with pytest.raises(CommandError, match='3 rows rejected'):
+            call_command('parse-db', data_dir=tmp_path, reject_report=report)
+        assert not Title.objects.exists(), (
+            'Проверьте, что при отклонённых строках ничего не записывается.'
+        )
+        rejects = [
+            json.loads(line)
+            for line in report.read_text(encoding='utf-8').splitlines()
+        ]
+        assert [(reject['file'], reject['field']) for reject in rejects] == [
+            ('review.csv', 'title_id'),
+            ('review.csv', 'score'),
+            ('comments.csv', 'review_id'),
+        ], (
+            'Проверьте, что отчёт об отказах содержит файл и поле каждой '
+            'отклонённой строки.'
+        )
+
+        call_command('parse-db', data_dir=tmp_path, reject_report=report,
+                     skip_rejected=True)
+        assert Review.objects.count() == csv_row_count('review.csv'), (
+            'Проверьте, что с --skip-rejected импортируются только '
+            'корректные строки.'
+        )
+
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_07_resume_after_interruption(self, monkeypatch, workers):
+        insert = WRITERS['insert']
+        batches = []
+
+        def failing_insert(table, batch):
+            if table.file_name == 'review.csv' and len(batches) == 2:
+                raise RuntimeError('import killed')
+            if table.file_name == 'review.csv':
+                batches.append(batch)
+            return insert(table, batch)
+
+        monkeypatch.setitem(WRITERS, 'insert', failing_insert)
+        with pytest.raises(RuntimeError):
+            call_command('parse-db', checkpoint=True, batch_size=10,
+                         workers=workers)
+        assert Review.objects.count() == 20, (
+            'Проверьте, что с --checkpoint каждый пакет коммитится сразу.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(file_name='review.csv')
+        assert (checkpoint.rows_committed, checkpoint.completed) == (
+            20, False
+        )
+
+        monkeypatch.setitem(WRITERS, 'insert', insert)
+        out = StringIO()
+        call_command('parse-db', resume=True, batch_size=10,
+                     workers=workers, stdout=out)
+        for table in TABLES:
+            assert table.model.objects.count() == csv_row_count(
+                table.file_name
+            ), (
+                'Проверьте, что --resume дозагружает только оставшиеся '
+                'строки.'
+            )
+        assert 'category.csv: already imported, skipped' in out.getvalue()
+        assert 'review.csv: resuming after 20 rows' in out.getvalue(), (
+            'Проверьте, что --resume пропускает уже загруженные файлы и '
+            'строки.'
+        )
+        assert not ImportCheckpoint.objects.filter(completed=False).exists()
+
+    def test_08_upsert_checks_every_unique_key(self, tmp_path):
+        call_command('parse-db')
+        for table in TABLES:
+            shutil.copy(DATA_DIR / table.file_name, tmp_path)
+        users_csv = tmp_path / 'users.csv'
+        users_csv.write_text(
+            users_csv.read_text(encoding='utf-8').replace(
+                '102,faust,faust@yamdb.fake',
+                '102,faust,bingobongo@yamdb.fake'
+            ),
+            encoding='utf-8'
+        )
+        append_rows(users_csv, [
+            '200,newbie,dup@yamdb.fake,user,,,',
+            '201,newbie2,dup@yamdb.fake,user,,,',
+            '202,nobody,capt_obvious@yamdb.fake,user,,,',
+        ])
+
+        out = StringIO()
+        call_command('parse-db', mode='upsert', data_dir=tmp_path,
+                     skip_validation=True, stdout=out)
+
+        users = User.objects.in_bulk([102, 200, 201, 202])
+        assert users[102].email == 'faust@yamdb.fake', (
+            'Проверьте, что режим upsert не меняет email на занятый другим '
+            'пользователем.'
+        )
+        assert set(users) == {102, 200}, (
+            'Проверьте, что режим upsert пропускает строки с email, '
+            'занятым в базе или повторённым в том же пакете.'
+        )
+        assert 'created 1, updated 0, unchanged 4, conflicts 3' in (
+            out.getvalue()
+        )
+
+    def test_09_validation_checks_unique_keys_and_choices(
+            self, tmp_path, django_user_model):
+        for table in TABLES:
+            shutil.copy(DATA_DIR / table.file_name, tmp_path)
+        django_user_model.objects.create_user(
+            username='old_faust', email='faust@yamdb.fake'
+        )
+        append_rows(tmp_path / 'users.csv', [
+            '200,superhero,superhero@yamdb.fake,superhero,,,',
+        ])
+        report = tmp_path / 'rejects.ndjson'
+
+        call_command('parse-db', data_dir=tmp_path, reject_report=report,
+                     validate_only=True)
+        rejects = [
+            json.loads(line)
+            for line in report.read_text(encoding='utf-8').splitlines()
+        ]
+        assert [
+            (reject['file'], reject['id'], reject['field'])
+            for reject in rejects
+            if reject['file'] == 'users.csv'
+        ] == [
+            ('users.csv', '102', 'email'),
+            ('users.csv', '200', 'role'),
+        ], (
+            'Проверьте, что предварительная проверка отклоняет строки с '
+            'email, уже занятым в базе, и с недопустимой ролью.'
+        )
+
+    def test_10_resume_validates_rest_in_started_mode(self, monkeypatch):
+        from reviews import csv_validation
+
+        upsert = WRITERS['upsert']
+        calls = []
+
+        def failing_upsert(table, batch):
+            if table.file_name == 'review.csv':
+                calls.append(len(batch))
+                if len(calls) == 3:
+                    raise RuntimeError('import killed')
+            return upsert(table, batch)
+
+        monkeypatch.setitem(WRITERS, 'upsert', failing_upsert)
+        with pytest.raises(RuntimeError):
+            call_command('parse-db', mode='upsert', checkpoint=True,
+                         batch_size=10)
+
+        check_row = csv_validation.check_row
+        checked = Counter()
+
+        def counting_check_row(table, *args):
+            checked[table.file_name] += 1
+            return check_row(table, *args)
+
+        monkeypatch.setattr(csv_validation, 'check_row', counting_check_row)
+        out = StringIO()
+        call_command('parse-db', resume=True, batch_size=10, stdout=out)
+
+        assert dict(checked) == {
+            'review.csv': csv_row_count('review.csv') - 20,
+            'comments.csv': csv_row_count('comments.csv'),
+        }, (
+            'Проверьте, что при --resume проверяются только строки после '
+            'контрольных точек.'
+        )
+        assert len(calls) > 3 and 'upsert mode' in out.getvalue(), (
+            'Проверьте, что --resume продолжает импорт в режиме, в котором '
+            'он был начат.'
+        )
+        assert Review.objects.count() == csv_row_count('review.csv')
+
+        call_command('parse-db', mode='upsert', checkpoint=True)
+        assert set(
+            ImportCheckpoint.objects.values_list('rows_committed', flat=True)
+        ) == {0}, (
+            'Проверьте, что контрольная точка считает только записанные '
+            'строки, а не неизменённые.'
+        )
@@ -0,0 +1,107 @@
+import csv
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.csv_import import TABLES
+from reviews.models import Comment, Review
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_csv(path, opener=open):
+    with opener(path, 'rt', newline='', encoding='utf-8') as csvfile:
+        return list(csv.reader(csvfile))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ExportDb:
+
+    def test_01_csv_matches_import_layout(self, tmp_path):
+        call_command('parse-db')
+        call_command('export-db', tmp_path)
+        for table in TABLES:
+            exported = read_csv(tmp_path / table.file_name)
+            original = read_csv(DATA_DIR / table.file_name)
+            assert exported[0] == original[0], (
+                f'Проверьте, что заголовок `{table.file_name}` совпадает с '
+                'исходным файлом.'
+            )
+            assert len(exported) == len(original), (
+                f'Проверьте, что в `{table.file_name}` выгружаются все '
+                'записи.'
+            )
+        assert read_csv(tmp_path / 'category.csv') == read_csv(
+            DATA_DIR / 'category.csv'
+        )
+
+    def test_02_compressed_export_round_trip(self, tmp_path):
+        call_command('parse-db')
+        review = Review.objects.get(pk=1)
+        call_command('export-db', tmp_path, compress='gz')
+        assert len(read_csv(tmp_path / 'review.csv.gz', gzip.open)) == (
+            len(read_csv(DATA_DIR / 'review.csv'))
+        )
+
+        for table in reversed(TABLES):
+            table.model.objects.all().delete()
+        call_command('parse-db', data_dir=tmp_path)
+        for table in TABLES:
+            assert table.model.objects.count() == (
+                len(read_csv(DATA_DIR / table.file_name)) - 1
+            ), (
+                'Проверьте, что выгрузка загружается обратно командой '
+                '`parse-db`.'
+            )
+        assert Review.objects.get(pk=1).text == review.text
+
+    def test_03_ndjson(self, tmp_path):
+        call_command('parse-db')
+        call_command('export-db', tmp_path, fmt='ndjson')
+        lines = (tmp_path / 'titles.ndjson').read_text(
+            encoding='utf-8'
+        ).splitlines()
+        assert len(lines) == len(read_csv(DATA_DIR / 'titles.csv')) - 1
+        assert json.loads(lines[0]) == {
+            'id': 1, 'name': 'Побег из Шоушенка', 'year': 1994,
+            'category': 1,
+        }, (
+            'Проверьте, что каждая строка NDJSON - объект с колонками '
+            'исходного CSV.'
+        )
+
+    def test_04_round_trip_keeps_dates(self, tmp_path):
+        call_command('parse-db')
+        dates = {
+            model: dict(model.objects.values_list('pk', 'pub_date'))
+            for model in (Review, Comment)
+        }
+        assert dates[Review][1].year == 2019, (
+            'Проверьте, что `parse-db` берёт `pub_date` из CSV, а не время '
+            'импорта.'
+        )
+        call_command('export-db', tmp_path)
+        for table in reversed(TABLES):
+            table.model.objects.all().delete()
+        call_command('parse-db', data_dir=tmp_path)
+        for model, model_dates in dates.items():
+            assert dict(
+                model.objects.values_list('pk', 'pub_date')
+            ) == model_dates, (
+                'Проверьте, что выгрузка и загрузка сохраняют `pub_date`.'
+            )
+
+        out = StringIO()
+        call_command('parse-db', mode='upsert', data_dir=tmp_path,
+                     skip_validation=True, stdout=out)
+        review_line = next(
+            line for line in out.getvalue().splitlines()
+            if line.startswith('review.csv')
+        )
+        assert 'updated 0' in review_line, (
+            'Проверьте, что режим upsert сравнивает `pub_date` с базой.'
+        )
@@ -0,0 +1,78 @@
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from reviews.models import Comment, Review, Title, TitleGenre
+
+
+def generated_state():
+    return (
+        list(Title.objects.order_by('pk').values_list('name', 'year')),
+        list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score'
+        )),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15GenerateData:
+
+    def test_01_generate(self, django_user_model):
+        call_command('generate-data', titles=50, users=40,
+                     reviews_per_title=6, comments_per_review=2, seed=7)
+        assert Title.objects.count() == 50
+        assert django_user_model.objects.count() == 40
+        assert TitleGenre.objects.count() >= 50, (
+            'Проверьте, что у каждого произведения есть жанр.'
+        )
+        reviews = Review.objects.count()
+        assert 200 <= reviews <= 400, (
+            'Проверьте, что в среднем на произведение приходится '
+            '`--reviews-per-title` отзывов.'
+        )
+        assert Comment.objects.exists()
+        per_title = Counter(
+            Review.objects.values_list('title_id', flat=True)
+        )
+        assert max(per_title.values()) >= 4 * reviews / 50, (
+            'Проверьте, что отзывы распределены неравномерно: у популярных '
+            'произведений их больше.'
+        )
+
+    def test_02_seed_is_reproducible(self, django_user_model):
+        call_command('generate-data', titles=20, users=10,
+                     reviews_per_title=3, seed=1)
+        first = generated_state()
+        Title.objects.all().delete()
+        django_user_model.objects.all().delete()
+        call_command('generate-data', titles=20, users=10,
+                     reviews_per_title=3, seed=1)
+        titles, reviews = generated_state()
+        assert [title[0].rsplit(' ', 1)[0] for title in titles] == [
+            title[0].rsplit(' ', 1)[0] for title in first[0]
+        ], (
+            'Проверьте, что одно и то же зерно даёт те же данные.'
+        )
+        assert [review[2] for review in reviews] == [
+            review[2] for review in first[1]
+        ]
+
+    def test_03_dates_are_spread(self):
+        call_command('generate-data', titles=20, users=10,
+                     reviews_per_title=5, comments_per_review=2, days=30,
+                     seed=3)
+        dates = list(Review.objects.values_list('pub_date', flat=True))
+        assert len(set(dates)) == len(dates), (
+            'Проверьте, что отзывы получают разные даты публикации.'
+        )
+        spread = max(dates) - min(dates)
+        assert spread.days >= 20, (
+            'Проверьте, что даты отзывов разбросаны по `--days` дням.'
+        )
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), (
+            'Проверьте, что комментарий не может быть раньше отзыва.'
+        )
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1 import exports
+from reviews.models import Title
+
+
+@pytest.fixture
+def partner_client(django_user_model):
+    partner = django_user_model.objects.create_user(
+        username='TestPartner', email='testpartner@yamdb.fake',
+        role='partner'
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(partner)}'
+    )
+    return client
+
+
+def content_of(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitlesExport:
+    URL_EXPORT = '/api/v1/titles/export/'
+
+    def test_01_access(self, client, user_client, moderator_client,
+                       admin_client, partner_client):
+        assert client.get(self.URL_EXPORT).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        for forbidden in (user_client, moderator_client):
+            assert forbidden.get(self.URL_EXPORT).status_code == (
+                HTTPStatus.FORBIDDEN
+            ), (
+                'Проверьте, что выгрузка каталога недоступна обычным '
+                'пользователям и модераторам.'
+            )
+        for allowed in (admin_client, partner_client):
+            assert allowed.get(self.URL_EXPORT).status_code == (
+                HTTPStatus.OK
+            ), (
+                'Проверьте, что выгрузка каталога доступна администраторам '
+                'и партнёрам.'
+            )
+
+    def test_02_ndjson(self, partner_client):
+        call_command('parse-db')
+        response = partner_client.get(self.URL_EXPORT)
+        assert response['Content-Type'] == 'application/x-ndjson'
+        titles = [
+            json.loads(line) for line in content_of(response).splitlines()
+        ]
+        assert [title['id'] for title in titles] == list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        ), 'Проверьте, что выгружаются все произведения по порядку id.'
+
+        detail = partner_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert titles[0]['rating'] == detail.json()['rating']
+        assert titles[0]['category'] == detail.json()['category']['slug']
+        assert titles[0]['genre'] == sorted(
+            genre['slug'] for genre in detail.json()['genre']
+        )
+
+    def test_03_csv(self, admin_client):
+        call_command('parse-db')
+        response = admin_client.get(self.URL_EXPORT, {'output': 'csv'})
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.reader(io.StringIO(content_of(response))))
+        assert rows[0] == list(exports.EXPORT_COLUMNS)
+        assert len(rows) - 1 == Title.objects.count()
+
+        response = admin_client.get(self.URL_EXPORT, {'output': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_queries_per_chunk(self, admin_client, monkeypatch,
+                                  django_assert_max_num_queries):
+        call_command('parse-db')
+        monkeypatch.setattr(exports, 'EXPORT_CHUNK_SIZE', 10)
+        chunks = -(-Title.objects.count() // 10)
+        # Два запроса на кусок, один пустой завершающий и один на
+        # пользователя из токена.
+        with django_assert_max_num_queries(2 * chunks + 2):
+            content = content_of(admin_client.get(self.URL_EXPORT))
+        assert len(content.splitlines()) == Title.objects.count()
@@ -0,0 +1,101 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from reviews.models import Comment, Review, Title
+from reviews.snapshots import SnapshotError, restore_file
+
+
+@pytest.fixture
+def snapshot_dir(settings, tmp_path):
+    settings.SNAPSHOT_DIR = tmp_path / 'snapshots'
+    return settings.SNAPSHOT_DIR
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Snapshot:
+
+    def test_01_save_and_restore(self, snapshot_dir):
+        call_command('parse-db')
+        counts = (Title.objects.count(), Review.objects.count(),
+                  Comment.objects.count())
+        call_command('snapshot', 'save', 'loaded')
+        assert (snapshot_dir / 'loaded.sqlite3').exists()
+
+        Title.objects.all().delete()
+        assert not Review.objects.exists()
+
+        call_command('snapshot', 'restore', 'loaded')
+        assert (Title.objects.count(), Review.objects.count(),
+                Comment.objects.count()) == counts, (
+            'Проверьте, что восстановление снимка возвращает данные на '
+            'момент сохранения.'
+        )
+
+    def test_02_list_and_delete(self, snapshot_dir):
+        call_command('snapshot', 'save', 'empty')
+        out = StringIO()
+        call_command('snapshot', 'list', stdout=out)
+        assert out.getvalue().startswith('empty\t')
+
+        call_command('snapshot', 'delete', 'empty')
+        assert not (snapshot_dir / 'empty.sqlite3').exists()
+
+    def test_03_errors(self, snapshot_dir):
+        with pytest.raises(CommandError, match='not found'):
+            call_command('snapshot', 'restore', 'missing')
+        with pytest.raises(CommandError, match='invalid snapshot name'):
+            call_command('snapshot', 'save', '../outside')
+        with pytest.raises(CommandError, match='in-memory'):
+            call_command('snapshot', 'save', 'copy', method='copy')
+
+    def test_04_restore_from_dir_with_uri_characters(self, settings,
+                                                      tmp_path):
+        settings.SNAPSHOT_DIR = tmp_path / 'snap?shots#100%'
+        call_command('parse-db')
+        count = Title.objects.count()
+        call_command('snapshot', 'save', 'loaded')
+        Title.objects.all().delete()
+        call_command('snapshot', 'restore', 'loaded')
+        assert Title.objects.count() == count, (
+            'Проверьте, что снимок восстанавливается из каталога, путь '
+            'которого содержит `?`, `#` и `%`.'
+        )
+
+    def test_05_copy_restore_checkpoints_wal(self, tmp_path):
+        snapshot = tmp_path / 'snapshot.sqlite3'
+        with sqlite3.connect(snapshot) as source:
+            source.execute('CREATE TABLE item (name TEXT)')
+            source.execute("INSERT INTO item VALUES ('snapshot')")
+        source.close()
+        db_path = tmp_path / 'db.sqlite3'
+        wrapper = DatabaseWrapper(
+            {**connections['default'].settings_dict, 'NAME': str(db_path)},
+            'snapshot_test'
+        )
+        with wrapper.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=wal')
+            cursor.execute('CREATE TABLE item (name TEXT)')
+            cursor.execute("INSERT INTO item VALUES ('current')")
+        reader = sqlite3.connect(db_path)
+        reader.execute('BEGIN')
+        reader.execute('SELECT * FROM item').fetchall()
+        with pytest.raises(SnapshotError, match='in use'):
+            restore_file(wrapper, snapshot)
+        reader.close()
+        assert sqlite3.connect(db_path).execute(
+            'SELECT name FROM item'
+        ).fetchall() == [('current',)], (
+            'Проверьте, что база с незаписанным журналом WAL не '
+            'перезаписывается копированием.'
+        )
+
+        restore_file(wrapper, snapshot)
+        assert sqlite3.connect(db_path).execute(
+            'SELECT name FROM item'
+        ).fetchall() == [('snapshot',)]
@@ -0,0 +1,55 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from api.sqlite import pragma_statements
+
+
+def pragma(db_connection, name):
+    with db_connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SqlitePragmas:
+
+    def test_01_pragmas_applied(self, settings, tmp_path):
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')
+        })
+        try:
+            assert pragma(wrapper, 'journal_mode') == 'wal', (
+                'Проверьте, что новые соединения SQLite переводятся в режим '
+                'WAL.'
+            )
+            assert pragma(wrapper, 'busy_timeout') == (
+                settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+            assert pragma(wrapper, 'synchronous') == 1
+            assert pragma(wrapper, 'temp_store') == 2
+            assert pragma(wrapper, 'cache_size') == (
+                settings.SQLITE_PRAGMAS['cache_size']
+            )
+        finally:
+            wrapper.close()
+
+    def test_02_pragmas_from_settings(self, settings, tmp_path):
+        settings.SQLITE_PRAGMAS = {}
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')
+        })
+        try:
+            assert pragma(wrapper, 'journal_mode') == 'delete', (
+                'Проверьте, что пустой SQLITE_PRAGMAS оставляет настройки '
+                'SQLite по умолчанию.'
+            )
+        finally:
+            wrapper.close()
+
+    def test_03_invalid_pragmas(self):
+        with pytest.raises(ImproperlyConfigured):
+            pragma_statements({'journal_mode': 'wal; DROP TABLE x'})
+        with pytest.raises(ImproperlyConfigured):
+            pragma_statements({'writable_schema': 1})
@@ -0,0 +1,162 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.write_queue import WriteQueue, WriteQueueUnavailable, write_queue
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.fixture
+def enabled_queue(settings):
+    settings.WRITE_QUEUE_ENABLED = True
+    settings.WRITE_QUEUE_SIZE = 1
+    settings.WRITE_QUEUE_TIMEOUT = 0.2
+    return WriteQueue()
+
+
+def run_in_thread(func):
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func()
+        except Exception as error:
+            outcome['error'] = error
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19WriteQueue:
+
+    def test_01_writes_in_one_thread(self, enabled_queue):
+        results = [enabled_queue.submit(threading.get_ident) for _ in range(3)]
+        assert len(set(results)) == 1
+        assert results[0] != threading.get_ident(), (
+            'Проверьте, что записи выполняются в отдельном потоке очереди.'
+        )
+        assert enabled_queue.stats()['completed'] == 3
+
+    def test_02_errors_are_raised_to_caller(self, enabled_queue):
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError, match='boom'):
+            enabled_queue.submit(fail)
+        assert enabled_queue.stats()['failed'] == 1
+
+    def test_03_overload(self, enabled_queue):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        blocker, _ = run_in_thread(lambda: enabled_queue.submit(block))
+        started.wait()
+        waiting, waiting_outcome = run_in_thread(
+            lambda: enabled_queue.submit(lambda: 'late')
+        )
+        while enabled_queue.stats()['depth'] < 1:
+            threading.Event().wait(0.01)
+
+        with pytest.raises(WriteQueueUnavailable):
+            enabled_queue.submit(lambda: 'rejected')
+        waiting.join()
+        release.set()
+        blocker.join()
+
+        assert isinstance(waiting_outcome['error'], WriteQueueUnavailable), (
+            'Проверьте, что запись, не начатая до истечения '
+            '`WRITE_QUEUE_TIMEOUT`, отменяется.'
+        )
+        stats = enabled_queue.stats()
+        assert (stats['rejected'], stats['expired']) == (1, 1)
+        assert stats['wait_max_ms'] >= 0
+
+    def test_04_api_writes_through_queue(self, settings, admin_client, user):
+        settings.WRITE_QUEUE_ENABLED = True
+        completed = write_queue.stats()['completed']
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Побег из Шоушенка', 'year': 1994,
+            'category': 'movie', 'genre': ['drama'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        title = Title.objects.get()
+        response = admin_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'Отлично', 'score': 10}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert Review.objects.filter(title=title).exists()
+        assert write_queue.stats()['completed'] == completed + 2
+
+    def test_05_api_overload_returns_503(self, settings, client,
+                                         monkeypatch):
+        settings.WRITE_QUEUE_ENABLED = True
+
+        def overloaded(func):
+            raise WriteQueueUnavailable
+
+        monkeypatch.setattr(write_queue, 'submit', overloaded)
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'queued', 'email': 'queued@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что при переполненной очереди записи возвращается '
+            'статус 503.'
+        )
+
+    def test_06_expired_writes_free_capacity(self, enabled_queue):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        blocker, _ = run_in_thread(lambda: enabled_queue.submit(block))
+        started.wait()
+        for _ in range(2):
+            with pytest.raises(WriteQueueUnavailable):
+                enabled_queue.submit(lambda: 'late')
+        release.set()
+        blocker.join()
+
+        stats = enabled_queue.stats()
+        assert (stats['rejected'], stats['expired']) == (0, 2), (
+            'Проверьте, что отменённая запись освобождает место в очереди.'
+        )
+        assert enabled_queue.submit(lambda: 'next') == 'next'
+
+    def test_07_stuck_write_releases_request(self, enabled_queue,
+                                             settings):
+        settings.WRITE_QUEUE_WRITE_TIMEOUT = 0.2
+        release = threading.Event()
+        with pytest.raises(WriteQueueUnavailable):
+            enabled_queue.submit(release.wait)
+        assert enabled_queue.stats()['timed_out'] == 1, (
+            'Проверьте, что запрос не ждёт зависшую запись дольше '
+            '`WRITE_QUEUE_WRITE_TIMEOUT`.'
+        )
+        release.set()
+
+    def test_08_writer_recycles_connections(self, enabled_queue,
+                                            monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            'api.v1.write_queue.close_old_connections',
+            lambda: calls.append(threading.get_ident())
+        )
+        writer = enabled_queue.submit(threading.get_ident)
+        enabled_queue.submit(lambda: None)
+        assert calls == [writer, writer], (
+            'Проверьте, что поток очереди закрывает устаревшие соединения '
+            'после каждой записи.'
+        )
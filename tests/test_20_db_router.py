@@ -0,0 +1,146 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.db_router import ReadDatabase, ReplicaRouter, read_database
+from api.metrics import registry
+from reviews.models import Title
+from reviews.snapshots import save_snapshot
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Реплика - копия основной базы в файле, сделанная backup API."""
+    settings.SNAPSHOT_DIR = tmp_path
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.REPLICA_STICKY_CACHE: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'sticky'),
+        },
+    }
+    call_command('parse-db')
+    path = save_snapshot(REPLICA)
+    connections.databases[REPLICA] = {
+        **connections.databases['default'], 'NAME': str(path),
+        'TEST': {'NAME': str(path)},
+    }
+    yield path
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+def title_name(client, title_id):
+    return client.get(f'/api/v1/titles/{title_id}/').json()['name']
+
+
+def jwt_cache_requests():
+    return sum(
+        value for (name, labels), value in registry.values.items()
+        if name == 'yamdb_cache_requests_total'
+        and ('cache', 'jwt_token') in labels
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20DbRouter:
+
+    def test_01_router(self, settings):
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) == 'default', (
+            'Проверьте, что вне запроса чтение идёт из основной базы.'
+        )
+        request = SimpleNamespace()
+        token = read_database.set(ReadDatabase(request, REPLICA))
+        try:
+            assert router.db_for_read(Title) == 'default', (
+                'Проверьте, что до аутентификации DRF чтение идёт из '
+                'основной базы.'
+            )
+            request.auth = None
+            request.user = SimpleNamespace(is_authenticated=False)
+            assert router.db_for_read(Title) == REPLICA
+            assert router.db_for_read(get_user_model()) == 'default', (
+                'Проверьте, что пользователи всегда читаются из основной '
+                'базы.'
+            )
+            assert router.db_for_write(Title) == 'default'
+        finally:
+            read_database.reset(token)
+        settings.DATABASE_REPLICAS = [REPLICA]
+        assert not router.allow_migrate(REPLICA, 'reviews')
+        assert router.allow_migrate('default', 'reviews')
+
+    def test_02_reads_from_replica(self, replica, client):
+        title = Title.objects.get(pk=1)
+        Title.objects.filter(pk=title.pk).update(name='Только в основной')
+        assert title_name(client, title.pk) == title.name, (
+            'Проверьте, что GET-запросы читают с реплики.'
+        )
+
+    def test_03_read_your_writes(self, replica, admin_client, client):
+        title = Title.objects.get(pk=1)
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'name': 'Новое название'}
+        )
+        assert response.status_code == 200
+        assert title_name(admin_client, title.pk) == 'Новое название', (
+            'Проверьте, что после записи клиент читает свои изменения из '
+            'основной базы.'
+        )
+        assert title_name(client, title.pk) == title.name, (
+            'Проверьте, что остальные клиенты продолжают читать с реплики.'
+        )
+
+    def test_04_sticky_marker_follows_user(self, replica, admin_client,
+                                           admin):
+        title = Title.objects.get(pk=1)
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'name': 'Новое название'}
+        )
+        assert response.status_code == 200
+        assert any((replica.parent / 'sticky').iterdir()), (
+            'Проверьте, что метка записи хранится в общем кэше '
+            '`REPLICA_STICKY_CACHE`.'
+        )
+        new_token_client = APIClient()
+        new_token_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        assert title_name(new_token_client, title.pk) == 'Новое название', (
+            'Проверьте, что метка записи привязана к пользователю, а не к '
+            'токену.'
+        )
+
+    def test_05_new_user_authenticates(self, replica, client):
+        user = get_user_model().objects.create_user(
+            username='newcomer', email='newcomer@yamdb.fake'
+        )
+        new_client = APIClient()
+        new_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        response = new_client.get('/api/v1/users/me/')
+        assert response.status_code == 200, (
+            'Проверьте, что пользователь, которого ещё нет на реплике, '
+            'проходит аутентификацию.'
+        )
+
+    def test_06_token_checked_once(self, replica, admin_client):
+        before = jwt_cache_requests()
+        assert admin_client.get('/api/v1/titles/1/').status_code == 200
+        assert jwt_cache_requests() - before == 1, (
+            'Проверьте, что выбор базы не проверяет токен второй раз.'
+        )
+        before = jwt_cache_requests()
+        admin_client.patch('/api/v1/titles/1/', data={'name': 'Новое'})
+        assert jwt_cache_requests() - before == 1
@@ -0,0 +1,58 @@
+import logging
+import re
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SERVER_TIMING_RE = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=([\d.]+), '
+    r'render;dur=([\d.]+), total;dur=([\d.]+)$'
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ServerTiming:
+    URL_TITLES = '/api/v1/titles/'
+
+    def test_01_header_and_log(self, client, settings, caplog):
+        settings.SERVER_TIMING_ENABLED = True
+        call_command('parse-db')
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(self.URL_TITLES)
+        match = SERVER_TIMING_RE.match(response['Server-Timing'])
+        assert match, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` с '
+            'временем базы, сериализации, рендеринга и общим временем.'
+        )
+        assert int(match.group(1)) == len(queries), (
+            'Проверьте, что в `Server-Timing` учитываются все запросы к '
+            'базе.'
+        )
+        assert float(match.group(2)) > 0
+        assert float(match.group(3)) > 0
+        assert (
+            f'method=GET path={self.URL_TITLES} status=200'
+            in caplog.text
+        )
+        assert f'queries={len(queries)}' in caplog.text
+
+    def test_02_disabled(self, client, settings):
+        settings.SERVER_TIMING_ENABLED = False
+        response = client.get(self.URL_TITLES)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что замеры отключаются настройкой '
+            '`SERVER_TIMING_ENABLED`.'
+        )
+
+    def test_03_requires_query_log(self, client, settings):
+        settings.SERVER_TIMING_ENABLED = True
+        settings.MIDDLEWARE = [
+            middleware for middleware in settings.MIDDLEWARE
+            if middleware != 'api.middleware.QueryLogMiddleware'
+        ]
+        with pytest.raises(ImproperlyConfigured):
+            client.get(self.URL_TITLES)
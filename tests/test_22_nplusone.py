@@ -0,0 +1,66 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from api.nplusone import (
+    NPlusOneError, assert_no_repeated_queries, fingerprint
+)
+from api.v1.views import TitleViewSet
+from reviews.models import Review, Title
+
+THRESHOLD = 2
+
+
+@pytest.fixture
+def popular_review():
+    call_command('generate-data', titles=10, users=20, reviews_per_title=5,
+                 comments_per_review=3, seed=3)
+    return Review.objects.annotate(
+        comment_count=Count('comments')
+    ).order_by('-comment_count').first()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NPlusOne:
+
+    def test_01_fingerprint(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE id = 5 AND  name = 'a''b' "
+            "AND x IN (%s, %s, %s)"
+        ) == fingerprint(
+            "SELECT * FROM t WHERE id = 17 AND name = 'c' AND x IN (%s)"
+        ), 'Проверьте, что отпечаток не зависит от литералов и списков IN.'
+
+    def test_02_middleware_reports_serializer_field(self, client, settings,
+                                                    monkeypatch,
+                                                    popular_review):
+        settings.NPLUSONE_ENABLED = True
+        settings.NPLUSONE_ACTION = 'raise'
+        settings.NPLUSONE_THRESHOLD = THRESHOLD
+        monkeypatch.setattr(TitleViewSet, 'queryset', Title.objects.all())
+        with pytest.raises(NPlusOneError, match=r'TitleListSerializer\.'):
+            client.get('/api/v1/titles/')
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ])
+    def test_03_no_repeated_queries(self, client, url, popular_review):
+        url = url.format(
+            title=popular_review.title_id, review=popular_review.pk
+        )
+        with assert_no_repeated_queries(THRESHOLD):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) > THRESHOLD
+
+    def test_04_tests_raise(self, client, settings, monkeypatch,
+                            popular_review):
+        settings.NPLUSONE_THRESHOLD = THRESHOLD
+        monkeypatch.setattr(TitleViewSet, 'queryset', Title.objects.all())
+        with pytest.raises(NPlusOneError):
+            client.get('/api/v1/titles/')
+        assert settings.NPLUSONE_ACTION == 'raise', (
+            'Проверьте, что в тестах повторённые запросы роняют тест.'
+        )
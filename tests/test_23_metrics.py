@@ -0,0 +1,166 @@
+import os
+from http import HTTPStatus
+
+import pytest
+
+from api.metrics import record_request, registry
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    registry.clear_files()
+    yield tmp_path
+    registry.clear_files()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Metrics:
+    URL_METRICS = '/metrics'
+    URL_TITLES = '/api/v1/titles/'
+
+    def test_01_request_metrics(self, admin_client, metrics_dir):
+        admin_client.get(self.URL_TITLES)
+        admin_client.get(self.URL_TITLES + '100500/')
+        response = admin_client.get(self.URL_METRICS)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith(
+            'text/plain; version=0.0.4'
+        )
+        text = response.content.decode()
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+        assert (
+            'yamdb_request_duration_seconds_bucket'
+            '{view="TitleViewSet.list",le="+Inf"} 1' in text
+        ), (
+            'Проверьте, что латентность учитывается по представлению и '
+            'действию, например `TitleViewSet.list`.'
+        )
+        assert 'yamdb_request_duration_seconds_count' in text
+        assert (
+            'yamdb_requests_total{status="200",view="TitleViewSet.list"} 1'
+            in text
+        ), 'Проверьте, что запросы учитываются по коду ответа.'
+        assert (
+            'yamdb_requests_total'
+            '{status="404",view="TitleViewSet.retrieve"} 1' in text
+        )
+        assert (
+            'yamdb_request_queries_count{view="TitleViewSet.list"} 1'
+            in text
+        ), 'Проверьте, что учитывается число запросов к базе.'
+        assert (
+            'yamdb_cache_requests_total'
+            '{cache="jwt_token",result="hit"}' in text
+        ), 'Проверьте, что учитываются попадания в кэш токенов.'
+
+    def test_02_admin_only(self, client, user_client, metrics_dir):
+        response = client.get(self.URL_METRICS)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что `/metrics` недоступен анонимному пользователю.'
+        )
+        response = user_client.get(self.URL_METRICS)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что `/metrics` доступен только администратору.'
+        )
+
+    def test_03_processes_aggregated(self, admin_client, metrics_dir):
+        record_request('TitleViewSet.list', 200, 0.015625, 3)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                record_request('TitleViewSet.list', 200, 0.125, 3)
+                record_request('TitleViewSet.list', 500, 20, 3)
+                registry.flush(force=True)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        assert (metrics_dir / f'{pid}.json').exists(), (
+            'Проверьте, что каждый процесс пишет метрики в свой файл в '
+            '`METRICS_DIR`.'
+        )
+        text = admin_client.get(self.URL_METRICS).content.decode()
+        view = 'view="TitleViewSet.list"'
+        assert (
+            f'yamdb_requests_total{{status="200",{view}}} 2' in text
+        ), 'Проверьте, что `/metrics` складывает метрики всех процессов.'
+        assert f'yamdb_requests_total{{status="500",{view}}} 1' in text
+        assert (
+            f'yamdb_request_duration_seconds_bucket{{{view},le="0.025"}} 1'
+            in text
+        )
+        assert (
+            f'yamdb_request_duration_seconds_bucket{{{view},le="0.25"}} 2'
+            in text
+        ), 'Проверьте, что корзины гистограммы накопительные.'
+        assert (
+            f'yamdb_request_duration_seconds_bucket{{{view},le="10"}} 2'
+            in text
+        )
+        assert (
+            f'yamdb_request_duration_seconds_bucket{{{view},le="+Inf"}} 3'
+            in text
+        )
+        assert (
+            f'yamdb_request_duration_seconds_sum{{{view}}} 20.140625' in text
+        )
+
+    def test_04_disabled(self, client, settings, metrics_dir):
+        settings.METRICS_ENABLED = False
+        client.get(self.URL_TITLES)
+        assert not registry.collect(), (
+            'Проверьте, что метрики отключаются настройкой '
+            '`METRICS_ENABLED`.'
+        )
+
+    def test_05_exited_process_merged(self, admin_client, metrics_dir):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                record_request('TitleViewSet.list', 200, 0.125, 3)
+                registry.close()
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        assert not (metrics_dir / f'{pid}.json').exists()
+        assert (metrics_dir / 'aggregate.json').exists(), (
+            'Проверьте, что при выходе процесс переносит метрики в общий '
+            'файл и удаляет свой.'
+        )
+        record_request('TitleViewSet.list', 200, 0.125, 3)
+        text = admin_client.get(self.URL_METRICS).content.decode()
+        assert (
+            'yamdb_requests_total'
+            '{status="200",view="TitleViewSet.list"} 2' in text
+        )
+
+    def test_06_reused_pid_keeps_counts(self, admin_client, metrics_dir):
+        record_request('TitleViewSet.list', 200, 0.125, 3)
+        registry.flush(force=True)
+        registry.reset()
+        record_request('TitleViewSet.list', 200, 0.125, 3)
+        registry.flush(force=True)
+        text = admin_client.get(self.URL_METRICS).content.decode()
+        assert (
+            'yamdb_requests_total'
+            '{status="200",view="TitleViewSet.list"} 2' in text
+        ), (
+            'Проверьте, что файл завершившегося процесса с тем же pid '
+            'переносится в общий файл, а не перезаписывается.'
+        )
+
+    def test_07_claim_only_own_directory(self, metrics_dir):
+        record_request('TitleViewSet.list', 200, 0.125, 3)
+        registry.flush(force=True)
+        (metrics_dir / 'owner.pid').write_text(str(os.getppid()))
+        assert registry.claim() == os.getppid(), (
+            'Проверьте, что `serve` не очищает каталог метрик, которым '
+            'владеет другой работающий сервер.'
+        )
+        assert (metrics_dir / f'{os.getpid()}.json').exists()
+        (metrics_dir / 'owner.pid').write_text(str(2 ** 22 + 1))
+        assert registry.claim() is None
+        assert not list(metrics_dir.glob('*.json'))
+        assert (metrics_dir / 'owner.pid').read_text() == str(os.getpid())
+        registry.release()
+        assert not (metrics_dir / 'owner.pid').exists()
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from api.slow_queries import read_records, slow_query_log, worker_path
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_ENABLED = True
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 1.0
+    settings.SLOW_QUERY_LOG = str(tmp_path / 'slow.log')
+    yield tmp_path / 'slow.log'
+    slow_query_log.set_worker(None)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SlowQueries:
+    URL_TITLES = '/api/v1/titles/'
+
+    def test_01_records(self, client, slow_log):
+        call_command('parse-db')
+        client.get(self.URL_TITLES, {'name': 'Побег'})
+        records = [json.loads(line) for line in slow_log.open()]
+        assert records, (
+            'Проверьте, что запросы дольше `SLOW_QUERY_THRESHOLD_MS` '
+            'записываются в `SLOW_QUERY_LOG`.'
+        )
+        record = records[-1]
+        assert record['view'] == 'TitleViewSet.list', (
+            'Проверьте, что в записи указано представление и действие.'
+        )
+        assert record['path'] == self.URL_TITLES
+        assert record['duration_ms'] >= 0
+        assert all('Побег' not in item['sql'] for item in records), (
+            'Проверьте, что SQL записывается без литералов.'
+        )
+        assert record['plan'] and all(
+            isinstance(step, str) for step in record['plan']
+        ), 'Проверьте, что к записи прикладывается EXPLAIN QUERY PLAN.'
+
+    def test_02_threshold_and_sampling(self, client, settings, slow_log):
+        settings.SLOW_QUERY_THRESHOLD_MS = 10 ** 6
+        client.get(self.URL_TITLES)
+        assert not slow_log.exists(), (
+            'Проверьте, что быстрые запросы не записываются.'
+        )
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_SAMPLE_RATE = 0
+        client.get(self.URL_TITLES)
+        assert not slow_log.exists(), (
+            'Проверьте, что записывается только доля '
+            '`SLOW_QUERY_SAMPLE_RATE` медленных запросов.'
+        )
+
+    def test_03_rotation(self, client, settings, slow_log):
+        settings.SLOW_QUERY_LOG_MAX_BYTES = 1024
+        settings.SLOW_QUERY_LOG_BACKUPS = 2
+        for _ in range(10):
+            client.get(self.URL_TITLES)
+        assert slow_log.with_name('slow.log.1').exists(), (
+            'Проверьте, что журнал ротируется по размеру.'
+        )
+        assert not slow_log.with_name('slow.log.3').exists()
+        records = list(read_records(slow_log))
+        assert len(records) > len(list(slow_log.open()))
+
+    def test_04_summary_command(self, client, slow_log, capsys):
+        client.get(self.URL_TITLES)
+        client.get(self.URL_TITLES)
+        call_command('slow-queries', '--top', '1', '--sort', 'count')
+        output = capsys.readouterr().out
+        assert output.startswith('#1 count=2 '), (
+            'Проверьте, что команда `slow-queries` группирует запросы по '
+            'SQL и сортирует их.'
+        )
+        assert 'views: TitleViewSet.list' in output
+        assert '#2' not in output
+
+    def test_05_disabled(self, client, settings, slow_log):
+        settings.SLOW_QUERY_ENABLED = False
+        client.get(self.URL_TITLES)
+        assert not slow_log.exists(), (
+            'Проверьте, что журнал отключается настройкой '
+            '`SLOW_QUERY_ENABLED`.'
+        )
+
+    def test_06_worker_files(self, client, slow_log):
+        slow_query_log.set_worker(2)
+        client.get(self.URL_TITLES)
+        assert not slow_log.exists()
+        assert worker_path(slow_log, 2).exists(), (
+            'Проверьте, что рабочий процесс `serve` пишет журнал в свой '
+            'файл.'
+        )
+        slow_query_log.set_worker(None)
+        client.get(self.URL_TITLES)
+        assert len(list(read_records(slow_log))) > len(
+            list(slow_log.open())
+        ), 'Проверьте, что сводка читает файлы рабочих процессов.'
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from api_yamdb import settings_api
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.fixture
+def api_profile():
+    with override_settings(
+        ROOT_URLCONF=settings_api.ROOT_URLCONF,
+        MIDDLEWARE=settings_api.MIDDLEWARE,
+        REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+    ):
+        yield
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ApiProfile:
+    URL_TITLES = '/api/v1/titles/'
+
+    def test_01_lean_stack(self):
+        assert 'django.contrib.admin' not in settings_api.INSTALLED_APPS
+        assert 'django.contrib.sessions' not in settings_api.INSTALLED_APPS
+        assert (
+            'django.contrib.sessions.middleware.SessionMiddleware'
+            not in settings_api.MIDDLEWARE
+        ), 'Проверьте, что облегчённый профиль не загружает сессии.'
+        assert 'api.middleware.ReplicaMiddleware' in settings_api.MIDDLEWARE
+        assert settings_api.REST_FRAMEWORK[
+            'DEFAULT_RENDERER_CLASSES'
+        ] == ('rest_framework.renderers.JSONRenderer',), (
+            'Проверьте, что облегчённый профиль отвечает только JSON.'
+        )
+
+    def test_02_serves_api_only(self, client, admin_client, api_profile):
+        assert client.get(self.URL_TITLES).status_code == HTTPStatus.OK
+        assert client.get('/admin/').status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что админка не подключена в облегчённом профиле.'
+        )
+        assert admin_client.get('/metrics').status_code == HTTPStatus.OK
+
+    def test_03_wsgi_entry_point(self):
+        environment = {
+            key: value for key, value in os.environ.items()
+            if key != 'DJANGO_SETTINGS_MODULE'
+        }
+        output = subprocess.run(
+            [sys.executable, '-c',
+             'import api_yamdb.wsgi_api; from django.conf import settings; '
+             'from api.v1.views import TitleViewSet; '
+             'print(settings.ROOT_URLCONF, *(renderer.__name__ for renderer '
+             'in TitleViewSet.renderer_classes))'],
+            cwd=MANAGE_PATH, env=environment, check=True,
+            capture_output=True, text=True,
+        ).stdout
+        urlconf, *renderers = output.split()
+        assert urlconf == 'api_yamdb.urls_api', (
+            'Проверьте, что `wsgi_api.py` запускает профиль `settings_api`.'
+        )
+        assert renderers == ['JSONRenderer'], (
+            'Проверьте, что облегчённый профиль не отдаёт HTML-страницы DRF.'
+        )
@@ -0,0 +1,50 @@
+from django.core.management import call_command
+
+from api.startup_profile import parse_importtime, profile_startup
+from tests.conftest import MANAGE_PATH
+
+IMPORTTIME = [
+    'import time: self [us] | cumulative | imported package',
+    'import time:       120 |        120 |     django.utils.version',
+    'import time:       300 |        420 |   django',
+    'startup-profile phase: urls',
+    'import time:        50 |         50 | api.v1.urls',
+]
+DEFERRED_MODULES = (
+    'api.v1.exports', 'api.nplusone', 'reviews.csv_import',
+    'django.contrib.sessions',
+)
+
+
+class Test26StartupProfile:
+
+    def test_01_parse_importtime(self):
+        records = parse_importtime(IMPORTTIME)
+        assert [record.module for record in records] == [
+            'django.utils.version', 'django', 'api.v1.urls'
+        ]
+        assert [record.depth for record in records] == [2, 1, 0]
+        assert [record.phase for record in records] == [
+            'setup', 'setup', 'urls'
+        ], 'Проверьте, что импорты относятся к этапу запуска.'
+        assert records[1].self_us == 300
+        assert records[1].cumulative_us == 420
+
+    def test_02_command(self, capsys):
+        call_command('startup-profile', '--top', '3', '--sort', 'self')
+        output = capsys.readouterr().out
+        for phase in ('setup', 'middleware', 'urls', 'total'):
+            assert f'\n{phase} ' in output, (
+                f'Проверьте, что команда `startup-profile` выводит время '
+                f'этапа `{phase}`.'
+            )
+        assert 'Top 3 imports by self time:' in output
+        assert len(output.split('Top 3 imports')[1].splitlines()) >= 5
+
+    def test_03_lean_profile_defers_imports(self):
+        profile = profile_startup('api_yamdb.settings_api', MANAGE_PATH)
+        for module in DEFERRED_MODULES:
+            assert module not in profile.modules, (
+                f'Проверьте, что `{module}` не импортируется при запуске '
+                f'облегчённого профиля.'
+            )
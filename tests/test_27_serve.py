@@ -0,0 +1,111 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from http import HTTPStatus
+
+from api.management.commands.serve import exit_status
+from api.prefork import child_pids, process_memory, warm_up
+from tests.conftest import MANAGE_PATH
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return urllib.request.urlopen(url)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+class Test27Serve:
+
+    def test_01_warm_up(self):
+        actions, serializers = warm_up()
+        assert actions >= 20, (
+            'Проверьте, что `warm_up()` прогревает действия всех '
+            'представлений API.'
+        )
+        assert serializers >= 5, (
+            'Проверьте, что `warm_up()` строит поля сериализаторов.'
+        )
+
+    def test_02_process_memory(self):
+        memory = process_memory(os.getpid())
+        assert 0 < memory['uss'] <= memory['pss'] <= memory['rss'], (
+            'Проверьте, что `process_memory()` читает RSS, PSS и USS из '
+            '`/proc/<pid>/smaps_rollup`.'
+        )
+        assert process_memory(2 ** 22 + 1) is None
+
+    def test_03_preforked_workers(self, tmp_path):
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, 'manage.py', 'serve', '--workers', '2',
+             '--bind', f'127.0.0.1:{port}'],
+            cwd=MANAGE_PATH, stdout=subprocess.PIPE, text=True,
+            env={**os.environ, 'YAMDB_METRICS_DIR': str(tmp_path)},
+        )
+        try:
+            response = wait_ready(f'http://127.0.0.1:{port}/api/v1/')
+            assert response.status == HTTPStatus.OK
+            workers = child_pids(server.pid)
+            assert len(workers) == 2, (
+                'Проверьте, что `serve` форкает `--workers` рабочих '
+                'процессов.'
+            )
+            second = subprocess.run(
+                [sys.executable, 'manage.py', 'serve', '--workers', '1',
+                 '--bind', f'127.0.0.1:{free_port()}'],
+                cwd=MANAGE_PATH, capture_output=True, text=True, timeout=30,
+                env={**os.environ, 'YAMDB_METRICS_DIR': str(tmp_path)},
+            )
+            assert second.returncode and 'METRICS_DIR' in second.stderr, (
+                'Проверьте, что `serve` не запускается с каталогом метрик '
+                'другого работающего сервера.'
+            )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            try:
+                output, _ = server.communicate(timeout=4)
+            except subprocess.TimeoutExpired:
+                for p in [server.pid] + child_pids(server.pid):
+                    print(p, open(f'/proc/{p}/wchan').read(), [l for l in open(f'/proc/{p}/status') if l.startswith(('State', 'SigCgt', 'SigBlk', 'SigIgn', 'SigPnd', 'ShdPnd'))])
+                    subprocess.run(['cat', f'/proc/{p}/stack'])
+                    for t in os.listdir(f'/proc/{p}/task'): print(' task', t, open(f'/proc/{p}/task/{t}/wchan').read())
+                raise
+        assert server.returncode == 0
+        assert 'serializers warmed up' in output, (
+            'Проверьте, что `serve` загружает и прогревает приложение до '
+            'форка.'
+        )
+        assert not any(process_memory(pid) for pid in workers), (
+            'Проверьте, что по SIGTERM `serve` останавливает рабочие '
+            'процессы.'
+        )
+        assert (tmp_path / 'aggregate.json').exists()
+        assert not any(
+            (tmp_path / f'{pid}.json').exists() for pid in workers
+        ), (
+            'Проверьте, что при остановке рабочие процессы переносят '
+            'метрики в общий файл.'
+        )
+
+    def test_04_exit_status(self):
+        assert [exit_status(code) for code in (None, 0, 3, 'fatal')] == [
+            0, 0, 3, 1
+        ], (
+            'Проверьте, что код `SystemExit` приводится к числу перед '
+            '`os._exit()` в рабочем процессе.'
+        )
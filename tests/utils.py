@@ -305,3 +305,15 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def query_plan(captured_queries, marker):
+    """EXPLAIN QUERY PLAN первого выполненного запроса с подстрокой marker."""
+    from django.db import connection
+
+    sql = next(
+        query['sql'] for query in captured_queries if marker in query['sql']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]